@@ -0,0 +1,32 @@
+from django.contrib import admin
+
+from .models import SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """Slow statements captured by SlowQueryMiddleware."""
+    list_display = (
+        'created_at',
+        'duration',
+        'view',
+        'action',
+        'method',
+        'path',
+    )
+    list_filter = ('view', 'action', 'database')
+    search_fields = ('sql', 'path')
+    readonly_fields = (
+        'created_at',
+        'view',
+        'action',
+        'method',
+        'path',
+        'database',
+        'sql',
+        'duration',
+        'plan',
+    )
+
+    def has_add_permission(self, request):
+        return False
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+
+from api_yamdb.caches import check_shared_caches
+from api_yamdb.db.health import check_connections
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from .slow_queries import install_slow_query_capture
+        from .timing import install_query_timer
+
+        check_shared_caches()
+        request_started.connect(check_connections)
+        connection_created.connect(install_query_timer)
+        connection_created.connect(install_slow_query_capture)
@@ -0,0 +1,77 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern, URLResolver
+
+from api_yamdb.db.health import check_connections
+
+ASYNC_READ_ROUTES = ('category', 'genre', 'title', 'reviews', 'comments')
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def run_view(view, request, *args, **kwargs):
+    """
+    Run a sync view and render its response in the current thread.
+    Worker threads keep database connections of their own, so they
+    are checked before and after the view the same way the request
+    signals check the connection of the request thread.
+    """
+    close_old_connections()
+    check_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """
+    Return a coroutine view for the ASGI server.
+    Django 3.2 runs sync views in one thread-sensitive executor,
+    so under ASGI every request of a process would wait for the
+    previous one. Reads run in the pool of worker threads instead,
+    while writes keep the thread-sensitive path.
+    """
+    # The attributes of the DRF view, such as csrf_exempt, cls and
+    # actions, are copied to the coroutine.
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await sync_to_async(
+            run_view, thread_sensitive=request.method not in READ_METHODS
+        )(view, request, *args, **kwargs)
+
+    return async_view
+
+
+def is_async_read_route(pattern):
+    """Check that the route serves one of the public read resources."""
+    return bool(pattern.name) and (
+        pattern.name.rsplit('-', 1)[0] in ASYNC_READ_ROUTES
+    )
+
+
+def async_read_urlpatterns(urlpatterns):
+    """Return the patterns with the public read routes made async."""
+    patterns = []
+    for pattern in urlpatterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern,
+                async_read_urlpatterns(pattern.url_patterns),
+                pattern.default_kwargs,
+                pattern.app_name,
+                pattern.namespace,
+            )
+        elif isinstance(pattern, URLPattern) and is_async_read_route(pattern):
+            pattern = URLPattern(
+                pattern.pattern,
+                async_read_view(pattern.callback),
+                pattern.default_args,
+                pattern.name,
+            )
+        patterns.append(pattern)
+    return patterns
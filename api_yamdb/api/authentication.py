@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from users.cache import cache_user, get_cached_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that keeps the fields of authenticated users
+    in a bounded TTL cache, so a cache hit needs no user query.
+    """
+
+    def get_user(self, validated_token):
+        user = get_cached_user(validated_token.get(api_settings.USER_ID_CLAIM))
+        if user is None or not user.is_active:
+            user = super().get_user(validated_token)
+            cache_user(user)
+
+        return user
@@ -0,0 +1,160 @@
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, rank):
+    """Return the nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    index = max(0, -(-len(values) * rank // 100) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    """Return throughput and latency percentiles in milliseconds."""
+    latencies = sorted(latencies)
+    summary = {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'rps': round((len(latencies) + errors) / elapsed, 1) if elapsed else 0,
+    }
+    for rank in PERCENTILES:
+        value = percentile(latencies, rank)
+        summary[f'p{rank}'] = None if value is None else round(value * 1000, 2)
+    return summary
+
+
+class LoadClient:
+    """
+    Keep-alive HTTP connection of one load thread.
+    The connection is reopened after errors and closed responses.
+    """
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method, path, headers=None, body=None):
+        """Send a request and return its status code."""
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        try:
+            self.connection.request(
+                method, path, body=body, headers=headers or {}
+            )
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def run_load(base_url, requests, concurrency, timeout=30):
+    """
+    Send the (name, method, path, headers, body) requests from
+    concurrency threads and return the latencies and errors of every
+    name with the wall time of the whole run. Responses with a client
+    or server error status count as errors.
+    """
+    local = threading.local()
+    clients = []
+    lock = threading.Lock()
+    results = {}
+
+    def send(request):
+        name, method, path, headers, body = request
+        if not hasattr(local, 'client'):
+            local.client = LoadClient(base_url, timeout)
+            with lock:
+                clients.append(local.client)
+        started = time.perf_counter()
+        try:
+            status = local.client.request(method, path, headers, body)
+            failed = status >= 400
+        except (OSError, http.client.HTTPException):
+            failed = True
+        latency = time.perf_counter() - started
+        with lock:
+            latencies, errors = results.setdefault(name, ([], [0]))
+            if failed:
+                errors[0] += 1
+            else:
+                latencies.append(latency)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, requests))
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        client.close()
+    return {
+        name: (latencies, errors[0])
+        for name, (latencies, errors) in results.items()
+    }, elapsed
+
+
+def summarize_results(results, elapsed):
+    """Return the summary of every name and of all requests together."""
+    summaries = {
+        name: summarize(latencies, errors, elapsed)
+        for name, (latencies, errors) in sorted(results.items())
+    }
+    summaries['total'] = summarize(
+        [latency for latencies, _ in results.values()
+         for latency in latencies],
+        sum(errors for _, errors in results.values()),
+        elapsed
+    )
+    return summaries
+
+
+def change(value, baseline):
+    """Return the change from the baseline in percent."""
+    if value is None or not baseline:
+        return None
+    return round((value - baseline) / baseline * 100, 1)
+
+
+def compare(summaries, baseline):
+    """Return the throughput and p95 changes of the names of both runs."""
+    return {
+        name: {
+            'rps': change(summary['rps'], baseline[name]['rps']),
+            'p95': change(summary['p95'], baseline[name]['p95']),
+        }
+        for name, summary in summaries.items()
+        if name in baseline
+    }
+
+
+def wait_for_server(base_url, path, timeout=30):
+    """Wait until the server answers the path."""
+    deadline = time.monotonic() + timeout
+    client = LoadClient(base_url, timeout=1)
+    while time.monotonic() < deadline:
+        try:
+            client.request('GET', path)
+            return True
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.2)
+        finally:
+            client.close()
+    return False
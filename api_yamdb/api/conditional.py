@@ -0,0 +1,60 @@
+import time
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Answers conditional GET requests with 304 Not Modified.
+    The validators come from the version of the title the resource
+    belongs to, so a matching request skips the serializers.
+    """
+
+    def get_validators(self, title):
+        """
+        Return the ETag and the Last-Modified timestamp of the title.
+        Last-Modified has a resolution of one second, so it is None
+        during the second of the last change: another change within
+        that second would keep it, and If-Modified-Since would answer
+        304 for a stale copy. Such copies are revalidated by the ETag.
+        """
+        etag = quote_etag(
+            f'{title.pk}-{title.version}-{title.modified.timestamp()}'
+            f'-{self.request.accepted_renderer.format}'
+        )
+        last_modified = int(title.modified.timestamp())
+        if last_modified >= int(time.time()):
+            last_modified = None
+
+        return f'W/{etag}', last_modified
+
+    def conditional_response(self, title, get_response):
+        """Return 304 when the client copy is fresh or the full response."""
+        etag, last_modified = self.get_validators(title)
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = get_response()
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """
+    Conditional list of reviews or comments of a title.
+    Expects get_title() from the viewset.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """Re-define method to answer conditional requests."""
+        return self.conditional_response(
+            self.get_title(),
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
@@ -1,27 +1,66 @@
+from django.db.models import Count
 from django_filters import rest_framework as filters
 from reviews.models import Title
+from reviews.search import search_titles
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Comma-separated list of values."""
 
 
 class TitleFilter(filters.FilterSet):
-    """Selection of works by title."""
+    """
+    Selection of works by title. Category and genres are matched by
+    exact slug through their unique indexes, genres in a subquery of
+    the title-genre table, so a title matching several genres is
+    returned once without DISTINCT.
+    """
 
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
+    category = filters.CharFilter(field_name='category__slug')
+    genre = CharInFilter(method='filter_genre_any')
+    genre_all = CharInFilter(method='filter_genre_all')
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    year = filters.NumberFilter(
-        field_name='year',
-        lookup_expr='icontains'
-    )
+    year = filters.NumberFilter(field_name='year')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'category', 'genre', 'genre_all', 'name', 'year', 'year_min',
+            'year_max', 'search',
+        )
+
+    def genre_titles(self, slugs):
+        """Return the title-genre rows of the genres with the slugs."""
+        return Title.genre.through.objects.filter(genre__slug__in=slugs)
+
+    def filter_genre_any(self, queryset, name, value):
+        """Titles with at least one of the genres."""
+        slugs = {slug for slug in value if slug}
+        if not slugs:
+            return queryset
+        return queryset.filter(
+            id__in=self.genre_titles(slugs).values('title_id')
+        )
+
+    def filter_genre_all(self, queryset, name, value):
+        """
+        Titles with every genre: the title-genre rows of the genres are
+        grouped by title once instead of joining the table per genre.
+        """
+        slugs = {slug for slug in value if slug}
+        if not slugs:
+            return queryset
+        matching = self.genre_titles(slugs).values('title_id').annotate(
+            genres=Count('genre_id')
+        ).filter(genres=len(slugs)).values('title_id')
+        return queryset.filter(id__in=matching)
+
+    def filter_search(self, queryset, name, value):
+        """Full-text and fuzzy search ranked by relevance."""
+        return search_titles(queryset, value)
@@ -0,0 +1,345 @@
+"""
+Index audit of a replayed workload. Every SELECT statement of the
+workload is explained once; the plans show which indexes are used,
+the predicates and ORDER BY of the statements show which composite
+indexes would let the sequential scans and sorts use an index.
+"""
+import re
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.apps import apps
+from django.db import connection, models, transaction
+from django.db.migrations import AddIndex, Migration
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.test import Client, override_settings
+from django.urls import Resolver404, resolve
+from rest_framework.permissions import SAFE_METHODS
+
+from api_yamdb.db.plans import SEQUENTIAL, explain, has_sort, used_indexes
+
+COLUMN = r'"(?P<table>\w+)"\."(?P<column>\w+)"'
+EQUALITY = re.compile(COLUMN + r'\s*(?:=\s*%s|IN\s*\(%s|IS NULL)')
+RANGE = re.compile(COLUMN + r'\s*(?:[<>]=?\s*%s|BETWEEN\b)')
+LIKE = re.compile(
+    r'(?P<function>UPPER|LOWER)?\(?' + COLUMN
+    + r'(?P<cast>::\w+)?\)?\s+I?LIKE\s+(?:UPPER\(|LOWER\()?%s'
+)
+ORDER_BY = re.compile(r'\sORDER BY\s(?P<order>.*?)(?:\sLIMIT\s|\sOFFSET\s|$)')
+NUMBER_FIELDS = (models.IntegerField, models.FloatField, models.DecimalField)
+
+
+class Statement:
+    """SELECT statement of the workload with the routes that ran it."""
+
+    def __init__(self, sql, params):
+        self.sql = sql
+        self.params = params
+        self.count = 0
+        self.routes = set()
+        self.access = []
+        self.lines = []
+
+
+def is_write(request):
+    """Check that the request is not a GET, HEAD or OPTIONS one."""
+    return request[0].upper() not in SAFE_METHODS
+
+
+def replay(requests, allow_writes=False):
+    """
+    Run the requests through the Django test client in a transaction
+    that is rolled back, and return the SELECT statements by SQL.
+    Requests are (method, path, headers, body) tuples. Writes are
+    refused unless allow_writes: the rollback covers the database
+    only, not the shared caches they invalidate.
+    """
+    writes = [request for request in requests if is_write(request)]
+    if writes and not allow_writes:
+        method, path, _, _ = writes[0]
+        raise ValueError(
+            f'{len(writes)} requests are not read-only, such as '
+            f'{method} {path}'
+        )
+    statements = {}
+    route = None
+
+    def collect(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            statement = statements.get(sql)
+            if statement is None:
+                statement = statements[sql] = Statement(sql, params)
+            statement.count += 1
+            statement.routes.add(route)
+        return execute(sql, params, many, context)
+
+    client = Client()
+    # The replay is not sampled for Server-Timing and its statements
+    # are not kept as slow queries.
+    quiet = override_settings(
+        SERVER_TIMING_SAMPLE_RATE=0, SLOW_QUERY_LOG_SIZE=0
+    )
+    with quiet, transaction.atomic():
+        for method, path, headers, body in requests:
+            try:
+                route = resolve(urlsplit(path).path).view_name
+            except Resolver404:
+                route = 'unmatched'
+            extra = {
+                'HTTP_' + name.upper().replace('-', '_'): value
+                for name, value in headers.items()
+                if name.lower() != 'content-type'
+            }
+            with connection.execute_wrapper(collect):
+                client.generic(
+                    method, path, body or '',
+                    content_type=headers.get('Content-Type'), **extra
+                )
+        for statement in statements.values():
+            statement.access, _, statement.lines = explain(
+                connection, statement.sql, statement.params
+            )
+        transaction.set_rollback(True)
+    return list(statements.values())
+
+
+def read_workload(lines):
+    """Parse 'METHOD /path' lines, such as fields of an access log."""
+    requests = []
+    for line in lines:
+        words = line.split()
+        if not words or words[0].startswith('#'):
+            continue
+        if len(words) == 1:
+            words.insert(0, 'GET')
+        requests.append((words[0].upper(), words[1], {}, None))
+    return requests
+
+
+def model_tables():
+    """Return the models of the project apps by table name."""
+    return {
+        model._meta.db_table: model
+        for model in apps.get_models()
+        if not model._meta.proxy and model._meta.managed
+    }
+
+
+def table_indexes(table):
+    """Return {index name: (columns, unique)} of the table."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {
+        name: (tuple(options['columns']), bool(
+            options['unique'] or options['primary_key']
+        ))
+        for name, options in constraints.items()
+        if options['index'] or options['unique'] or options['primary_key']
+    }
+
+
+def parameter(statement, match):
+    """Return the parameter of the last placeholder of the match."""
+    position = statement.sql[:match.end()].count('%s') - 1
+    try:
+        return statement.params[position]
+    except (IndexError, KeyError, TypeError):
+        return None
+
+
+def predicates(statement):
+    """
+    Return the equality, range and ORDER BY columns of the statement
+    by table. Only "table"."column" references are read, the aliased
+    columns of subqueries are skipped.
+    """
+    found = defaultdict(lambda: {'equality': [], 'range': [], 'order': []})
+    for kind, pattern in (('equality', EQUALITY), ('range', RANGE)):
+        for match in pattern.finditer(statement.sql):
+            columns = found[match['table']][kind]
+            if match['column'] not in columns:
+                columns.append(match['column'])
+    order = ORDER_BY.search(statement.sql)
+    if order:
+        columns = re.findall(COLUMN, order['order'])
+        tables = {table for table, _ in columns}
+        if len(tables) == 1:
+            found[tables.pop()]['order'] = [
+                column for _, column in columns
+            ]
+    return found
+
+
+def unindexable_filters(statement, tables):
+    """Yield (table, column, reason) of LIKE filters an index can't serve."""
+    for match in LIKE.finditer(statement.sql):
+        table, column = match['table'], match['column']
+        model = tables.get(table)
+        if model is None:
+            continue
+        reasons = []
+        value = parameter(statement, match)
+        if isinstance(value, str) and value.startswith('%'):
+            reasons.append('LIKE with a leading wildcard')
+        if match['function']:
+            reasons.append(f'{match["function"]}() of the column')
+        field = next((
+            field for field in model._meta.concrete_fields
+            if field.column == column
+        ), None)
+        if isinstance(field, NUMBER_FIELDS):
+            reasons.append('text match on a number column')
+        elif match['cast']:
+            reasons.append(f'cast {match["cast"]} of the column')
+        if reasons:
+            yield table, column, ', '.join(reasons)
+
+
+def candidate_columns(columns):
+    """Equality columns first, then a range or the ORDER BY columns."""
+    candidate = list(columns['equality'])
+    rest = columns['range'][:1] or columns['order']
+    candidate += [column for column in rest if column not in candidate]
+    return tuple(candidate)
+
+
+def is_covered(candidate, indexes):
+    """Check that an index starts with the candidate columns."""
+    for columns, _ in indexes.values():
+        prefix = columns[:len(candidate)]
+        if prefix == candidate:
+            return True
+        equality = len(candidate) - 1
+        if set(prefix[:equality]) == set(candidate[:equality]) and (
+            prefix[equality:] == candidate[equality:]
+        ):
+            return True
+    return False
+
+
+def row_count(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}'
+        )
+        return cursor.fetchone()[0]
+
+
+class IndexAudit:
+    """Findings of the audit, collected statement by statement."""
+
+    def __init__(self, min_rows):
+        self.min_rows = min_rows
+        self.tables = model_tables()
+        self.indexes = {}
+        self.counts = {}
+        self.used = set()
+        self.read_tables = set()
+        self.missing = {}
+        self.unindexable = {}
+
+    def table_indexes(self, table):
+        if table not in self.indexes:
+            self.indexes[table] = table_indexes(table)
+        return self.indexes[table]
+
+    def row_count(self, table):
+        if table not in self.counts:
+            self.counts[table] = row_count(table)
+        return self.counts[table]
+
+    def add(self, findings, key, statement):
+        entry = findings.setdefault(key, {'count': 0, 'routes': set()})
+        entry['count'] += statement.count
+        entry['routes'] |= statement.routes
+
+    def missing_index(self, statement, table, columns):
+        """
+        Return the columns of an index for a table the statement reads
+        sequentially or sorts in memory, or None when an index has them.
+        """
+        scanned = [table, SEQUENTIAL] in statement.access
+        if not scanned and not (
+            columns['order'] and has_sort(statement.lines)
+        ):
+            return None
+        candidate = candidate_columns(columns)
+        if not candidate or self.row_count(table) < self.min_rows:
+            return None
+        if is_covered(candidate, self.table_indexes(table)):
+            return None
+        return candidate
+
+    def add_statement(self, statement):
+        self.used |= used_indexes(statement.access)
+        self.read_tables |= {table for table, _ in statement.access}
+        for finding in unindexable_filters(statement, self.tables):
+            self.add(self.unindexable, finding, statement)
+        for table, columns in predicates(statement).items():
+            if table not in self.tables:
+                continue
+            candidate = self.missing_index(statement, table, columns)
+            if candidate:
+                self.add(self.missing, (table, candidate), statement)
+
+    def unused(self):
+        """Return the non-unique indexes of the read tables not used."""
+        return [
+            (table, name, columns)
+            for table in sorted(self.read_tables & set(self.tables))
+            for name, (columns, unique) in sorted(
+                self.table_indexes(table).items()
+            )
+            if not unique and name not in self.used
+        ]
+
+
+def audit(statements, min_rows):
+    """
+    Return the report of the workload: unused indexes of the tables it
+    read, recommended composite indexes of tables with at least
+    min_rows rows and the filters that cannot use an index.
+    """
+    index_audit = IndexAudit(min_rows)
+    for statement in statements:
+        index_audit.add_statement(statement)
+    return {
+        'unused': index_audit.unused(),
+        'missing': index_audit.missing,
+        'unindexable': index_audit.unindexable,
+    }
+
+
+def recommended_indexes(missing):
+    """Return {app label: [(model, index)]} for the missing indexes."""
+    tables = model_tables()
+    recommended = defaultdict(list)
+    for table, columns in sorted(missing):
+        model = tables[table]
+        fields = {
+            field.column: field.name
+            for field in model._meta.concrete_fields
+        }
+        index = models.Index(fields=[fields[column] for column in columns])
+        index.set_name_with_model(model)
+        recommended[model._meta.app_label].append((model, index))
+    return recommended
+
+
+def index_migrations(recommended, name):
+    """Return {path: source} of one migration per app adding the indexes."""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    sources = {}
+    for app_label, model_indexes in recommended.items():
+        leaf = loader.graph.leaf_nodes(app_label)[0]
+        number = int(leaf[1].split('_', 1)[0]) + 1
+        migration = Migration(f'{number:04d}_{name}', app_label)
+        migration.dependencies = [leaf]
+        migration.operations = [
+            AddIndex(model._meta.model_name, index)
+            for model, index in model_indexes
+        ]
+        writer = MigrationWriter(migration)
+        sources[writer.path] = writer.as_string()
+    return sources
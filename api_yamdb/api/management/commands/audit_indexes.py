@@ -0,0 +1,158 @@
+import os
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.index_audit import (audit, index_migrations, is_write,
+                             read_workload, recommended_indexes, replay)
+from api.management.commands.benchmark_load import TrafficMix
+
+
+class Command(BaseCommand):
+    """
+    Command to audit the indexes against a replayed workload.
+    Meant for a scratch copy of the database: the replay runs the
+    views for real and only the database changes are rolled back.
+    """
+    help = (
+        'Replay a workload and report unused indexes, missing composite '
+        'indexes and filters that cannot use an index. Run it against '
+        'a scratch database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workload',
+            dest='workload',
+            help=(
+                'File with a "METHOD /path" line per request, '
+                'by default the benchmark_load traffic mix is replayed'
+            ),
+        )
+        parser.add_argument(
+            '--requests',
+            dest='requests',
+            default=500,
+            help='Number of requests of the traffic mix',
+            type=int,
+        )
+        parser.add_argument(
+            '--users',
+            dest='users',
+            default=10,
+            help='Number of users of the traffic mix',
+            type=int,
+        )
+        parser.add_argument(
+            '--seed',
+            dest='seed',
+            default=1,
+            help='Seed of the traffic mix',
+            type=int,
+        )
+        parser.add_argument(
+            '--min-rows',
+            dest='min_rows',
+            default=1000,
+            help='Smallest table to recommend indexes for',
+            type=int,
+        )
+        parser.add_argument(
+            '--allow-writes',
+            dest='allow_writes',
+            action='store_true',
+            help=(
+                'Replay requests other than GET, HEAD and OPTIONS too; '
+                'they invalidate the shared caches for real'
+            ),
+        )
+        parser.add_argument(
+            '--write-migration',
+            dest='write_migration',
+            action='store_true',
+            help='Write a migration with the recommended indexes',
+        )
+        parser.add_argument(
+            '--migration-name',
+            dest='migration_name',
+            default='audit_indexes',
+            help='Name of the written migration',
+        )
+
+    def workload(self, options):
+        if options['workload']:
+            try:
+                with open(options['workload'], encoding='utf-8') as lines:
+                    return read_workload(lines)
+            except OSError as error:
+                raise CommandError(f'Cannot read the workload: {error}')
+        mix = TrafficMix(random.Random(options['seed']), options['users'])
+        requests = [
+            (method, path, headers, body)
+            for _, method, path, headers, body in mix.requests(
+                options['requests']
+            )
+        ]
+        if options['allow_writes']:
+            return requests
+        return [request for request in requests if not is_write(request)]
+
+    def handle(self, *args, **options):
+        # The traffic mix prepares its users, the replay writes
+        # reviews: everything is rolled back.
+        with transaction.atomic():
+            requests = self.workload(options)
+            try:
+                statements = replay(requests, options['allow_writes'])
+            except ValueError as error:
+                raise CommandError(
+                    f'{error}: pass --allow-writes to replay them, '
+                    'against a scratch database'
+                )
+            transaction.set_rollback(True)
+        report = audit(statements, options['min_rows'])
+        self.stdout.write(
+            f'Replayed {len(requests)} requests, '
+            f'{len(statements)} distinct SELECT statements'
+        )
+        self.write_report(report)
+        recommended = recommended_indexes(report['missing'])
+        for model_indexes in recommended.values():
+            for model, index in model_indexes:
+                self.stdout.write(
+                    f'Add to {model.__name__}.Meta.indexes: '
+                    f'models.Index(fields={index.fields!r}, '
+                    f'name={index.name!r})'
+                )
+        if options['write_migration'] and recommended:
+            sources = index_migrations(
+                recommended, options['migration_name']
+            )
+            for path, source in sources.items():
+                with open(path, 'w', encoding='utf-8') as migration:
+                    migration.write(source)
+                self.stdout.write(
+                    f'Migration written to {os.path.relpath(path)}'
+                )
+
+    def write_report(self, report):
+        self.stdout.write('Indexes the workload did not use:')
+        for table, name, columns in report['unused']:
+            self.stdout.write(f'  {table}.{name} ({", ".join(columns)})')
+        self.stdout.write('Missing indexes:')
+        for (table, columns), entry in sorted(
+            report['missing'].items(), key=lambda item: -item[1]['count']
+        ):
+            self.stdout.write(
+                f'  {table} ({", ".join(columns)}) {entry["count"]} '
+                f'queries: {", ".join(sorted(entry["routes"]))}'
+            )
+        self.stdout.write('Filters that cannot use an index:')
+        for (table, column, reason), entry in sorted(
+            report['unindexable'].items(), key=lambda item: -item[1]['count']
+        ):
+            self.stdout.write(
+                f'  {table}.{column}: {reason}, {entry["count"]} queries: '
+                f'{", ".join(sorted(entry["routes"]))}'
+            )
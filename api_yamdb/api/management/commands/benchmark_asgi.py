@@ -0,0 +1,160 @@
+import json
+import os
+import shutil
+import subprocess
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import Review
+
+from api.benchmark import run_load, summarize, wait_for_server
+from api_yamdb.settings import BASE_DIR
+
+SERVERS = {
+    'wsgi': ('api_yamdb.wsgi:application', 'sync'),
+    'asgi': ('api_yamdb.asgi:application', 'uvicorn.workers.UvicornWorker'),
+}
+WARMUP_REQUESTS = 50
+
+
+def read_paths():
+    """Return the public read routes of a title that has reviews."""
+    review = Review.objects.order_by('id').first()
+    if review is None:
+        raise CommandError('The benchmark needs at least one review')
+    title = f'/api/v1/titles/{review.title_id}'
+    return [
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        '/api/v1/titles/',
+        f'{title}/',
+        f'{title}/reviews/',
+        f'{title}/reviews/{review.pk}/comments/',
+    ]
+
+
+class Command(BaseCommand):
+    """Command to compare the WSGI and ASGI servers under one load."""
+    help = 'Benchmark the read routes under WSGI and ASGI servers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--servers',
+            dest='servers',
+            nargs='+',
+            choices=SERVERS,
+            default=list(SERVERS),
+            help='Servers to benchmark',
+        )
+        parser.add_argument(
+            '--concurrency',
+            dest='concurrency',
+            default=64,
+            help='Number of concurrent clients',
+            type=int,
+        )
+        parser.add_argument(
+            '--requests',
+            dest='requests',
+            default=2000,
+            help='Number of requests sent to every server',
+            type=int,
+        )
+        parser.add_argument(
+            '--workers',
+            dest='workers',
+            default=1,
+            help='Number of gunicorn workers of every server',
+            type=int,
+        )
+        parser.add_argument(
+            '--port',
+            dest='port',
+            default=8765,
+            help='Port the servers listen on',
+            type=int,
+        )
+        parser.add_argument(
+            '--json',
+            dest='json',
+            action='store_true',
+            help='Print the results as JSON',
+        )
+
+    def start_server(self, server, port, workers):
+        """Start gunicorn with the application and worker of the server."""
+        application, worker_class = SERVERS[server]
+        gunicorn = shutil.which('gunicorn')
+        if gunicorn is None:
+            raise CommandError('gunicorn is not installed')
+        return subprocess.Popen(
+            [
+                gunicorn, application,
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(workers),
+                '--worker-class', worker_class,
+            ],
+            cwd=BASE_DIR,
+            env=os.environ.copy(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def benchmark(self, server, paths, options):
+        """Return the load summary of one server."""
+        base_url = f'http://127.0.0.1:{options["port"]}'
+        process = self.start_server(
+            server, options['port'], options['workers']
+        )
+        try:
+            if not wait_for_server(base_url, paths[0]):
+                raise CommandError(f'{server} server did not start')
+            requests = [
+                (server, 'GET', path, None, None)
+                for path in islice(cycle(paths), options['requests'])
+            ]
+            run_load(
+                base_url, requests[:WARMUP_REQUESTS], options['concurrency']
+            )
+            results, elapsed = run_load(
+                base_url, requests, options['concurrency']
+            )
+        finally:
+            process.terminate()
+            process.wait()
+        latencies, errors = results[server]
+        return summarize(latencies, errors, elapsed)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('Concurrency and requests must be positive')
+
+        paths = read_paths()
+        results = {
+            server: self.benchmark(server, paths, options)
+            for server in options['servers']
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'concurrency': options['concurrency'],
+                'workers': options['workers'],
+                'paths': paths,
+                'results': results,
+            }, indent=2))
+            return
+
+        self.stdout.write(
+            f'{options["requests"]} requests, '
+            f'{options["concurrency"]} concurrent clients, '
+            f'{options["workers"]} workers'
+        )
+        self.stdout.write(
+            'server | requests | errors | req/s | p50 ms | p95 ms | p99 ms'
+        )
+        for server, summary in results.items():
+            self.stdout.write(
+                f'{server} | {summary["requests"]} | {summary["errors"]} | '
+                f'{summary["rps"]} | {summary["p50"]} | {summary["p95"]} | '
+                f'{summary["p99"]}'
+            )
@@ -0,0 +1,339 @@
+import json
+import random
+import subprocess
+import time
+from itertools import accumulate, count
+from urllib.parse import urlencode
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import Category, Comment, Genre, Review, Title
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import User
+
+from api.benchmark import (compare, run_load, summarize_results,
+                           wait_for_server)
+from api_yamdb.settings import BASE_DIR
+
+USER_PREFIX = 'benchmark_user'
+SIGNUP_PREFIX = 'benchmark_signup'
+POPULAR_TITLES = 1000
+COMMENTED_REVIEWS = 1000
+# Route of the mix and its share of the requests.
+MIX = (
+    ('titles-list', 15),
+    ('titles-filter', 15),
+    ('titles-detail', 15),
+    ('reviews-list', 15),
+    ('reviews-page', 10),
+    ('comments-list', 10),
+    ('catalog-list', 6),
+    ('reviews-create', 4),
+    ('comments-create', 4),
+    ('auth-signup', 3),
+    ('auth-token', 3),
+)
+
+
+def zipf_weights(size):
+    """Return cumulative weights that favour the first items."""
+    return tuple(accumulate(1 / rank for rank in range(1, size + 1)))
+
+
+def current_commit():
+    """Return the commit of the working tree or None outside git."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class TrafficMix:
+    """
+    Requests of the benchmark drawn from the seeded database.
+    Anonymous reads favour popular titles, writes come from dedicated
+    benchmark users whose reviews and comments are deleted before
+    every run, so every (author, title) pair of new reviews is free.
+    """
+
+    def __init__(self, rng, users):
+        self.rng = rng
+        self.users = self.prepare_users(users)
+        self.titles = list(
+            Title.objects.order_by('-rating_count', 'id').values_list(
+                'id', 'rating_count', 'name', 'year'
+            )[:POPULAR_TITLES]
+        )
+        if not self.titles:
+            raise CommandError('The benchmark needs a seeded database')
+        self.title_weights = zipf_weights(len(self.titles))
+        self.reviews = list(
+            Review.objects.filter(
+                title_id__in=[title[0] for title in self.titles[:100]]
+            ).values_list('title_id', 'id')[:COMMENTED_REVIEWS]
+        )
+        self.categories = list(Category.objects.values_list('slug', flat=True))
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.tokens = [
+            {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+            for user in self.users
+        ]
+        self.codes = [
+            (user.username, default_token_generator.make_token(user))
+            for user in self.users
+        ]
+        self.new_reviews = count()
+        self.signups = count()
+
+    def prepare_users(self, size):
+        """Return the benchmark users without reviews and comments."""
+        User.objects.filter(username__startswith=SIGNUP_PREFIX).delete()
+        users = [
+            User.objects.get_or_create(
+                username=f'{USER_PREFIX}{number}',
+                defaults={'email': f'{USER_PREFIX}{number}@yamdb.fake'},
+            )[0]
+            for number in range(size)
+        ]
+        Review.objects.filter(author__in=users).delete()
+        Comment.objects.filter(author__in=users).delete()
+        return users
+
+    def title(self):
+        return self.rng.choices(self.titles, cum_weights=self.title_weights)[0]
+
+    def titles_list(self):
+        return 'GET', '/api/v1/titles/', None, None
+
+    def titles_filter(self):
+        _, _, name, year = self.title()
+        filters = [
+            [('year', year)],
+            [('name', name.split()[0])],
+            [('year_min', year - 5), ('year_max', year + 5)],
+        ]
+        if self.categories:
+            filters.append([('category', self.rng.choice(self.categories))])
+        if self.genres:
+            genres = ','.join(self.rng.sample(
+                self.genres, min(2, len(self.genres))
+            ))
+            filters.append([('genre', self.rng.choice(self.genres))])
+            filters.append([('genre', genres)])
+            filters.append([('genre_all', genres)])
+        query = urlencode(self.rng.choice(filters))
+        return 'GET', f'/api/v1/titles/?{query}', None, None
+
+    def titles_detail(self):
+        return 'GET', f'/api/v1/titles/{self.title()[0]}/', None, None
+
+    def reviews_list(self):
+        return 'GET', f'/api/v1/titles/{self.title()[0]}/reviews/', None, None
+
+    def reviews_page(self):
+        pk, reviews, _, _ = self.title()
+        pages = max(1, -(-reviews // api_settings.PAGE_SIZE))
+        page = self.rng.randint(1, pages)
+        return (
+            'GET', f'/api/v1/titles/{pk}/reviews/?page={page}', None, None
+        )
+
+    def comments_list(self):
+        if not self.reviews:
+            return self.reviews_list()
+        title, review = self.rng.choice(self.reviews)
+        return (
+            'GET', f'/api/v1/titles/{title}/reviews/{review}/comments/',
+            None, None
+        )
+
+    def catalog_list(self):
+        catalog = self.rng.choice(('categories', 'genres'))
+        return 'GET', f'/api/v1/{catalog}/', None, None
+
+    def reviews_create(self):
+        """Every benchmark user reviews the popular titles in turn."""
+        user, title = divmod(next(self.new_reviews), len(self.titles))
+        return (
+            'POST', f'/api/v1/titles/{self.titles[title][0]}/reviews/',
+            self.tokens[user % len(self.tokens)],
+            {
+                'text': 'Отзыв нагрузочного теста',
+                'score': self.rng.randint(1, 10),
+            },
+        )
+
+    def comments_create(self):
+        if not self.reviews:
+            return self.reviews_create()
+        title, review = self.rng.choice(self.reviews)
+        return (
+            'POST', f'/api/v1/titles/{title}/reviews/{review}/comments/',
+            self.rng.choice(self.tokens),
+            {'text': 'Комментарий нагрузочного теста'},
+        )
+
+    def auth_signup(self):
+        number = next(self.signups)
+        return 'POST', '/api/v1/auth/signup/', None, {
+            'username': f'{SIGNUP_PREFIX}{number}',
+            'email': f'{SIGNUP_PREFIX}{number}@yamdb.fake',
+        }
+
+    def auth_token(self):
+        username, code = self.rng.choice(self.codes)
+        return 'POST', '/api/v1/auth/token/', None, {
+            'username': username, 'confirmation_code': code,
+        }
+
+    def request(self, name):
+        """Return the (name, method, path, headers, body) of a route."""
+        method, path, headers, data = getattr(self, name.replace('-', '_'))()
+        headers = dict(headers or {})
+        body = None
+        if data is not None:
+            headers['Content-Type'] = 'application/json'
+            body = json.dumps(data).encode()
+        return name, method, path, headers, body
+
+    def requests(self, size):
+        """Return the requests of the mix in a random order."""
+        names = self.rng.choices(
+            [name for name, _ in MIX],
+            weights=[weight for _, weight in MIX],
+            k=size
+        )
+        return [self.request(name) for name in names]
+
+
+class Command(BaseCommand):
+    """Command to load a running instance with a mix of API traffic."""
+    help = 'Benchmark the API with a weighted mix of requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            dest='url',
+            default='http://127.0.0.1:8000',
+            help='Address of the running instance',
+            type=str,
+        )
+        parser.add_argument(
+            '--concurrency',
+            dest='concurrency',
+            default=32,
+            help='Number of concurrent clients',
+            type=int,
+        )
+        parser.add_argument(
+            '--requests',
+            dest='requests',
+            default=5000,
+            help='Number of requests of the run',
+            type=int,
+        )
+        parser.add_argument(
+            '--warmup',
+            dest='warmup',
+            default=200,
+            help='Number of read requests sent before the run',
+            type=int,
+        )
+        parser.add_argument(
+            '--users',
+            dest='users',
+            default=50,
+            help='Number of benchmark users sending writes',
+            type=int,
+        )
+        parser.add_argument(
+            '--seed',
+            dest='seed',
+            default=1,
+            help='Seed of the request mix',
+            type=int,
+        )
+        parser.add_argument(
+            '--output',
+            dest='output',
+            help='Write the results as JSON into the file',
+            type=str,
+        )
+        parser.add_argument(
+            '--baseline',
+            dest='baseline',
+            help='JSON results of an earlier run to compare with',
+            type=str,
+        )
+
+    def print_results(self, summaries, changes):
+        self.stdout.write(
+            'route | requests | errors | req/s | p50 ms | p95 ms | p99 ms'
+            + (' | req/s % | p95 %' if changes else '')
+        )
+        for name, summary in summaries.items():
+            line = (
+                f'{name} | {summary["requests"]} | {summary["errors"]} | '
+                f'{summary["rps"]} | {summary["p50"]} | {summary["p95"]} | '
+                f'{summary["p99"]}'
+            )
+            if changes and name in changes:
+                line += (
+                    f' | {changes[name]["rps"]} | {changes[name]["p95"]}'
+                )
+            self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        if min(options['concurrency'], options['requests'],
+               options['users']) < 1:
+            raise CommandError(
+                'Concurrency, requests and users must be positive'
+            )
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)['routes']
+
+        base_url = options['url'].rstrip('/')
+        if not wait_for_server(base_url, '/api/v1/categories/'):
+            raise CommandError(f'{base_url} does not answer')
+        mix = TrafficMix(random.Random(options['seed']), options['users'])
+        requests = mix.requests(options['requests'])
+        warmup = [
+            request for request in requests if request[1] == 'GET'
+        ][:options['warmup']]
+        if warmup:
+            run_load(base_url, warmup, options['concurrency'])
+
+        results, elapsed = run_load(
+            base_url, requests, options['concurrency']
+        )
+        summaries = summarize_results(results, elapsed)
+        changes = compare(summaries, baseline) if baseline else None
+        report = {
+            'commit': current_commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'url': base_url,
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'seed': options['seed'],
+            'mix': dict(MIX),
+            'elapsed': round(elapsed, 2),
+            'routes': summaries,
+        }
+        if changes:
+            report['changes'] = changes
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+        self.stdout.write(
+            f'{options["requests"]} requests, '
+            f'{options["concurrency"]} concurrent clients, '
+            f'{elapsed:.2f} s, commit {report["commit"]}'
+        )
+        self.print_results(summaries, changes)
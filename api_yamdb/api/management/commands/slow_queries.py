@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max
+
+from api.models import SlowQuery
+from api.slow_queries import full_scans
+
+
+class Command(BaseCommand):
+    """Command to show the slow queries captured by the API."""
+    help = 'Show the last slow SQL statements with their query plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            dest='limit',
+            default=20,
+            help='Number of statements to show',
+            type=int,
+        )
+        parser.add_argument(
+            '--view',
+            dest='view',
+            help='Only statements of the view class',
+        )
+        parser.add_argument(
+            '--action',
+            dest='action',
+            help='Only statements of the viewset action',
+        )
+        parser.add_argument(
+            '--plans',
+            dest='plans',
+            action='store_true',
+            help='Show the query plans',
+        )
+        parser.add_argument(
+            '--summary',
+            dest='summary',
+            action='store_true',
+            help='Group the statements by view, action and SQL',
+        )
+        parser.add_argument(
+            '--clear',
+            dest='clear',
+            action='store_true',
+            help='Delete the captured statements',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(f'Deleted {deleted} slow queries')
+            return
+        queries = SlowQuery.objects.all()
+        if options['view']:
+            queries = queries.filter(view=options['view'])
+        if options['action']:
+            queries = queries.filter(action=options['action'])
+        if options['summary']:
+            self.write_summary(queries, options['limit'])
+            return
+        for query in queries[:options['limit']]:
+            scans = full_scans(query.plan)
+            self.stdout.write(
+                f'{query.created_at:%Y-%m-%d %H:%M:%S} '
+                f'{query.duration * 1000:8.1f} ms '
+                f'{query.view} {query.action or "-"} '
+                f'{query.method} {query.path}'
+                + (f' full scan: {", ".join(scans)}' if scans else '')
+            )
+            self.stdout.write(f'    {query.sql}')
+            if options['plans'] and query.plan:
+                for line in query.plan.splitlines():
+                    self.stdout.write(f'    | {line}')
+
+    def write_summary(self, queries, limit):
+        """Write the statements grouped by view, action and SQL."""
+        groups = queries.order_by().values('view', 'action', 'sql').annotate(
+            count=Count('id'),
+            average=Avg('duration'),
+            maximum=Max('duration'),
+            plan=Max('plan'),
+        ).order_by('-maximum')
+        for group in groups[:limit]:
+            scans = full_scans(group['plan'])
+            self.stdout.write(
+                f'{group["count"]:5} x {group["average"] * 1000:8.1f} ms '
+                f'avg {group["maximum"] * 1000:8.1f} ms max '
+                f'{group["view"]} {group["action"] or "-"}'
+                + (f' full scan: {", ".join(scans)}' if scans else '')
+            )
+            self.stdout.write(f'    {group["sql"]}')
@@ -0,0 +1,217 @@
+import asyncio
+import ipaddress
+import hmac
+from datetime import timedelta
+from time import perf_counter
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils import timezone
+from django.utils.deprecation import MiddlewareMixin
+
+from api_yamdb.db.pool import pool_stats
+from api_yamdb.metrics import CONTENT_TYPE, registry
+from reviews.cache import CATALOG_CACHES
+from users.outbox import outbox_stats
+
+from .timing import TIMINGS, RequestTimings
+
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+# Window of the email delivery latency.
+EMAIL_LATENCY_WINDOW = timedelta(minutes=5)
+
+REQUESTS = registry.counter(
+    'yamdb_http_requests_total',
+    'Requests by route name, method and status.',
+    ('route', 'method', 'status')
+)
+REQUEST_DURATION = registry.histogram(
+    'yamdb_http_request_duration_seconds',
+    'Request duration by route name, method and status.',
+    ('route', 'method', 'status'), SECONDS_BUCKETS
+)
+DB_QUERIES = registry.histogram(
+    'yamdb_db_queries_per_request',
+    'SQL queries of a request by route name.',
+    ('route',), QUERY_BUCKETS
+)
+DB_DURATION = registry.histogram(
+    'yamdb_db_duration_seconds',
+    'Time of the SQL queries of a request by route name.',
+    ('route',), SECONDS_BUCKETS
+)
+CACHE_REQUESTS = registry.counter(
+    'yamdb_catalog_cache_requests_total',
+    'Catalog cache lookups by catalog and result.',
+    ('catalog', 'result')
+)
+CACHE_HIT_RATIO = registry.gauge(
+    'yamdb_catalog_cache_hit_ratio',
+    'Share of catalog cache lookups served from the cache.',
+    ('catalog',)
+)
+POOL_CONNECTIONS = registry.gauge(
+    'yamdb_db_pool_connections',
+    'Connections of the pools by database alias and state.',
+    ('alias', 'state')
+)
+POOL_WAITS = registry.counter(
+    'yamdb_db_pool_waits_total',
+    'Connection requests that waited for a free connection.',
+    ('alias',)
+)
+POOL_TIMEOUTS = registry.counter(
+    'yamdb_db_pool_timeouts_total',
+    'Connection requests that timed out waiting for a connection.',
+    ('alias',)
+)
+POOL_ACQUIRED = registry.counter(
+    'yamdb_db_pool_acquired_total',
+    'Connections handed out by the pools.',
+    ('alias',)
+)
+POOL_ACQUIRE_SECONDS = registry.counter(
+    'yamdb_db_pool_acquire_seconds_total',
+    'Time spent getting connections from the pools, waits included.',
+    ('alias',)
+)
+POOL_ACQUIRE_MAX = registry.gauge(
+    'yamdb_db_pool_acquire_seconds_max',
+    'Longest time to get a connection in any process.',
+    ('alias',), combine=max
+)
+POOL_SATURATION = registry.gauge(
+    'yamdb_db_pool_saturation',
+    'Share of the pool connections in use in the busiest process.',
+    ('alias',), combine=max
+)
+EMAIL_QUEUE_DEPTH = registry.gauge(
+    'yamdb_email_queue_depth', 'Emails waiting in the outbox.'
+)
+EMAIL_FAILED = registry.gauge(
+    'yamdb_email_failed', 'Emails that ran out of attempts.'
+)
+EMAIL_LATENCY_MAX = registry.gauge(
+    'yamdb_email_delivery_latency_max_seconds',
+    'Longest delivery latency of the emails sent in the last 5 minutes.'
+)
+
+
+def catalog_samples():
+    for model, cache in CATALOG_CACHES.items():
+        catalog = model._meta.model_name
+        stats = cache.stats()
+        yield CACHE_REQUESTS, (catalog, 'hit'), stats['hits']
+        yield CACHE_REQUESTS, (catalog, 'miss'), stats['misses']
+
+
+def pool_samples():
+    for alias, stats in pool_stats().items():
+        yield POOL_CONNECTIONS, (alias, 'in_use'), stats['in_use']
+        yield POOL_CONNECTIONS, (alias, 'idle'), stats['idle']
+        yield POOL_WAITS, (alias,), stats['waits']
+        yield POOL_TIMEOUTS, (alias,), stats['timeouts']
+        yield POOL_ACQUIRED, (alias,), stats['acquired']
+        yield POOL_ACQUIRE_SECONDS, (alias,), stats['acquire_seconds_total']
+        yield POOL_ACQUIRE_MAX, (alias,), stats['acquire_seconds_max']
+        yield POOL_SATURATION, (alias,), stats['saturation']
+
+
+def cache_ratio_samples(samples):
+    """Hit ratio of the catalog caches of all processes."""
+    for model in CATALOG_CACHES:
+        catalog = model._meta.model_name
+        hits = samples.get((CACHE_REQUESTS.name, (catalog, 'hit')), 0)
+        misses = samples.get((CACHE_REQUESTS.name, (catalog, 'miss')), 0)
+        if hits + misses:
+            yield CACHE_HIT_RATIO, (catalog,), hits / (hits + misses)
+
+
+def outbox_samples(samples):
+    stats = outbox_stats(since=timezone.now() - EMAIL_LATENCY_WINDOW)
+    yield EMAIL_QUEUE_DEPTH, (), stats['queue_depth']
+    yield EMAIL_FAILED, (), stats['failed']
+    if stats['latency_max'] is not None:
+        yield EMAIL_LATENCY_MAX, (), stats['latency_max'].total_seconds()
+
+
+registry.process_collectors += [catalog_samples, pool_samples]
+registry.scrape_collectors += [cache_ratio_samples, outbox_samples]
+
+
+def route_name(request):
+    """Return the URL name of the route, not the path with its ids."""
+    match = request.resolver_match
+    return match.view_name if match else 'unmatched'
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Counts every request and records its duration, SQL query count and
+    database time by route name. It has to be the first middleware to
+    measure the others.
+    """
+
+    def start(self):
+        timings = RequestTimings()
+        return timings, TIMINGS.set(timings), perf_counter()
+
+    def finish(self, request, response, timings, started):
+        elapsed = perf_counter() - started
+        route = route_name(request)
+        method = request.method if request.method in METHODS else 'other'
+        labels = (route, method, str(response.status_code))
+        REQUESTS.inc(labels)
+        REQUEST_DURATION.observe(elapsed, labels)
+        DB_QUERIES.observe(timings.queries, (route,))
+        DB_DURATION.observe(timings.durations.get('db', 0.0), (route,))
+        registry.maybe_flush()
+        return response
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            TIMINGS.reset(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        timings, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            TIMINGS.reset(token)
+        return self.finish(request, response, timings, started)
+
+
+def metrics_allowed(request):
+    """
+    Check that the scrape comes from METRICS_ALLOWED_IPS or carries the
+    METRICS_TOKEN bearer token.
+    """
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if token and hmac.compare_digest(header, f'Bearer {token}'):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    )
+
+
+def metrics(request):
+    """Metrics of all server processes in the Prometheus text format."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.exposition(), content_type=CONTENT_TYPE)
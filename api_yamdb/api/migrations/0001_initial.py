@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-18 05:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('view', models.CharField(max_length=255)),
+                ('action', models.CharField(blank=True, max_length=64)),
+                ('method', models.CharField(max_length=16)),
+                ('path', models.CharField(max_length=2048)),
+                ('database', models.CharField(max_length=64)),
+                ('sql', models.TextField()),
+                ('duration', models.FloatField(help_text='Seconds')),
+                ('plan', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name_plural': 'slow queries',
+                'ordering': ('-id',),
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """SQL statement over SLOW_QUERY_THRESHOLD with its query plan."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    view = models.CharField(max_length=255)
+    action = models.CharField(max_length=64, blank=True)
+    method = models.CharField(max_length=16)
+    path = models.CharField(max_length=2048)
+    database = models.CharField(max_length=64)
+    sql = models.TextField()
+    duration = models.FloatField(help_text='Seconds')
+    plan = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ('-id',)
+        verbose_name_plural = 'slow queries'
+
+    def __str__(self):
+        """Return the view, the action and the duration."""
+        return f'{self.view} {self.action} {self.duration * 1000:.0f} ms'
@@ -0,0 +1,148 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the (pub_date, id) pair.
+    Every page is fetched with a range condition on the composite index,
+    so its cost does not depend on how deep the page is.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        self.has_next = self.has_previous = False
+        if self.cursor is None:
+            pub_date, pk, reverse = None, None, False
+        else:
+            pub_date, pk, reverse = self.cursor
+
+        # The OR of the (pub_date, id) comparison is ANDed with the
+        # redundant bound on pub_date, which the planners turn into a
+        # range scan of the index instead of reading all earlier rows.
+        if reverse:
+            queryset = queryset.order_by('-pub_date', '-id')
+            if pub_date is not None:
+                queryset = queryset.filter(
+                    Q(pub_date__lte=pub_date)
+                    & (Q(pub_date__lt=pub_date)
+                       | Q(pub_date=pub_date, id__lt=pk))
+                )
+        else:
+            queryset = queryset.order_by('pub_date', 'id')
+            if pub_date is not None:
+                queryset = queryset.filter(
+                    Q(pub_date__gte=pub_date)
+                    & (Q(pub_date__gt=pub_date)
+                       | Q(pub_date=pub_date, id__gt=pk))
+                )
+
+        self.page = list(queryset[:self.page_size + 1])
+        has_more = len(self.page) > self.page_size
+        self.page = self.page[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def decode_cursor(self, request):
+        """Return (pub_date, id, reverse) from the request or None."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+            pub_date = parse_datetime(data['p'])
+            if pub_date is None:
+                raise ValueError
+            return pub_date, int(data['i']), bool(data['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        """Return the URL of the page that starts after the given object."""
+        data = json.dumps({
+            'p': obj.pub_date.isoformat(),
+            'i': obj.pk,
+            'r': int(reverse),
+        })
+        encoded = base64.urlsafe_b64encode(data.encode('ascii'))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode('ascii')
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return replace_query_param(
+                self.base_url, self.cursor_query_param, ''
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Page number pagination by default.
+    Switches to keyset pagination when the request has a cursor parameter,
+    an empty value requests the first page.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_pagination_class.cursor_query_param in (
+            request.query_params
+        ):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,105 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.viewsets import ViewSetMixin
+from rest_framework_simplejwt.settings import api_settings
+
+from api_yamdb.caches import REPLICAS_CACHE
+from api_yamdb.db.replicas import ROUTING, Routing, choose_replica
+
+from .authentication import CachedJWTAuthentication
+
+authentication = CachedJWTAuthentication()
+
+
+def pin_key(user_id):
+    return f'primary:{user_id}'
+
+
+def token_user_id(request):
+    """Return the user id of the access token without a query."""
+    header = authentication.get_header(request)
+    try:
+        raw_token = header and authentication.get_raw_token(header)
+        if not raw_token:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def is_viewset(view_func):
+    view_class = getattr(view_func, 'cls', None)
+    return view_class is not None and issubclass(view_class, ViewSetMixin)
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Reads of safe-method requests to the API viewsets go to a replica
+    at most DB_REPLICA_MAX_LAG seconds behind the primary. A user who
+    wrote reads the primary for DB_REPLICA_PIN_SECONDS, so they see
+    their own writes. Users are told apart by the access token:
+    anonymous clients only write to sign up and get a token, and
+    their next requests come with the token. The pins are kept in the
+    replicas cache, which must be shared by all workers.
+    """
+
+    def start(self):
+        if not settings.DATABASE_REPLICAS:
+            return None, None
+        routing = Routing()
+        return routing, ROUTING.set(routing)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routing = ROUTING.get()
+        if (
+            routing is None
+            or request.method not in SAFE_METHODS
+            or not is_viewset(view_func)
+        ):
+            return None
+        user_id = token_user_id(request)
+        pins = caches[REPLICAS_CACHE]
+        if user_id is not None and pins.get(pin_key(user_id)):
+            return None
+        routing.read_database = choose_replica()
+        return None
+
+    def finish(self, request, routing):
+        """Pin the user who wrote to the primary."""
+        user = getattr(request, 'user', None)
+        if routing.wrote and user is not None and user.is_authenticated:
+            caches[REPLICAS_CACHE].set(
+                pin_key(user.pk), True, settings.DB_REPLICA_PIN_SECONDS
+            )
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing, token = self.start()
+        if routing is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            ROUTING.reset(token)
+        self.finish(request, routing)
+        return response
+
+    async def __acall__(self, request):
+        routing, token = self.start()
+        if routing is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            ROUTING.reset(token)
+        if routing.wrote:
+            await sync_to_async(self.finish)(request, routing)
+        return response
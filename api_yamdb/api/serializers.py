@@ -1,12 +1,32 @@
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import Value
+from django.db.models.functions import Lower
 from django.utils import timezone
 from rest_framework import serializers
-from rest_framework.validators import UniqueValidator
+from rest_framework.settings import api_settings
+from reviews.cache import CATALOG_CACHES
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
+from .timing import TimedRepresentationMixin
 
-class CategorySerializer(serializers.ModelSerializer):
+
+class CatalogSlugRelatedField(serializers.SlugRelatedField):
+    """Slug field that resolves categories and genres via their cache."""
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        try:
+            return CATALOG_CACHES[model].get_by_slug(str(data))
+        except model.DoesNotExist:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field, value=str(data)
+            )
+
+
+class CategorySerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """Class for converting category data."""
 
     class Meta:
@@ -17,7 +37,9 @@ class CategorySerializer(serializers.ModelSerializer):
         )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """Class for converting genre data."""
 
     class Meta:
@@ -28,7 +50,9 @@ class GenreSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleSerializerGet(serializers.ModelSerializer):
+class TitleSerializerGet(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """Class for converting product data with the GET method."""
 
     category = CategorySerializer(many=False, read_only=True)
@@ -37,25 +61,27 @@ class TitleSerializerGet(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'version', 'modified')
         read_only_fields = ('rating',)
 
 
-class TitleSerializerCreateAndUpdate(serializers.ModelSerializer):
+class TitleSerializerCreateAndUpdate(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """
     Class for converting product data in the CREATE and UPDATE methods.
     """
 
-    category = serializers.SlugRelatedField(
+    category = CatalogSlugRelatedField(
         slug_field='slug', queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
+    genre = CatalogSlugRelatedField(
         queryset=Genre.objects.all(), slug_field='slug', many=True
     )
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'version', 'modified')
 
     def validate_year(self, value):
         """Validate that the year value is correct."""
@@ -68,7 +94,9 @@ class TitleSerializerCreateAndUpdate(serializers.ModelSerializer):
         return value
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """
     Serializer for Review instances.
     """
@@ -89,20 +117,32 @@ class ReviewSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('author',)
 
-    def validate(self, data):
-        """Validate the unique author and title pair."""
-        if self.context['request'].method == 'POST' and Review.objects.filter(
-            title_id=self.context['view'].kwargs.get('title_id'),
-            author=self.context['request'].user
-        ).exists():
-            raise serializers.ValidationError(
+    def create(self, validated_data):
+        """
+        Re-define method to rely on the unique_review constraint:
+        a second review of the title fails on insert instead of
+        being looked up beforehand. Other integrity errors, such as
+        a title deleted meanwhile, are not reported as a second review.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author'],
+            ).exists():
+                raise
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
                 'Вы уже оставили отзыв на это произведение.'
-            )
+            ]
+        })
 
-        return data
 
-
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """
     Serializer for Comment instances.
     """
@@ -122,7 +162,9 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('review',)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(
+    TimedRepresentationMixin, serializers.ModelSerializer
+):
     """
     Serializer for User instances.
     """
@@ -130,22 +172,15 @@ class UserSerializer(serializers.ModelSerializer):
         regex=r'^[\w.@+-]+\Z',
         max_length=150,
         required=True,
-        validators=[
-            UniqueValidator(
-                queryset=User.objects.all(),
-                message='Пользователь с таким именем уже существует.'
-            )
-        ])
+    )
     email = serializers.EmailField(
         max_length=254,
         required=True,
-        validators=[
-            UniqueValidator(
-                queryset=User.objects.all(),
-                message='Пользователь с таким email-адресом уже существует.'
-            )
-        ]
     )
+    unique_messages = {
+        'username': 'Пользователь с таким именем уже существует.',
+        'email': 'Пользователь с таким email-адресом уже существует.',
+    }
 
     class Meta:
         fields = (
@@ -159,6 +194,37 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         lookup_field = 'username'
 
+    def save(self, **kwargs):
+        """
+        Re-define method to rely on the case-insensitive unique indexes
+        of usernames and emails: a clash fails on write and is reported
+        on the field instead of being looked up beforehand.
+        """
+        if not self.unique_messages.keys() & self.validated_data.keys():
+            return super().save(**kwargs)
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            errors = self.unique_errors()
+            if not errors:
+                raise
+        raise serializers.ValidationError(errors)
+
+    def unique_errors(self):
+        """Return the errors of the fields another user already holds."""
+        others = User.objects.all()
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        return {
+            name: [message]
+            for name, message in self.unique_messages.items()
+            if name in self.validated_data
+            and others.annotate(value=Lower(name)).filter(
+                value=Lower(Value(self.validated_data[name]))
+            ).exists()
+        }
+
 
 class UserEditSerializer(UserSerializer):
     """
@@ -168,7 +234,9 @@ class UserEditSerializer(UserSerializer):
         read_only_fields = ('role',)
 
 
-class SignUpSerializer(serializers.Serializer):
+class SignUpSerializer(
+    TimedRepresentationMixin, serializers.Serializer
+):
     """
     Serializer for Signing up.
     """
@@ -194,30 +262,30 @@ class SignUpSerializer(serializers.Serializer):
 
         return value
 
-    def validate(self, data):
+    def create(self, validated_data):
         """
-        Validate username and email.
-        If email and username match then API gives another token.
-        If eiher email or username already exists
-        then API gives Validation Error.
+        Insert the user unless the case-insensitive unique indexes
+        already hold its username or email, then fetch it. A repeated
+        sign up with the same username and email returns the existing
+        user, any other clash is a validation error.
         """
-        if User.objects.filter(username=data['username'],
-                               email=data['email']).exists():
-
-            return data
-
-        if User.objects.filter(
-                Q(username__iexact=data['username'])
-                | Q(email__iexact=data['email'])
-        ):
-            raise serializers.ValidationError(
-                'Пользователь с таким именем или email существует'
-            )
+        User.objects.bulk_create(
+            [User(**validated_data)], ignore_conflicts=True
+        )
+        user = User.objects.filter(**validated_data).first()
+        if user is None:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Пользователь с таким именем или email существует'
+                ]
+            })
 
-        return data
+        return user
 
 
-class TokenSerializer(serializers.Serializer):
+class TokenSerializer(
+    TimedRepresentationMixin, serializers.Serializer
+):
     """
     Serializer for Creating Token.
     """
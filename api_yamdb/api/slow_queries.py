@@ -0,0 +1,196 @@
+import asyncio
+import logging
+from contextvars import ContextVar
+from functools import partial
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils.deprecation import MiddlewareMixin
+
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+# Slow statements of the request being served as
+# (database alias, sql, params, seconds).
+CAPTURED = ContextVar('slow_queries', default=None)
+# Last EXPLAIN time of a statement in this process.
+explained = {}
+MAX_EXPLAINED = 1000
+
+
+def capture_slow_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper keeping the statements of the request
+    that took longer than SLOW_QUERY_THRESHOLD seconds.
+    """
+    captured = CAPTURED.get()
+    if captured is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = perf_counter() - started
+        if duration >= settings.SLOW_QUERY_THRESHOLD and not many:
+            captured.append(
+                (context['connection'].alias, sql, params, duration)
+            )
+
+
+def install_slow_query_capture(sender, connection, **kwargs):
+    if capture_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(capture_slow_query)
+
+
+def should_explain(sql):
+    """
+    EXPLAIN ANALYZE runs the statement once more, so a statement
+    is explained at most once per SLOW_QUERY_EXPLAIN_INTERVAL.
+    """
+    now = monotonic()
+    if now - explained.get(sql, -float('inf')) < (
+        settings.SLOW_QUERY_EXPLAIN_INTERVAL
+    ):
+        return False
+    if len(explained) >= MAX_EXPLAINED:
+        explained.clear()
+    explained[sql] = now
+    return True
+
+
+def sqlite_plan(rows):
+    """Format EXPLAIN QUERY PLAN rows as an indented tree."""
+    depths = {}
+    lines = []
+    for node, parent, _, detail in rows:
+        depths[node] = depths.get(parent, -1) + 1
+        lines.append(f'{"  " * depths[node]}{detail}')
+    return '\n'.join(lines)
+
+
+def explain(alias, sql, params):
+    """
+    Return the query plan of the statement. On PostgreSQL reads are
+    run with EXPLAIN (ANALYZE, BUFFERS); writes are only planned, as
+    ANALYZE would apply them again.
+    """
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        analyze = sql.lstrip().upper().startswith('SELECT')
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze else 'EXPLAIN '
+    elif connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        return ''
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except DatabaseError as error:
+        return f'EXPLAIN failed: {error}'
+    if connection.vendor == 'sqlite':
+        return sqlite_plan(rows)
+    return '\n'.join(row[0] for row in rows)
+
+
+def view_and_action(request):
+    """Return the DRF view class name and the viewset action."""
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched', ''
+    callback = match.func
+    view_class = getattr(callback, 'cls', None)
+    view = view_class.__name__ if view_class else match.view_name
+    actions = getattr(callback, 'actions', None) or {}
+    return view, actions.get(request.method.lower(), '')
+
+
+def save_slow_queries(request, captured):
+    """Explain the statements and keep the last SLOW_QUERY_LOG_SIZE."""
+    view, action = view_and_action(request)
+    newest = None
+    for alias, sql, params, duration in captured:
+        newest = SlowQuery.objects.create(
+            view=view,
+            action=action,
+            method=request.method,
+            path=request.path[:2048],
+            database=alias,
+            sql=sql,
+            duration=duration,
+            plan=explain(alias, sql, params) if should_explain(sql) else '',
+        )
+    if newest is not None:
+        SlowQuery.objects.filter(
+            id__lte=newest.id - settings.SLOW_QUERY_LOG_SIZE
+        ).delete()
+
+
+class SlowQueryMiddleware(MiddlewareMixin):
+    """
+    Keeps the statements slower than SLOW_QUERY_THRESHOLD seconds with
+    the view and action that ran them and their query plans in the
+    SlowQuery table, a ring of SLOW_QUERY_LOG_SIZE rows. Plans are
+    taken once the response is sent, when the server closes it, so
+    the client does not wait for the EXPLAIN.
+    """
+
+    def start(self):
+        if settings.SLOW_QUERY_LOG_SIZE <= 0:
+            return None, None
+        captured = []
+        return captured, CAPTURED.set(captured)
+
+    def finish(self, request, response, captured):
+        if captured:
+            # The WSGI and ASGI handlers close the response after its
+            # last byte is sent, the test client right after the view.
+            response._resource_closers.append(
+                partial(self.save, request, captured)
+            )
+
+    def save(self, request, captured):
+        try:
+            save_slow_queries(request, captured)
+        except DatabaseError:
+            logger.exception('Could not save the slow queries')
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        captured, token = self.start()
+        if captured is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            CAPTURED.reset(token)
+        self.finish(request, response, captured)
+        return response
+
+    async def __acall__(self, request):
+        captured, token = self.start()
+        if captured is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            CAPTURED.reset(token)
+        self.finish(request, response, captured)
+        return response
+
+
+def full_scans(plan):
+    """Return the tables read without an index in the query plan."""
+    tables = []
+    for line in plan.splitlines():
+        line = line.strip().lstrip('->').strip()
+        if line.startswith('Seq Scan on '):
+            tables.append(line.split()[3])
+        elif line.startswith('SCAN ') and 'USING' not in line:
+            # SCAN TABLE reviews_title before SQLite 3.36.
+            words = line.split()
+            tables.append(words[2] if words[1] == 'TABLE' else words[1])
+    return tables
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+import random
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Timings of the request being served. Worker threads of sync_to_async
+# get a copy of the context, so they share the object.
+TIMINGS = ContextVar('request_timings', default=None)
+# Server-Timing metric names in the order of the header.
+METRICS = ('auth', 'queryset', 'serializer', 'render', 'db')
+
+
+class RequestTimings:
+    """
+    Durations in seconds and the query count of one request. Every
+    request counts its queries for the metrics, only detailed ones
+    time the parts of the view for Server-Timing.
+    """
+
+    __slots__ = ('durations', 'queries', 'running', 'detailed')
+
+    def __init__(self, detailed=False):
+        self.durations = {}
+        self.queries = 0
+        self.detailed = detailed
+        # Metrics being timed, nested calls of a metric are not counted.
+        self.running = set()
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def header(self, total):
+        """Return the Server-Timing header value in milliseconds."""
+        metrics = [
+            f'{name};dur={self.durations[name] * 1000:.2f}'
+            for name in METRICS
+            if name in self.durations
+        ]
+        metrics.append(f'queries;desc="{self.queries}"')
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(metrics)
+
+    def log_record(self, request, response, total):
+        """Return the fields of the structured log line."""
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'queries': self.queries,
+        }
+        for name in METRICS:
+            record[f'{name}_ms'] = round(
+                self.durations.get(name, 0.0) * 1000, 2
+            )
+        return record
+
+
+def timed(name):
+    """Decorator adding the duration of calls to the request timings."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            timings = TIMINGS.get()
+            if (
+                timings is None or not timings.detailed
+                or name in timings.running
+            ):
+                return function(*args, **kwargs)
+            timings.running.add(name)
+            started = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings.running.discard(name)
+                timings.add(name, perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding the query to the request timings."""
+    timings = TIMINGS.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.add('db', perf_counter() - started)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    Add the execute wrapper to every new connection. The wrapper list
+    belongs to the connection object of the thread and survives
+    reconnects, so it is added once.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def is_sampled():
+    rate = settings.SERVER_TIMING_SAMPLE_RATE
+    return rate >= 1 or rate > 0 and random.random() < rate
+
+
+class ServerTimingMiddleware(MiddlewareMixin):
+    """
+    Measures a sample of requests and reports the time spent in
+    authentication and permissions, get_queryset, serializers,
+    renderers and the database in the Server-Timing header and
+    a JSON log line of the api.timing logger. Requests out of
+    the sample only pay for a context variable lookup per query.
+    """
+
+    def start(self, request):
+        if not is_sampled():
+            return None, None
+        timings = TIMINGS.get()
+        if timings is not None:
+            # Started by MetricsMiddleware, which resets it.
+            timings.detailed = True
+            return timings, None
+        timings = RequestTimings(detailed=True)
+        return timings, TIMINGS.set(timings)
+
+    def reset(self, token):
+        if token is not None:
+            TIMINGS.reset(token)
+
+    def finish(self, request, response, timings, token, started):
+        total = perf_counter() - started
+        self.reset(token)
+        response['Server-Timing'] = timings.header(total)
+        logger.info(json.dumps(timings.log_record(request, response, total)))
+        return response
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = self.start(request)
+        if timings is None:
+            return self.get_response(request)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self.reset(token)
+            raise
+        return self.finish(request, response, timings, token, started)
+
+    async def __acall__(self, request):
+        timings, token = self.start(request)
+        if timings is None:
+            return await self.get_response(request)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            self.reset(token)
+            raise
+        return self.finish(request, response, timings, token, started)
+
+
+class TimedViewMixin:
+    """Times authentication with permissions and get_queryset of a view."""
+
+    def __init_subclass__(cls, **kwargs):
+        # Viewsets override get_queryset without calling super.
+        super().__init_subclass__(**kwargs)
+        if 'get_queryset' in vars(cls):
+            cls.get_queryset = timed('queryset')(vars(cls)['get_queryset'])
+
+    @timed('auth')
+    def initial(self, request, *args, **kwargs):
+        return super().initial(request, *args, **kwargs)
+
+    @timed('queryset')
+    def get_queryset(self):
+        return super().get_queryset()
+
+
+class TimedRepresentationMixin:
+    """
+    Times to_representation of the outermost serializer.
+    Items of a list are timed one by one, nested serializers
+    count towards their parent.
+    """
+
+    @timed('serializer')
+    def to_representation(self, instance):
+        return super().to_representation(instance)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSON renderer reporting its time to the request timings."""
+
+    @timed('render')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(data, accepted_media_type, renderer_context)
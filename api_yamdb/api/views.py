@@ -5,9 +5,7 @@ from api.serializers import (CategorySerializer, CommentSerializer,
                              TitleSerializerGet, TokenSerializer,
                              UserEditSerializer, UserSerializer)
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
@@ -16,16 +14,22 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.cache import CATALOG_CACHES
+from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
+from users.outbox import enqueue_email
 
 from api_yamdb.settings import DEFAULT_EMAIL
 
+from .conditional import ConditionalGetMixin, ConditionalListMixin
+from .pagination import PageNumberOrKeysetPagination
 from .permissions import (AuthorAdminModeratorOrReadOnly, IsAdminOnly,
                           IsAdminOrReadOnly)
+from .timing import TimedViewMixin
 
 
 class CategoryAndGenreMixin(
+    TimedViewMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -37,6 +41,35 @@ class CategoryAndGenreMixin(
     search_fields = ['=name']
     lookup_field = 'slug'
 
+    def get_catalog_cache(self):
+        """Return the cache of the catalog served by the viewset."""
+        return CATALOG_CACHES[self.queryset.model]
+
+    def list(self, request, *args, **kwargs):
+        """Re-define method to serve the list from the catalog cache."""
+        data, hit = self.get_catalog_cache().get_or_set(
+            request.build_absolute_uri(),
+            lambda: super(CategoryAndGenreMixin, self).list(
+                request, *args, **kwargs
+            ).data
+        )
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+
+        return response
+
+    def get_object(self):
+        """Re-define method to look the slug up in the catalog cache."""
+        try:
+            obj = self.get_catalog_cache().get_by_slug(
+                self.kwargs[self.lookup_field]
+            )
+        except self.queryset.model.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+
+        return obj
+
 
 class CategoryViewSet(CategoryAndGenreMixin):
     """Class for working with categories."""
@@ -54,12 +87,12 @@ class GenreViewSet(CategoryAndGenreMixin):
     permission_classes = [IsAdminOrReadOnly]
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    TimedViewMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """Class for working with works."""
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by('id')
+    queryset = Title.objects.select_related('category').order_by('id')
     http_method_names = ['get', 'post', 'delete', 'patch']
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = (DjangoFilterBackend, )
@@ -73,8 +106,77 @@ class TitleViewSet(viewsets.ModelViewSet):
 
         return TitleSerializerGet
 
+    def list(self, request, *args, **kwargs):
+        """
+        Re-define method to paginate title ids first and then load
+        category and genres only for the titles of the current page.
+        """
+        ids = self.filter_queryset(
+            self.get_queryset()
+        ).values_list('id', flat=True)
+        page = self.paginate_queryset(ids)
+        titles = self.get_titles(page if page is not None else list(ids))
+        serializer = self.get_serializer(titles, many=True)
+        if page is not None:
+
+            return self.get_paginated_response(serializer.data)
+
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Re-define method to answer conditional requests."""
+        title = self.get_object()
+
+        return self.conditional_response(
+            title, lambda: Response(self.get_serializer(title).data)
+        )
+
+    def get_titles(self, ids):
+        """
+        Return titles with related data in the order of the given ids.
+        Titles deleted after the ids were read are skipped.
+        """
+        titles = self.get_queryset().prefetch_related('genre').in_bulk(ids)
+
+        return [titles[title_id] for title_id in ids if title_id in titles]
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class NestedParentMixin:
+    """
+    Resolves the parents of nested review and comment routes
+    once per request and shares them with the serializer.
+    A review is loaded together with its title in one query
+    and must belong to the title of the route.
+    """
+
+    def get_title(self):
+        """Return the title of the route."""
+        if not hasattr(self, '_title'):
+            if 'review_id' in self.kwargs:
+                self._title = self.get_review().title
+            else:
+                self._title = get_object_or_404(
+                    Title, id=self.kwargs.get('title_id')
+                )
+
+        return self._title
+
+    def get_review(self):
+        """Return the review of the route and its title."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+
+        return self._review
+
+
+class ReviewViewSet(
+    TimedViewMixin, NestedParentMixin, ConditionalListMixin,
+    viewsets.ModelViewSet
+):
     """
     A ViewSet for managing reviews.
     The viewset provides re-defined `perform_create()` and `get_queryset()`
@@ -82,23 +184,34 @@ class ReviewViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ReviewSerializer
     permission_classes = [AuthorAdminModeratorOrReadOnly]
+    pagination_class = PageNumberOrKeysetPagination
 
     def get_queryset(self):
-        """Re-define method to return only reviews belonging to the post."""
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        """
+        Re-define method to return only reviews belonging to the title.
+        Single reviews are filtered by the title id, so a missing title
+        or review is found by the same query.
+        """
+        if self.detail:
+
+            return Review.objects.select_related('author').filter(
+                title_id=self.kwargs.get('title_id')
+            )
 
-        return title.reviews.select_related('author')
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
         """Re-define method to set review's author and title automatically."""
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
         serializer.save(
             author=self.request.user,
-            title=title
+            title=self.get_title()
         )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    TimedViewMixin, NestedParentMixin, ConditionalListMixin,
+    viewsets.ModelViewSet
+):
     """
     A ViewSet for managing comments.
     The viewset provides re-defined `perform_create()` and `get_queryset()`
@@ -106,19 +219,27 @@ class CommentViewSet(viewsets.ModelViewSet):
     """
     serializer_class = CommentSerializer
     permission_classes = [AuthorAdminModeratorOrReadOnly]
+    pagination_class = PageNumberOrKeysetPagination
 
     def get_queryset(self):
-        """Re-define method to return only comments belonging to the post."""
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
+        """
+        Re-define method to return only comments belonging to the review
+        of the title.
+        """
+        if self.detail:
+
+            return Comment.objects.select_related('author').filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id'),
+            )
 
-        return review.comments.select_related('author')
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
         """Re-define method to set comment's author and post automatically."""
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
         serializer.save(
             author=self.request.user,
-            review=review
+            review=self.get_review()
         )
 
 
@@ -128,18 +249,9 @@ def create_user(request):
     """Re-define method to sign up"""
     serializer = SignUpSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    try:
-        user, create = User.objects.get_or_create(
-            **serializer.validated_data)
-    except IntegrityError:
-
-        return Response(
-            'Ошибка данных. Проверьте поле login или email!',
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    user = serializer.save()
     confirmation_code = default_token_generator.make_token(user)
-    user.save()
-    send_mail(
+    enqueue_email(
         subject='Ваш код подтверждения',
         message=f'Код подтверждения:{confirmation_code}',
         from_email=DEFAULT_EMAIL,
@@ -174,7 +286,7 @@ def create_token(request):
     )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(TimedViewMixin, viewsets.ModelViewSet):
     """Viewset for managing users."""
     queryset = User.objects.all()
     serializer_class = UserSerializer
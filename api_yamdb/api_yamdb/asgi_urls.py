@@ -0,0 +1,10 @@
+"""
+URL configuration of the ASGI server.
+The same routes as api_yamdb.urls, with the public read routes
+served by async views.
+"""
+from api.async_views import async_read_urlpatterns
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = async_read_urlpatterns(wsgi_urlpatterns)
@@ -0,0 +1,50 @@
+"""
+Caches whose entries every process of the deployment must see: an
+invalidation or a marker written by one worker or container is read
+by the others, which a per-process cache would never show them.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Backends keeping their entries outside the process and container.
+SHARED_CACHE_BACKENDS = (
+    'django.core.cache.backends.db.DatabaseCache',
+    'django.core.cache.backends.memcached.MemcachedCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+)
+
+
+# Users pinned to the primary after a write: a worker that did not
+# see the pin would read from a replica that misses the write.
+REPLICAS_CACHE = 'replicas'
+
+
+def shared_caches():
+    """
+    Return the aliases of SHARED_CACHES, with the replicas cache
+    whenever replicas are configured.
+    """
+    aliases = list(settings.SHARED_CACHES)
+    if settings.DATABASE_REPLICAS and REPLICAS_CACHE not in aliases:
+        aliases.append(REPLICAS_CACHE)
+    return aliases
+
+
+def unshared_caches():
+    """Return the shared_caches aliases with a per-process backend."""
+    return [
+        alias for alias in shared_caches()
+        if settings.CACHES[alias]['BACKEND'] not in SHARED_CACHE_BACKENDS
+    ]
+
+
+def check_shared_caches():
+    """Refuse to start when a cache that must be shared is not."""
+    unshared = unshared_caches()
+    if unshared:
+        raise ImproperlyConfigured(
+            f'The caches {", ".join(unshared)} must be shared by all '
+            f'processes: set <NAME>_CACHE_BACKEND=memcached, or db and '
+            f'run createcachetable'
+        )
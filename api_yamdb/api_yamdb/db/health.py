@@ -0,0 +1,38 @@
+import select
+
+from django.db import connections
+
+
+def is_alive(connection):
+    """
+    Check an idle psycopg2 connection without a round trip.
+    The server writes to an idle connection only when it terminates it,
+    so a readable socket means the connection is gone. poll() takes
+    descriptors above FD_SETSIZE (1024), unlike select().
+    """
+    if connection.closed:
+        return False
+    poller = select.poll()
+    try:
+        poller.register(connection.fileno(), select.POLLIN)
+        events = poller.poll(0)
+    except (OSError, ValueError):
+        return False
+    return not events
+
+
+def check_connections(**kwargs):
+    """
+    Close persistent PostgreSQL connections dropped by the server,
+    so the request opens a new one instead of failing on the first query.
+    Enabled by CONN_HEALTH_CHECKS of the database settings.
+    """
+    for connection in connections.all():
+        if (
+            connection.vendor == 'postgresql'
+            and connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and connection.connection is not None
+            and not connection.in_atomic_block
+            and not is_alive(connection.connection)
+        ):
+            connection.close()
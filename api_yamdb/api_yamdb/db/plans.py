@@ -0,0 +1,102 @@
+"""
+Query plans reduced to the way every table is read: sequentially,
+through an index or by primary key, with the estimated cost on
+PostgreSQL. Used by the index audit and the query plan tests.
+"""
+import json
+
+SEQUENTIAL = 'seq scan'
+PRIMARY_KEY = 'primary key'
+PG_INDEX_NODES = {'Index Scan', 'Index Only Scan'}
+PG_SORT_NODES = {'Sort', 'Incremental Sort'}
+
+
+def bitmap_indexes(node):
+    """Return the indexes read by the bitmap scans under the node."""
+    for child in node.get('Plans', ()):
+        if child['Node Type'] == 'Bitmap Index Scan':
+            yield child['Index Name']
+        else:
+            yield from bitmap_indexes(child)
+
+
+def postgresql_plan(connection, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]['Plan']
+    access = []
+    lines = []
+
+    def walk(node, depth):
+        node_type = node['Node Type']
+        table = node.get('Relation Name')
+        if node_type == 'Seq Scan':
+            access.append([table, SEQUENTIAL])
+        elif node_type in PG_INDEX_NODES:
+            access.append([table, f'index {node["Index Name"]}'])
+        elif node_type == 'Bitmap Heap Scan':
+            indexes = ','.join(sorted(bitmap_indexes(node)))
+            access.append([table, f'index {indexes}'])
+        lines.append(' '.join(filter(None, (
+            '  ' * depth + node_type, table, node.get('Index Name')
+        ))))
+        for child in node.get('Plans', ()):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return access, root['Total Cost'], lines
+
+
+def sqlite_plan(connection, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        rows = cursor.fetchall()
+    access = []
+    lines = []
+    depths = {}
+    for node, parent, _, detail in rows:
+        depths[node] = depths.get(parent, -1) + 1
+        lines.append('  ' * depths[node] + detail)
+        words = detail.replace(' TABLE ', ' ').split()
+        if words[0] not in ('SCAN', 'SEARCH') or len(words) < 2:
+            continue
+        table = words[1]
+        if 'USING' not in words:
+            access.append([table, SEQUENTIAL])
+        elif 'PRIMARY' in words:
+            access.append([table, PRIMARY_KEY])
+        else:
+            index = words[words.index('INDEX') + 1]
+            access.append([table, f'index {index}'])
+    return access, None, lines
+
+
+def explain(connection, sql, params):
+    """
+    Return the [table, access] pairs, the estimated cost (None on
+    SQLite) and the plan lines of the statement.
+    """
+    if connection.vendor == 'postgresql':
+        return postgresql_plan(connection, sql, params)
+    return sqlite_plan(connection, sql, params)
+
+
+def used_indexes(access):
+    """Return the names of the indexes in the access pairs."""
+    return {
+        name
+        for _, path in access if path.startswith('index ')
+        for name in path[len('index '):].split(',')
+    }
+
+
+def has_sort(lines):
+    """Check that the plan sorts rows instead of reading them in order."""
+    return any(
+        'TEMP B-TREE FOR ORDER BY' in line
+        or line.strip() in PG_SORT_NODES
+        for line in lines
+    )
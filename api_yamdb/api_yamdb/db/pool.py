@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of database connections of one process.
+    At most size connections are handed out at once, further callers
+    wait up to timeout seconds for one of them to come back.
+    Idle connections are reused newest first and dropped when check
+    reports them dead; release hands them to reset, which returns
+    False for connections that must be closed instead of kept.
+    """
+
+    def __init__(self, size, timeout, check, reset):
+        self.size = size
+        self.timeout = timeout
+        self.check = check
+        self.reset = reset
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.idle = deque()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquired = 0
+        self.created = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.acquire_seconds_total = 0.0
+        self.acquire_seconds_max = 0.0
+
+    def acquire(self, connect):
+        """Return an idle connection or a new one made by connect."""
+        started = time.perf_counter()
+        waited = not self.slots.acquire(blocking=False)
+        if waited and not self.slots.acquire(timeout=self.timeout):
+            with self.lock:
+                self.waits += 1
+                self.timeouts += 1
+            logger.warning(
+                'Connection pool exhausted: %s connections in use for %ss',
+                self.size, self.timeout
+            )
+            raise PoolTimeout(
+                f'No free database connection within {self.timeout}s'
+            )
+        try:
+            connection = self.take_idle()
+            created = connection is None
+            if created:
+                connection = connect()
+        except BaseException:
+            self.slots.release()
+            raise
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.acquired += 1
+            self.created += created
+            self.waits += waited
+            self.acquire_seconds_total += elapsed
+            self.acquire_seconds_max = max(self.acquire_seconds_max, elapsed)
+        return connection
+
+    def take_idle(self):
+        """Return a live idle connection or None."""
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection = self.idle.pop()
+            if self.check(connection):
+                return connection
+            close_quietly(connection)
+
+    def release(self, connection):
+        """Give a connection back to the pool."""
+        try:
+            keep = self.reset(connection)
+        except Exception:
+            keep = False
+        if not keep:
+            close_quietly(connection)
+        with self.lock:
+            if keep:
+                self.idle.append(connection)
+            self.in_use -= 1
+        self.slots.release()
+
+    def close(self):
+        """Close the idle connections."""
+        with self.lock:
+            idle, self.idle = self.idle, deque()
+        for connection in idle:
+            close_quietly(connection)
+
+    def stats(self):
+        """Return the usage counters of the pool."""
+        with self.lock:
+            return {
+                'size': self.size,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                'peak_in_use': self.peak_in_use,
+                'saturation': self.in_use / self.size,
+                'acquired': self.acquired,
+                'created': self.created,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'acquire_seconds_total': self.acquire_seconds_total,
+                'acquire_seconds_average': (
+                    self.acquire_seconds_total / self.acquired
+                    if self.acquired else 0.0
+                ),
+                'acquire_seconds_max': self.acquire_seconds_max,
+            }
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+POOLS = {}
+POOLS_LOCK = threading.Lock()
+
+
+def get_pool(alias, settings_dict, check, reset):
+    """
+    Return the pool of the database alias in the current process.
+    Pools are not shared with processes forked after their creation.
+    """
+    key = (alias, os.getpid())
+    pool = POOLS.get(key)
+    if pool is None:
+        with POOLS_LOCK:
+            pool = POOLS.get(key)
+            if pool is None:
+                pool = POOLS[key] = ConnectionPool(
+                    settings_dict['POOL_SIZE'],
+                    settings_dict['POOL_TIMEOUT'],
+                    check,
+                    reset,
+                )
+    return pool
+
+
+def pool_stats():
+    """Return the stats of the pools of the current process by alias."""
+    pid = os.getpid()
+    return {
+        alias: pool.stats()
+        for (alias, pool_pid), pool in list(POOLS.items())
+        if pool_pid == pid
+    }
@@ -0,0 +1,50 @@
+"""
+PostgreSQL backend that takes connections from a pool of the process.
+Selected by settings when DB_POOL_SIZE is positive.
+"""
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from ..health import is_alive
+from ..pool import PoolTimeout, get_pool
+
+
+def reset_connection(connection):
+    """Roll back an unfinished transaction before the connection is kept."""
+    if connection.closed:
+        return False
+    status = connection.get_transaction_status()
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self):
+        return get_pool(
+            self.alias, self.settings_dict, is_alive, reset_connection
+        )
+
+    def get_new_connection(self, conn_params):
+        """Re-define method to take the connection from the pool."""
+        try:
+            connection = self.get_pool().acquire(
+                lambda: super(DatabaseWrapper, self).get_new_connection(
+                    conn_params
+                )
+            )
+        except PoolTimeout as error:
+            raise base.Database.OperationalError(str(error))
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        """Re-define method to give the connection back to the pool."""
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool().release(self.connection)
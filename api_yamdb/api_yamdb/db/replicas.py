@@ -0,0 +1,140 @@
+"""
+Reads of the API from replicas of the primary database. The replica
+middleware chooses the database the reads of a request go to; the
+router sends them there until the request writes or opens a
+transaction, writes always go to the primary.
+"""
+import logging
+import random
+from contextvars import ContextVar
+from time import monotonic
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Routing of the request being served. Worker threads of sync_to_async
+# get a copy of the context, so they share the object.
+ROUTING = ContextVar('replica_routing', default=None)
+# Last lag check of a replica in this process as (time, usable).
+checked = {}
+# App label of the tables of the database cache backend.
+CACHE_APP_LABEL = 'django_cache'
+
+# A standby that replayed everything it received is not behind, even
+# when the primary had no writes since the last replayed transaction,
+# as long as it is still receiving: a standby cut off from the primary
+# has replayed all it received too. The status of the WAL receiver is
+# NULL for roles without pg_read_all_stats, for them only its presence
+# is checked. NULL means the lag is unknown.
+POSTGRESQL_LAG = '''
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN NOT EXISTS (
+        SELECT FROM pg_stat_wal_receiver
+        WHERE status IS NULL OR status = 'streaming'
+    ) THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+'''
+
+
+class Routing:
+    """Database the reads of a request go to and whether it wrote."""
+
+    __slots__ = ('read_database', 'wrote')
+
+    def __init__(self):
+        self.read_database = None
+        self.wrote = False
+
+
+def replica_lag(alias):
+    """
+    Return the seconds the replica is behind the primary, infinity
+    when it is not streaming from the primary. SQLite has no
+    replication: files standing in for replicas are never behind,
+    only the connection is checked.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        connection.ensure_connection()
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRESQL_LAG)
+        lag = cursor.fetchone()[0]
+    return float('inf') if lag is None else float(lag)
+
+
+def is_usable(alias):
+    """
+    Check that the replica answers and is at most DB_REPLICA_MAX_LAG
+    seconds behind. The lag is measured once per
+    DB_REPLICA_CHECK_INTERVAL in a process.
+    """
+    now = monotonic()
+    last = checked.get(alias)
+    if last and now - last[0] < settings.DB_REPLICA_CHECK_INTERVAL:
+        return last[1]
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError as error:
+        logger.warning('Replica %s is unavailable: %s', alias, error)
+        usable = False
+    else:
+        usable = lag <= settings.DB_REPLICA_MAX_LAG
+        if not usable:
+            logger.warning(
+                'Replica %s is %.1f s behind the primary', alias, lag
+            )
+    checked[alias] = (now, usable)
+    return usable
+
+
+def choose_replica():
+    """Return a random usable replica or None to read the primary."""
+    replicas = [
+        alias for alias in settings.DATABASE_REPLICAS if is_usable(alias)
+    ]
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of a request to the replica chosen for it. Reads
+    after a write of the request or inside a transaction go to the
+    primary, as the replica does not have the changes yet. The tables
+    of the database cache are state shared by the workers: they are
+    always read from the primary, and writing them is not a write of
+    the request.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return DEFAULT_DB_ALIAS
+        routing = ROUTING.get()
+        if routing is None or routing.read_database is None:
+            return None
+        if routing.wrote or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return routing.read_database
+
+    def db_for_write(self, model, **hints):
+        routing = ROUTING.get()
+        if routing is not None and model._meta.app_label != CACHE_APP_LABEL:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        """Replicas get the schema from the primary."""
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,311 @@
+"""
+Prometheus metrics shared by the worker processes of a server.
+Every thread records into a dictionary of its own, so recording takes
+no lock. With METRICS_DIR set, every process writes the sum of its
+threads into METRICS_DIR/<pid>.json at most once per
+METRICS_FLUSH_INTERVAL seconds, and a scrape served by any process
+adds up the files of all of them; gauges created with combine=max
+report the highest value of the processes instead.
+"""
+import json
+import math
+import operator
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+ARCHIVE = 'archive.json'
+LOCK_FILE = 'lock'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Metric:
+    """Metric definition recording into the registry of the process."""
+
+    def __init__(self, registry, kind, name, documentation, labels=(),
+                 buckets=(), combine=operator.add):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.combine = combine
+
+    def inc(self, labels=(), amount=1):
+        """Add to a counter."""
+        samples = self.registry.samples()
+        key = (self.name, labels)
+        samples[key] = samples.get(key, 0) + amount
+
+    def observe(self, value, labels=()):
+        """Count a value in its histogram bucket and add it to the sum."""
+        samples = self.registry.samples()
+        key = (self.name, labels)
+        counts = samples.get(key)
+        if counts is None:
+            # Bucket counts, the +Inf bucket and the sum of values.
+            counts = samples[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+def add_sample(samples, key, value, combine=operator.add):
+    """Add a counter value or histogram counts to the samples."""
+    current = samples.get(key)
+    if current is None:
+        samples[key] = list(value) if isinstance(value, list) else value
+    elif isinstance(current, list):
+        for index, count in enumerate(value):
+            current[index] += count
+    else:
+        samples[key] = combine(current, value)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_samples(path):
+    """Return the samples of a process file or an empty dict."""
+    try:
+        with open(path, encoding='utf-8') as samples_file:
+            return {
+                (name, tuple(labels)): value
+                for name, labels, value in json.load(samples_file)
+            }
+    except (OSError, ValueError):
+        return {}
+
+
+def write_samples(path, samples):
+    """Replace the file with the samples in one rename."""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as samples_file:
+        json.dump(
+            [[name, labels, value]
+             for (name, labels), value in samples.items()],
+            samples_file
+        )
+    os.replace(temporary, path)
+
+
+def format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('\n', r'\n')
+            .replace('"', r'\"')
+        )
+        for name, value in zip(names, values)
+    )
+    return f'{{{pairs}}}'
+
+
+class Registry:
+    """
+    Metrics of the process and the collectors of values read on demand.
+    Process collectors report values of this process, such as cache
+    counters, and are written to the process file. Scrape collectors
+    run once per scrape on the merged samples, for values that are the
+    same for every process, such as the email queue depth.
+    """
+
+    def __init__(self, directory=None, flush_interval=None):
+        self._directory = directory
+        self._flush_interval = flush_interval
+        self.metrics = {}
+        self.process_collectors = []
+        self.scrape_collectors = []
+        self.reset()
+        os.register_at_fork(after_in_child=self.reset)
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            return settings.METRICS_DIR
+        return self._directory
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is None:
+            return settings.METRICS_FLUSH_INTERVAL
+        return self._flush_interval
+
+    def reset(self):
+        """Drop the samples, forked workers start from zero."""
+        self.local = threading.local()
+        self.shards = []
+        self.lock = threading.Lock()
+        self.flushed = time.monotonic()
+
+    def metric(self, kind, name, documentation, labels=(), buckets=(),
+               combine=operator.add):
+        metric = Metric(
+            self, kind, name, documentation, labels, buckets, combine
+        )
+        self.metrics[name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self.metric(COUNTER, name, documentation, labels)
+
+    def gauge(self, name, documentation, labels=(), combine=operator.add):
+        """Gauge summed over the processes, or combined with combine."""
+        return self.metric(GAUGE, name, documentation, labels,
+                           combine=combine)
+
+    def histogram(self, name, documentation, labels=(), buckets=()):
+        return self.metric(HISTOGRAM, name, documentation, labels, buckets)
+
+    def samples(self):
+        """Return the samples of the current thread."""
+        try:
+            return self.local.samples
+        except AttributeError:
+            samples = self.local.samples = {}
+            with self.lock:
+                self.shards.append(samples)
+            return samples
+
+    def collect_process(self):
+        """Return the samples of all threads and process collectors."""
+        samples = {}
+        for shard in list(self.shards):
+            for key, value in list(shard.items()):
+                add_sample(samples, key, value)
+        for collector in self.process_collectors:
+            for metric, labels, value in collector():
+                add_sample(
+                    samples, (metric.name, tuple(labels)), value,
+                    metric.combine
+                )
+        return samples
+
+    def flush(self):
+        """Write the samples of the process into its file."""
+        os.makedirs(self.directory, exist_ok=True)
+        write_samples(
+            os.path.join(self.directory, f'{os.getpid()}.json'),
+            self.collect_process()
+        )
+        self.flushed = time.monotonic()
+
+    def maybe_flush(self):
+        """Flush once the interval is over unless another thread does."""
+        if not self.directory:
+            return
+        if time.monotonic() - self.flushed < self.flush_interval:
+            return
+        if self.lock.acquire(blocking=False):
+            try:
+                self.flush()
+            finally:
+                self.lock.release()
+
+    def collect_directory(self):
+        """
+        Return the samples of all process files. Counters and histograms
+        of exited processes are moved into the archive file, their
+        gauges are dropped.
+        """
+        import fcntl
+
+        with open(
+            os.path.join(self.directory, LOCK_FILE), 'a'
+        ) as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            archive_path = os.path.join(self.directory, ARCHIVE)
+            archive = read_samples(archive_path)
+            samples = {}
+            exited = []
+            for name in os.listdir(self.directory):
+                pid, extension = os.path.splitext(name)
+                if extension != '.json' or not pid.isdigit():
+                    continue
+                path = os.path.join(self.directory, name)
+                alive = is_alive(int(pid))
+                if not alive:
+                    exited.append(path)
+                for key, value in read_samples(path).items():
+                    metric = self.metrics.get(key[0])
+                    if metric is None or not alive and metric.kind == GAUGE:
+                        continue
+                    add_sample(
+                        samples if alive else archive, key, value,
+                        metric.combine
+                    )
+            if exited:
+                write_samples(archive_path, archive)
+                for path in exited:
+                    os.remove(path)
+            for key, value in archive.items():
+                add_sample(samples, key, value)
+        return samples
+
+    def collect(self):
+        """Return the samples of all processes and scrape collectors."""
+        if self.directory:
+            with self.lock:
+                self.flush()
+            samples = self.collect_directory()
+        else:
+            samples = self.collect_process()
+        for collector in self.scrape_collectors:
+            for metric, labels, value in collector(samples):
+                add_sample(samples, (metric.name, tuple(labels)), value)
+        return samples
+
+    def exposition(self):
+        """Return the samples in the Prometheus text format."""
+        by_metric = {}
+        for (name, labels), value in self.collect().items():
+            by_metric.setdefault(name, []).append((labels, value))
+        lines = []
+        for metric in self.metrics.values():
+            name = metric.name
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in sorted(by_metric.get(name, ())):
+                label_text = format_labels(metric.labels, labels)
+                if metric.kind != HISTOGRAM:
+                    lines.append(f'{name}{label_text} {format_value(value)}')
+                    continue
+                total = 0
+                for bound, count in zip(
+                    metric.buckets + (math.inf,), value[:-1]
+                ):
+                    total += count
+                    bucket_labels = format_labels(
+                        metric.labels + ('le',),
+                        labels + (format_value(float(bound)),)
+                    )
+                    lines.append(f'{name}_bucket{bucket_labels} {total}')
+                lines.append(f'{name}_sum{label_text} {value[-1]}')
+                lines.append(f'{name}_count{label_text} {total}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
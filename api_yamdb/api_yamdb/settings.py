@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'api',
@@ -36,6 +37,10 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.timing.ServerTimingMiddleware',
+    'api.slow_queries.SlowQueryMiddleware',
+    'api.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -45,7 +50,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'api_yamdb.urls'
+ROOT_URLCONF = os.getenv('ROOT_URLCONF', default='api_yamdb.urls')
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 TEMPLATES = [
@@ -76,10 +81,126 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default=5432)
+        'PORT': os.getenv('DB_PORT', default=5432),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'CONN_HEALTH_CHECKS': (
+            os.getenv('DB_CONN_HEALTH_CHECKS', default='true').lower() == 'true'
+        ),
+        'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', default=0)),
+        'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=10)),
     }
 }
 
+# The pool is a backend of its own, Django 3.2 has no connection pooling.
+POOLED_ENGINES = {
+    'django.db.backends.postgresql': 'api_yamdb.db.postgresql',
+}
+if DATABASES['default']['POOL_SIZE'] > 0:
+    DATABASES['default']['ENGINE'] = POOLED_ENGINES.get(
+        DATABASES['default']['ENGINE'], DATABASES['default']['ENGINE']
+    )
+
+
+def replica_settings(primary, location):
+    """
+    Return the settings of a read replica of the primary database:
+    location is host[:port] of a PostgreSQL standby, or the file of
+    an SQLite database standing in for a replica locally.
+    """
+    replica = dict(primary, TEST={'MIRROR': 'default'})
+    if 'sqlite3' in primary['ENGINE']:
+        replica['NAME'] = location
+    else:
+        host, _, port = location.partition(':')
+        replica['HOST'] = host
+        replica['PORT'] = port or primary['PORT']
+    return replica
+
+
+DATABASE_REPLICAS = []
+for number, location in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = replica_settings(
+        DATABASES['default'], location.strip()
+    )
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api_yamdb.db.replicas.ReplicaRouter']
+
+# Replicas lagging more seconds behind the primary are not read from.
+DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', default=1))
+
+# Seconds a replica lag measurement is reused for in a process.
+DB_REPLICA_CHECK_INTERVAL = float(
+    os.getenv('DB_REPLICA_CHECK_INTERVAL', default=2)
+)
+
+# Seconds the reads of a user stay on the primary after a write.
+# Longer than DB_REPLICA_MAX_LAG + DB_REPLICA_CHECK_INTERVAL, so the
+# user reads their writes from any replica in use afterwards.
+DB_REPLICA_PIN_SECONDS = float(
+    os.getenv('DB_REPLICA_PIN_SECONDS', default=5)
+)
+
+# Cache
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+}
+CACHE_LOCATIONS = {
+    'locmem': '{}',
+    'file': os.path.join(BASE_DIR, 'cache', '{}'),
+    'db': '{}_cache',
+    'memcached': os.getenv('MEMCACHED_LOCATION', default='memcached:11211'),
+}
+
+
+def cache_settings(name, timeout, max_entries):
+    """Return the cache configuration read from <NAME>_CACHE_* variables."""
+    prefix = f'{name.upper()}_CACHE'
+    backend = os.getenv(f'{prefix}_BACKEND', default='locmem')
+    config = {
+        'BACKEND': CACHE_BACKENDS[backend],
+        'LOCATION': CACHE_LOCATIONS[backend].format(name),
+        'TIMEOUT': int(os.getenv(f'{prefix}_TIMEOUT', default=timeout)),
+        # The caches share one memcached server.
+        'KEY_PREFIX': name,
+    }
+    # memcached evicts by its own memory limit and passes OPTIONS to
+    # the client.
+    if backend != 'memcached':
+        config['OPTIONS'] = {
+            'MAX_ENTRIES': int(
+                os.getenv(f'{prefix}_MAX_ENTRIES', default=max_entries)
+            ),
+        }
+    return config
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': cache_settings('catalog', timeout=300, max_entries=1000),
+    'users': cache_settings('users', timeout=60, max_entries=10000),
+    # Users pinned to the primary after a write; with replicas the
+    # processes do not start unless it is shared (memcached or db).
+    'replicas': cache_settings('replicas', timeout=60, max_entries=10000),
+}
+
+# Caches every process must see the same entries of, as one process
+# invalidates the entries the others read. With REQUIRE_SHARED_CACHES
+# (set in docker-compose) the processes do not start when they are
+# per-process or per-container (locmem, file).
+REQUIRE_SHARED_CACHES = (
+    os.getenv('REQUIRE_SHARED_CACHES', default='false').lower() == 'true'
+)
+SHARED_CACHES = ['catalog', 'users'] if REQUIRE_SHARED_CACHES else []
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -126,7 +247,11 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.timing.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination'
     '.PageNumberPagination',
@@ -143,3 +268,64 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_EMAIL = 'test@yamdb.com'
+
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', default=100))
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(
+    os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5)
+)
+
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', default=30))
+
+# Seconds the emails claimed by a worker are hidden from the others.
+EMAIL_OUTBOX_LEASE = int(os.getenv('EMAIL_OUTBOX_LEASE', default=300))
+
+# Seconds after which an import still processing is taken for the
+# import of a dead worker and is claimed again.
+CSV_IMPORT_LEASE = int(os.getenv('CSV_IMPORT_LEASE', default=3600))
+
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.getenv('SERVER_TIMING_SAMPLE_RATE', default=0.01)
+)
+
+SLOW_QUERY_THRESHOLD = float(os.getenv('SLOW_QUERY_THRESHOLD', default=0.2))
+
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', default=1000))
+
+SLOW_QUERY_EXPLAIN_INTERVAL = int(
+    os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', default=60)
+)
+
+METRICS_DIR = os.getenv('METRICS_DIR', default='')
+
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', default=5))
+
+# Addresses or networks allowed to scrape /metrics, and a bearer token
+# accepted from anywhere (empty: none).
+METRICS_ALLOWED_IPS = [
+    network.strip() for network in os.getenv(
+        'METRICS_ALLOWED_IPS', default='127.0.0.1,::1'
+    ).split(',') if network.strip()
+]
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'timing': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['timing'],
+            'level': os.getenv('SERVER_TIMING_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,28 @@
+"""
+Gunicorn settings, read from the working directory by both services:
+the WSGI one runs api_yamdb.wsgi:application with sync workers,
+the ASGI one runs api_yamdb.asgi:application with
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker.
+"""
+import os
+import shutil
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', default=1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='sync')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=5))
+
+
+def on_starting(server):
+    """Drop the metric files of the previous run of the server."""
+    if os.getenv('METRICS_DIR'):
+        shutil.rmtree(os.getenv('METRICS_DIR'), ignore_errors=True)
+
+
+def worker_exit(server, worker):
+    """Write the last metric samples of the worker."""
+    if os.getenv('METRICS_DIR'):
+        from api_yamdb.metrics import registry
+
+        registry.flush()
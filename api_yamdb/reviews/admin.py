@@ -1,5 +1,3 @@
-import csv
-
 from django.contrib import admin, messages
 from django.http import HttpResponseRedirect
 from django.shortcuts import render
@@ -7,66 +5,94 @@ from django.urls import path, reverse
 
 from .forms import (CategoryImportForm, CommentImportForm, GenreImportForm,
                     ReviewImportForm, TitleImportForm)
-from .models import (Category, CategoryImport, Comment, CommentImport, Genre,
-                     GenreImport, Review, ReviewImport, Title, TitleImport)
-
-
-@admin.register(CategoryImport)
-class CategoryImportAdmin(admin.ModelAdmin):
-    list_display = ('csv_file', 'date_added')
-
+from .imports import has_valid_header
+from .models import (Category, CategoryImport, Comment, CommentImport,
+                     CsvImport, Genre, GenreImport, Review, ReviewImport,
+                     Title, TitleImport)
 
-admin.site.register(Category)
 
-
-class CategoryAdmin(admin.ModelAdmin):
-    """Model for adding data by category."""
+class CsvImportAdmin(admin.ModelAdmin):
+    """Progress of CSV files uploaded through the admin."""
     list_display = (
-        'name',
-        'slug',
+        'csv_file',
+        'date_added',
+        'status',
+        'rows_processed',
+        'rows_total',
+        'duration',
     )
-    search_fields = ('name',)
-    list_filter = ('name',)
-    empty_value_display = '-empty-'
+    list_filter = ('status',)
+    readonly_fields = (
+        'status',
+        'rows_processed',
+        'rows_total',
+        'started_at',
+        'duration',
+        'error',
+    )
+
+
+class CsvUploadMixin:
+    """
+    Adds a CSV upload page to the model admin.
+    The page only checks the file headers, the rows are loaded
+    by the process_imports command.
+    """
+    change_list_template = 'reviews/change_list.htm'
+    import_form = None
 
     def get_urls(self):
         urls = super().get_urls()
-        urls.insert(-1, path('csv-upload/', self.upload_csv))
+        upload_view = self.admin_site.admin_view(self.upload_csv)
+        urls.insert(-1, path('csv-upload/', upload_view))
         return urls
 
     def upload_csv(self, request):
         if request.method == 'POST':
-            form = CategoryImportForm(request.POST, request.FILES)
+            form = self.import_form(request.POST, request.FILES)
             if form.is_valid():
                 form_object = form.save()
-                with form_object.csv_file.open('r') as csv_file:
-                    rows = csv.reader(csv_file, delimiter=',')
-                    if next(rows) != ['id', 'name', 'slug']:
-                        messages.warning(request, 'Invalid file headers')
-                        return HttpResponseRedirect(request.path_info)
-                    for row in rows:
-                        print(row[2])
-                        Category.objects.update_or_create(
-                            id=row[0],
-                            name=row[1],
-                            slug=row[2]
-                        )
-                url = reverse('admin:index')
-                messages.success(request, 'File imported successfully')
+                if not has_valid_header(form_object):
+                    form_object.status = CsvImport.FAILED
+                    form_object.error = 'Invalid file headers'
+                    form_object.save(update_fields=('status', 'error'))
+                    messages.warning(request, 'Invalid file headers')
+                    return HttpResponseRedirect(request.path_info)
+                opts = form_object._meta
+                url = reverse(
+                    f'admin:{opts.app_label}_{opts.model_name}_changelist'
+                )
+                messages.success(request, 'File queued for import')
                 return HttpResponseRedirect(url)
-        form = CategoryImportForm()
+        form = self.import_form()
         return render(request, 'admin/csv_import_page.html', {'form': form})
 
 
-@admin.register(GenreImport)
-class GenreImportAdmin(admin.ModelAdmin):
-    list_display = ('csv_file', 'date_added')
+@admin.register(CategoryImport)
+class CategoryImportAdmin(CsvImportAdmin):
+    """Progress of category imports."""
 
 
-admin.site.register(Genre)
+@admin.register(Category)
+class CategoryAdmin(CsvUploadMixin, admin.ModelAdmin):
+    """Model for adding data by category."""
+    list_display = (
+        'name',
+        'slug',
+    )
+    search_fields = ('name',)
+    list_filter = ('name',)
+    empty_value_display = '-empty-'
+    import_form = CategoryImportForm
 
 
-class GenreAdmin(admin.ModelAdmin):
+@admin.register(GenreImport)
+class GenreImportAdmin(CsvImportAdmin):
+    """Progress of genre imports."""
+
+
+@admin.register(Genre)
+class GenreAdmin(CsvUploadMixin, admin.ModelAdmin):
     """Model for adding data by genre."""
     list_display = (
         'name',
@@ -75,45 +101,16 @@ class GenreAdmin(admin.ModelAdmin):
     search_fields = ('name',)
     list_filter = ('name',)
     empty_value_display = 'empty'
-
-    def get_urls(self):
-        urls = super().get_urls()
-        urls.insert(-1, path('csv-upload/', self.upload_csv))
-        return urls
-
-    def upload_csv(self, request):
-        if request.method == 'POST':
-            form = GenreImportForm(request.POST, request.FILES)
-            if form.is_valid():
-                form_object = form.save()
-                with form_object.csv_file.open('r') as csv_file:
-                    rows = csv.reader(csv_file, delimiter=',')
-                    if next(rows) != ['id', 'name', 'slug']:
-                        messages.warning(request, 'Invalid file headers')
-                        return HttpResponseRedirect(request.path_info)
-                    for row in rows:
-                        print(row[2])
-                        Genre.objects.update_or_create(
-                            id=row[0],
-                            name=row[1],
-                            slug=row[2]
-                        )
-                url = reverse('admin:index')
-                messages.success(request, 'File imported successfully')
-                return HttpResponseRedirect(url)
-        form = GenreImportForm()
-        return render(request, 'admin/csv_import_page.html', {'form': form})
+    import_form = GenreImportForm
 
 
 @admin.register(TitleImport)
-class TitleImportAdmin(admin.ModelAdmin):
-    list_display = ('csv_file', 'date_added')
+class TitleImportAdmin(CsvImportAdmin):
+    """Progress of title imports."""
 
 
-admin.site.register(Title)
-
-
-class TitleAdmin(admin.ModelAdmin):
+@admin.register(Title)
+class TitleAdmin(CsvUploadMixin, admin.ModelAdmin):
     """Model for adding data by title."""
     list_display = (
         'name',
@@ -124,48 +121,16 @@ class TitleAdmin(admin.ModelAdmin):
     search_fields = ('name',)
     list_filter = ('name',)
     empty_value_display = 'empty'
-
-    def get_urls(self):
-        urls = super().get_urls()
-        urls.insert(-1, path('csv-upload/', self.upload_csv))
-        return urls
-
-    def upload_csv(self, request):
-        if request.method == 'POST':
-            form = TitleImportForm(request.POST, request.FILES)
-            if form.is_valid():
-                form_object = form.save()
-                with form_object.csv_file.open('r') as csv_file:
-                    rows = csv.reader(csv_file, delimiter=',')
-                    if next(rows) != ['id', 'name', 'year', 'description',
-                                      'category_id']:
-                        messages.warning(request, 'Invalid file headers')
-                        return HttpResponseRedirect(request.path_info)
-                    for row in rows:
-                        print(row[2])
-                        Title.objects.update_or_create(
-                            id=row[0],
-                            name=row[1],
-                            year=row[2],
-                            description=row[3],
-                            category_id=row[4]
-                        )
-                url = reverse('admin:index')
-                messages.success(request, 'File imported successfully')
-                return HttpResponseRedirect(url)
-        form = TitleImportForm()
-        return render(request, 'admin/csv_import_page.html', {'form': form})
+    import_form = TitleImportForm
 
 
 @admin.register(ReviewImport)
-class ReviewImportAdmin(admin.ModelAdmin):
-    list_display = ('csv_file', 'date_added')
-
-
-admin.site.register(Review)
+class ReviewImportAdmin(CsvImportAdmin):
+    """Progress of review imports."""
 
 
-class ReviewAdmin(admin.ModelAdmin):
+@admin.register(Review)
+class ReviewAdmin(CsvUploadMixin, admin.ModelAdmin):
     """Model for adding data by review."""
     list_display = (
         'title',
@@ -176,49 +141,16 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ('pub_date',)
     list_filter = ('pub_date',)
     empty_value_display = 'empty'
-
-    def get_urls(self):
-        urls = super().get_urls()
-        urls.insert(-1, path('csv-upload/', self.upload_csv))
-        return urls
-
-    def upload_csv(self, request):
-        if request.method == 'POST':
-            form = ReviewImportForm(request.POST, request.FILES)
-            if form.is_valid():
-                form_object = form.save()
-                with form_object.csv_file.open('r') as csv_file:
-                    rows = csv.reader(csv_file, delimiter=',')
-                    if next(rows) != ['id', 'text', 'pub_date', 'score',
-                                      'author_id', 'title_id']:
-                        messages.warning(request, 'Invalid file headers')
-                        return HttpResponseRedirect(request.path_info)
-                    for row in rows:
-                        print(row[2])
-                        Review.objects.update_or_create(
-                            name=row[0],
-                            text=row[1],
-                            pub_date=row[2],
-                            score=row[3],
-                            author_id=row[4],
-                            title_id=row[5]
-                        )
-                url = reverse('admin:index')
-                messages.success(request, 'File imported successfully')
-                return HttpResponseRedirect(url)
-        form = ReviewImportForm()
-        return render(request, 'admin/csv_import_page.html', {'form': form})
+    import_form = ReviewImportForm
 
 
 @admin.register(CommentImport)
-class CommentImportAdmin(admin.ModelAdmin):
-    list_display = ('csv_file', 'date_added')
-
-
-admin.site.register(Comment)
+class CommentImportAdmin(CsvImportAdmin):
+    """Progress of comment imports."""
 
 
-class CommentAdmin(admin.ModelAdmin):
+@admin.register(Comment)
+class CommentAdmin(CsvUploadMixin, admin.ModelAdmin):
     """Model for adding data by comment."""
     list_display = (
         'review',
@@ -226,37 +158,7 @@ class CommentAdmin(admin.ModelAdmin):
         'author',
         'pub_date',
     )
-    search_fields = ('review',)
+    search_fields = ('text',)
     list_filter = ('review',)
     empty_value_display = 'empty'
-
-    def get_urls(self):
-        urls = super().get_urls()
-        urls.insert(-1, path('csv-upload/', self.upload_csv))
-        return urls
-
-    def upload_csv(self, request):
-        if request.method == 'POST':
-            form = CommentImportForm(request.POST, request.FILES)
-            if form.is_valid():
-                form_object = form.save()
-                with form_object.csv_file.open('r') as csv_file:
-                    rows = csv.reader(csv_file, delimiter=',')
-                    if next(rows) != ['id', 'text', 'pub_date',
-                                      'author_id', 'review_id']:
-                        messages.warning(request, 'Invalid file headers')
-                        return HttpResponseRedirect(request.path_info)
-                    for row in rows:
-                        print(row[2])
-                        Category.objects.update_or_create(
-                            id=row[0],
-                            text=row[1],
-                            pub_date=row[3],
-                            author_id=row[4],
-                            review_id=row[5]
-                        )
-                url = reverse('admin:index')
-                messages.success(request, 'File imported successfully')
-                return HttpResponseRedirect(url)
-        form = CommentImportForm()
-        return render(request, 'admin/csv_import_page.html', {'form': form})
+    import_form = CommentImportForm
@@ -0,0 +1,77 @@
+from django.core.cache import caches
+
+from .models import Category, Genre
+
+CATALOG_CACHE_ALIAS = 'catalog'
+
+
+class CatalogCache:
+    """
+    Cache of a small read-mostly catalog such as categories or genres.
+    Every key contains the catalog version, so an invalidation only has
+    to bump the version and the stale entries expire by themselves.
+    """
+
+    def __init__(self, model, alias=CATALOG_CACHE_ALIAS):
+        self.model = model
+        self.alias = alias
+        self.prefix = f'catalog:{model._meta.label_lower}'
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_version(self):
+        """Return the current version of the catalog."""
+        version = self.cache.get(f'{self.prefix}:version')
+        if version is None:
+            version = 1
+            self.cache.add(f'{self.prefix}:version', version, timeout=None)
+        return version
+
+    def invalidate(self):
+        """Make every cached entry of the catalog unreachable."""
+        try:
+            self.cache.incr(f'{self.prefix}:version')
+        except ValueError:
+            self.cache.set(f'{self.prefix}:version', 2, timeout=None)
+
+    def get_or_set(self, key, default):
+        """Return a cached value and whether it was a hit."""
+        key = f'{self.prefix}:{self.get_version()}:{key}'
+        value = self.cache.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, True
+        self.misses += 1
+        value = default()
+        self.cache.set(key, value)
+        return value, False
+
+    def get_by_slug(self, slug):
+        """Return the object with the given slug or raise DoesNotExist."""
+        obj, _ = self.get_or_set(
+            f'slug:{slug}', lambda: self.model.objects.get(slug=slug)
+        )
+        return obj
+
+    def stats(self):
+        """Return hit and miss counters of the current process."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+category_cache = CatalogCache(Category)
+genre_cache = CatalogCache(Genre)
+
+CATALOG_CACHES = {
+    Category: category_cache,
+    Genre: genre_cache,
+}
+
+
+def invalidate_catalogs():
+    """Drop the cached categories and genres."""
+    for catalog_cache in CATALOG_CACHES.values():
+        catalog_cache.invalidate()
@@ -0,0 +1,206 @@
+import math
+import random
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import accumulate
+
+from users.models import ADMIN, MODERATOR, USER
+
+USERS_PER_SCALE = 1000
+TITLES_PER_SCALE = 500
+REVIEWS_PER_SCALE = 20000
+CATEGORIES_PER_SCALE = 10
+GENRES_PER_SCALE = 30
+COMMENTS_PER_REVIEW = 0.3
+POPULARITY_EXPONENT = 0.8
+FIRST_YEAR = 1900
+LAST_YEAR = 2022
+FIRST_DATE = date(2015, 1, 1)
+DAYS = 8 * 365
+DAY_SECONDS = 24 * 60 * 60
+COMMENT_DAYS = 30
+SCORES = tuple(range(1, 11))
+# Cumulative weights of scores 1-10 for acclaimed, mixed and panned
+# titles, with the share of titles of every kind.
+SCORE_PROFILES = (
+    tuple(accumulate((1, 1, 1, 2, 3, 5, 9, 16, 22, 40))),
+    tuple(accumulate((2, 2, 3, 5, 8, 12, 16, 18, 17, 17))),
+    tuple(accumulate((25, 14, 12, 11, 10, 9, 7, 5, 3, 4))),
+)
+SCORE_PROFILE_WEIGHTS = (6, 3, 1)
+REVIEW_TEXTS = (
+    'Ставлю десять звёзд!',
+    'Смотрел дважды, второй раз понравилось больше.',
+    'Неплохо, но середина затянута.',
+    'Не понимаю восторгов, обычная работа.',
+    'Одно из лучших произведений, что я знаю.',
+    'Потраченное время жалко.',
+)
+COMMENT_TEXTS = (
+    'Согласен!',
+    'Ничего подобного, всё было не так.',
+    'Спасибо, теперь тоже посмотрю.',
+    'А мне понравилось.',
+)
+
+HEADERS = {
+    'users.User': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    'reviews.Category': ('id', 'name', 'slug'),
+    'reviews.Genre': ('id', 'name', 'slug'),
+    'reviews.Title': ('id', 'name', 'year', 'description', 'category_id'),
+    'reviews.Title_genre': ('id', 'title_id', 'genre_id'),
+    'reviews.Review': (
+        'id', 'title_id', 'text', 'author_id', 'score', 'pub_date'
+    ),
+    'reviews.Comment': ('id', 'text', 'pub_date', 'author_id', 'review_id'),
+}
+
+
+def popularity(size, exponent=POPULARITY_EXPONENT):
+    """Return the Zipf weights of the ranks 1..size."""
+    return [rank ** -exponent for rank in range(1, size + 1)]
+
+
+@lru_cache(maxsize=None)
+def date_parts():
+    """
+    Return the day and time strings of the generated dates, naive UTC
+    in a format every backend accepts. Joining cached strings is
+    several times faster than formatting datetime objects.
+    """
+    days = [
+        (FIRST_DATE + timedelta(days=day)).isoformat()
+        for day in range(DAYS + COMMENT_DAYS + 1)
+    ]
+    times = [
+        f' {second // 3600:02}:{second // 60 % 60:02}:{second % 60:02}'
+        for second in range(DAY_SECONDS)
+    ]
+    return days, times
+
+
+class DatasetGenerator:
+    """
+    Reproducible synthetic dataset.
+    Every table draws from its own random generator seeded with the
+    seed and the table name, so a table does not change when the
+    code of another table does. Titles get reviews by a Zipf law
+    of their popularity and scores by the profile of the title.
+    """
+
+    def __init__(self, seed=1, scale=1.0,
+                 comments_per_review=COMMENTS_PER_REVIEW):
+        if scale <= 0:
+            raise ValueError('Scale must be positive')
+        self.seed = seed
+        self.users = max(1, round(USERS_PER_SCALE * scale))
+        self.titles = max(1, round(TITLES_PER_SCALE * scale))
+        self.reviews = max(1, round(REVIEWS_PER_SCALE * scale))
+        self.categories = max(1, round(CATEGORIES_PER_SCALE * scale ** 0.5))
+        self.genres = max(1, round(GENRES_PER_SCALE * scale ** 0.5))
+        # Comments per review follow a geometric law with this mean.
+        self.comment_ratio = comments_per_review / (1 + comments_per_review)
+
+    def random(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def user_rows(self):
+        rng = self.random('users')
+        for pk in range(1, self.users + 1):
+            draw = rng.random()
+            role = ADMIN if draw < 0.001 else (
+                MODERATOR if draw < 0.01 else USER
+            )
+            yield (
+                pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', ''
+            )
+
+    def category_rows(self):
+        for pk in range(1, self.categories + 1):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def genre_rows(self):
+        for pk in range(1, self.genres + 1):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def title_rows(self):
+        rng = self.random('titles')
+        categories = range(1, self.categories + 1)
+        weights = tuple(accumulate(popularity(self.categories)))
+        for pk in range(1, self.titles + 1):
+            year = max(FIRST_YEAR, LAST_YEAR - int(rng.expovariate(1 / 15)))
+            category = rng.choices(categories, cum_weights=weights)[0]
+            yield pk, f'Произведение {pk}', year, '', category
+
+    def genre_title_rows(self):
+        rng = self.random('genre_title')
+        genres = range(1, self.genres + 1)
+        weights = tuple(accumulate(popularity(self.genres)))
+        pk = 0
+        for title in range(1, self.titles + 1):
+            count = rng.choice((1, 1, 2, 2, 3))
+            for genre in sorted(set(
+                rng.choices(genres, cum_weights=weights, k=count)
+            )):
+                pk += 1
+                yield pk, title, genre
+
+    def review_counts(self):
+        """
+        Return the number of reviews of every title. Popularity ranks
+        are shuffled over the titles, one author reviews a title once.
+        """
+        rng = self.random('popularity')
+        weights = popularity(self.titles)
+        rng.shuffle(weights)
+        total = sum(weights)
+        return [
+            min(self.users, round(self.reviews * weight / total))
+            for weight in weights
+        ]
+
+    def review_rows(self, add_comment=None):
+        """
+        Yield the review rows. Comments are drawn with their reviews
+        and passed to add_comment, so they can be written to another
+        table while the reviews are loaded.
+        """
+        rng = self.random('reviews')
+        draw = rng.random
+        days, times = date_parts()
+        users = range(1, self.users + 1)
+        log_ratio = math.log(self.comment_ratio) if self.comment_ratio else 0
+        review_pk = comment_pk = 0
+        for title, count in enumerate(self.review_counts(), 1):
+            if not count:
+                continue
+            profile = rng.choices(
+                SCORE_PROFILES, weights=SCORE_PROFILE_WEIGHTS
+            )[0]
+            authors = rng.sample(users, count)
+            scores = rng.choices(SCORES, cum_weights=profile, k=count)
+            for author, score in zip(authors, scores):
+                # random() is several times faster than randrange()
+                # and choice(), which matters for millions of rows.
+                review_pk += 1
+                day = int(draw() * DAYS)
+                yield (
+                    review_pk, title,
+                    REVIEW_TEXTS[int(draw() * len(REVIEW_TEXTS))],
+                    author, score,
+                    days[day] + times[int(draw() * DAY_SECONDS)]
+                )
+                if add_comment is None or not log_ratio:
+                    continue
+                comments = int(math.log(1.0 - draw()) / log_ratio)
+                for _ in range(comments):
+                    comment_pk += 1
+                    add_comment((
+                        comment_pk,
+                        COMMENT_TEXTS[int(draw() * len(COMMENT_TEXTS))],
+                        days[day + 1 + int(draw() * COMMENT_DAYS)]
+                        + times[int(draw() * DAY_SECONDS)],
+                        int(draw() * self.users) + 1, review_pk
+                    ))
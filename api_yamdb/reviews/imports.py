@@ -0,0 +1,253 @@
+import csv
+import io
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidate_catalogs
+from .models import (Category, CategoryImport, Comment, CommentImport,
+                     CsvImport, Genre, GenreImport, Review, ReviewImport,
+                     Title, TitleImport)
+from .ratings import rebuild_ratings
+
+BATCH_SIZE = 1000
+IMPORT_MODELS = (
+    CategoryImport,
+    GenreImport,
+    TitleImport,
+    ReviewImport,
+    CommentImport,
+)
+# Lookups from titles to the imported rows they show.
+TITLE_LOOKUPS = {
+    Category: 'category__in',
+    Genre: 'genre__in',
+    Title: 'pk__in',
+    Review: 'reviews__in',
+    Comment: 'reviews__comments__in',
+}
+
+
+class ImportLeaseExpired(Exception):
+    """The import was claimed again by another worker."""
+
+
+def batched(iterable, size):
+    """Split an iterable into lists of at most size items."""
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def read_header(csv_import):
+    """Return the stripped column names of an uploaded file."""
+    with csv_import.csv_file.open('rb') as csv_file:
+        line = io.TextIOWrapper(csv_file, encoding='utf-8').readline()
+    return [name.strip() for name in next(csv.reader([line]), [])]
+
+
+def has_valid_header(csv_import):
+    """Check that the file has exactly the columns of its model."""
+    header = read_header(csv_import)
+    return (
+        len(header) == len(set(header))
+        and set(header) == set(csv_import.csv_header)
+    )
+
+
+def read_rows(csv_import):
+    """Return the header and a generator of rows of an uploaded file."""
+    csv_file = io.TextIOWrapper(
+        csv_import.csv_file.open('rb'), encoding='utf-8'
+    )
+    reader = csv.reader(csv_file)
+    header = [name.strip() for name in next(reader)]
+
+    def rows():
+        with csv_file:
+            yield from reader
+
+    return header, rows()
+
+
+def count_rows(csv_import):
+    """Return the number of data rows of an uploaded file."""
+    _, rows = read_rows(csv_import)
+    return sum(1 for _ in rows)
+
+
+def upsert_sql(model, columns, header, rows):
+    """Return a multi-row INSERT ... ON CONFLICT UPDATE statement."""
+    quote_name = connection.ops.quote_name
+    placeholders = f'({", ".join(["%s"] * len(columns))})'
+    updates = ', '.join(
+        f'{quote_name(column)} = excluded.{quote_name(column)}'
+        for column in columns[:len(header)]
+        if column != model._meta.pk.column
+    )
+    return (
+        f'INSERT INTO {quote_name(model._meta.db_table)} '
+        f'({", ".join(quote_name(column) for column in columns)}) '
+        f'VALUES {", ".join([placeholders] * rows)} '
+        f'ON CONFLICT ({quote_name(model._meta.pk.column)}) '
+        f'DO UPDATE SET {updates}'
+    )
+
+
+def prepare_value(field, value):
+    """Convert a CSV string into a database value of the field."""
+    if value == '' and field.null:
+        value = None
+    elif value != '':
+        value = field.to_python(value)
+    return field.get_db_prep_save(value, connection)
+
+
+def upsert_rows(model, header, rows, batch_size=BATCH_SIZE, progress=None,
+                before_batch=None, after_batch=None):
+    """
+    Insert or update rows by primary key, one multi-row statement
+    and one transaction per batch. Columns missing from the file get
+    the defaults of their model fields on insert. before_batch and
+    after_batch are called with the primary keys of each batch
+    inside its transaction.
+    """
+    fields = [model._meta.get_field(name) for name in header]
+    defaults = [
+        field for field in model._meta.concrete_fields
+        if field.attname not in header and field.has_default()
+    ]
+    default_values = [
+        field.get_db_prep_save(field.get_default(), connection)
+        for field in defaults
+    ]
+    columns = [field.column for field in fields + defaults]
+    pk_index = header.index(model._meta.pk.attname)
+    batch_size = connection.ops.bulk_batch_size(columns, [None] * batch_size)
+    count = 0
+    for batch in batched(rows, batch_size):
+        params = [
+            param
+            for row in batch
+            for param in [
+                prepare_value(field, value)
+                for field, value in zip(fields, row)
+            ] + default_values
+        ]
+        sql = upsert_sql(model, columns, header, len(batch))
+        pks = [row[pk_index] for row in batch]
+        with transaction.atomic(), connection.cursor() as cursor:
+            if before_batch:
+                before_batch(pks)
+            cursor.execute(sql, params)
+            if after_batch:
+                after_batch(pks)
+        count += len(batch)
+        if progress:
+            progress(count)
+    return count
+
+
+def title_ids(model, pks):
+    """Return the ids of the titles that show the rows with given keys."""
+    return set(Title.objects.filter(
+        **{TITLE_LOOKUPS[model]: pks}
+    ).values_list('pk', flat=True))
+
+
+def process_import(csv_import, batch_size=BATCH_SIZE):
+    """
+    Load an uploaded file and record the progress on its record.
+    The started_at of the claim is the lease of the worker: once the
+    import is claimed again, the records of this run are not updated
+    and the load stops at the next batch.
+    """
+    model = csv_import.target_model
+    import_model = type(csv_import)
+    started = time.monotonic()
+    started_at = csv_import.started_at or timezone.now()
+    import_model.objects.filter(
+        pk=csv_import.pk, started_at=csv_import.started_at
+    ).update(
+        status=CsvImport.PROCESSING,
+        started_at=started_at,
+        rows_total=count_rows(csv_import),
+        rows_processed=0,
+        error='',
+    )
+    leased = import_model.objects.filter(
+        pk=csv_import.pk, started_at=started_at
+    )
+
+    def progress(count):
+        if not leased.update(rows_processed=count):
+            raise ImportLeaseExpired(f'{csv_import} was claimed again')
+
+    previous_title_ids = set()
+
+    def remember_titles(pks):
+        previous_title_ids.update(title_ids(model, pks))
+
+    def update_titles(pks):
+        """
+        Recount or touch the titles that showed the rows of the batch
+        before it and show them after it.
+        """
+        changed = previous_title_ids | title_ids(model, pks)
+        previous_title_ids.clear()
+        if model is Review:
+            rebuild_ratings(changed)
+        else:
+            Title.touch(pk__in=changed)
+
+    try:
+        header, rows = read_rows(csv_import)
+        upsert_rows(
+            model, header, rows, batch_size=batch_size, progress=progress,
+            before_batch=remember_titles, after_batch=update_titles
+        )
+        if model in (Category, Genre):
+            invalidate_catalogs()
+    except Exception as error:
+        leased.update(
+            status=CsvImport.FAILED,
+            error=str(error),
+            duration=timedelta(seconds=time.monotonic() - started),
+        )
+        raise
+    leased.update(
+        status=CsvImport.DONE,
+        duration=timedelta(seconds=time.monotonic() - started),
+    )
+
+
+def claim_pending_import():
+    """
+    Return a pending import marked as taken by the current worker,
+    or an import whose worker held it longer than CSV_IMPORT_LEASE
+    seconds, having died without recording the result.
+    Imports of parent models go first.
+    """
+    now = timezone.now()
+    claimable = Q(status=CsvImport.PENDING) | Q(
+        status=CsvImport.PROCESSING,
+        started_at__lt=now - timedelta(seconds=settings.CSV_IMPORT_LEASE),
+    )
+    for import_model in IMPORT_MODELS:
+        with transaction.atomic():
+            csv_import = import_model.objects.select_for_update(
+                skip_locked=True
+            ).filter(claimable).order_by('date_added').first()
+            if csv_import is not None:
+                csv_import.status = CsvImport.PROCESSING
+                csv_import.started_at = now
+                csv_import.save(update_fields=('status', 'started_at'))
+                return csv_import
+    return None
@@ -0,0 +1,206 @@
+import csv
+import os
+import tempfile
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from reviews.cache import invalidate_catalogs
+from reviews.dataset import HEADERS, DatasetGenerator
+from reviews.imports import batched
+from reviews.management.commands import import_csv
+from reviews.ratings import rebuild_ratings
+
+REVIEW = 'reviews.Review'
+COMMENT = 'reviews.Comment'
+
+
+def dataset_rows(generator, add_comment):
+    """Return the rows of every table but comments in loading order."""
+    rows = {
+        'users.User': generator.user_rows,
+        'reviews.Category': generator.category_rows,
+        'reviews.Genre': generator.genre_rows,
+        'reviews.Title': generator.title_rows,
+        'reviews.Title_genre': generator.genre_title_rows,
+        REVIEW: lambda: generator.review_rows(add_comment),
+    }
+    return [
+        (label, rows[label]())
+        for _, label, _ in import_csv.DATASET
+        if label != COMMENT
+    ]
+
+
+def with_defaults(model, header, rows):
+    """
+    Add the columns of fields missing from the rows that are
+    required or have a default, with the default of the field.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if field.attname not in header
+        and (field.has_default() or not field.null)
+    ]
+    values = tuple(
+        field.get_db_prep_save(field.get_default(), connection)
+        for field in fields
+    )
+    header = tuple(header) + tuple(field.column for field in fields)
+    return header, (tuple(row) + values for row in rows)
+
+
+class Command(BaseCommand):
+    """Command to generate a synthetic dataset for load testing."""
+    help = 'Generate a reproducible synthetic dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            dest='seed',
+            default=1,
+            help='Seed of the random generators',
+            type=int,
+        )
+        parser.add_argument(
+            '--scale',
+            dest='scale',
+            default=1.0,
+            help='Scale factor: 1 is 1000 users and 20000 reviews',
+            type=float,
+        )
+        parser.add_argument(
+            '--comments-per-review',
+            dest='comments_per_review',
+            default=0.3,
+            help='Average number of comments of a review',
+            type=float,
+        )
+        parser.add_argument(
+            '--output-dir',
+            dest='output_dir',
+            help='Write CSV files for import_csv --all --data-dir '
+                 'instead of loading the database',
+            type=str,
+        )
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            default=import_csv.BATCH_SIZE,
+            help='Number of rows written at once',
+            type=int,
+        )
+
+    def report(self, name, count, started):
+        elapsed = time.monotonic() - started
+        rate = count / elapsed if elapsed else count
+        self.stdout.write(self.style.SUCCESS(
+            f'{name}: {count} rows in {elapsed:.2f} s ({rate:.0f} rows/s)'
+        ))
+
+    def write_file(self, label, path, rows, batch_size):
+        """Write the rows of a table into a CSV file."""
+        started = time.monotonic()
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(HEADERS[label])
+            for batch in batched(rows, batch_size):
+                writer.writerows(batch)
+                count += len(batch)
+        self.report(path, count, started)
+
+    def write_files(self, generator, output_dir, batch_size):
+        """
+        Write the dataset as CSV files. Comments are written while
+        the reviews they belong to are generated.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {
+            label: os.path.join(output_dir, name)
+            for name, label, _ in import_csv.DATASET
+        }
+        started = time.monotonic()
+        count = 0
+
+        with open(
+            paths[COMMENT], 'w', newline='', encoding='utf-8'
+        ) as comments_file:
+            comments = csv.writer(comments_file)
+            comments.writerow(HEADERS[COMMENT])
+
+            def add_comment(row):
+                nonlocal count
+                comments.writerow(row)
+                count += 1
+
+            for label, rows in dataset_rows(generator, add_comment):
+                self.write_file(label, paths[label], rows, batch_size)
+        self.report(paths[COMMENT], count, started)
+
+    def load_rows(self, label, rows, batch_size):
+        """Load the rows of a table by the bulk path of the backend."""
+        model = apps.get_model(label)
+        header, rows = with_defaults(model, HEADERS[label], rows)
+        started = time.monotonic()
+        count = import_csv.load_table(
+            model._meta.db_table, header, rows, connection.cursor(),
+            batch_size=batch_size
+        )
+        self.report(label, count, started)
+
+    def load_database(self, generator, batch_size):
+        """
+        Load the dataset into empty tables with the secondary indexes
+        dropped. Comments are spooled to a temporary file while the
+        reviews are loaded, as they need their reviews in the table.
+        The titles get the load time as modified, so their ETags differ
+        from those of a flushed dataset without touching them.
+        """
+        models = [apps.get_model(label) for _, label, _ in import_csv.DATASET]
+        if any(model.objects.exists() for model in models):
+            raise CommandError(
+                'The dataset tables must be empty, run flush first'
+            )
+        tables = [model._meta.db_table for model in models]
+        spool = tempfile.TemporaryFile('w+', newline='', encoding='utf-8')
+        with spool, import_csv.secondary_indexes_dropped(
+            tables, self.creating_index
+        ):
+            comments = csv.writer(spool)
+            for label, rows in dataset_rows(generator, comments.writerow):
+                self.load_rows(label, rows, batch_size)
+            spool.seek(0)
+            self.load_rows(COMMENT, csv.reader(spool), batch_size)
+        import_csv.reset_sequences(models)
+        rebuild_ratings()
+        invalidate_catalogs()
+
+    def creating_index(self, name):
+        self.stdout.write(f'Creating index {name}')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size must be positive')
+        if options['comments_per_review'] < 0:
+            raise CommandError('Comments per review must not be negative')
+        try:
+            generator = DatasetGenerator(
+                options['seed'], options['scale'],
+                options['comments_per_review']
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        started = time.monotonic()
+        if options['output_dir']:
+            self.write_files(
+                generator, options['output_dir'], options['batch_size']
+            )
+        else:
+            self.load_database(generator, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Dataset generated in {time.monotonic() - started:.2f} s'
+        ))
@@ -6,46 +6,244 @@ https://gist.github.com/olegvpc/9805774d61b6a30cc2abc2c1a72b7ea5
 """
 
 import csv
+import io
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
+from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import BaseCommand, CommandError
-from django.db import connection
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+
+from reviews.cache import invalidate_catalogs
+from reviews.imports import batched
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import rebuild_ratings
 
 from api_yamdb.settings import BASE_DIR
 
+REVIEW_MODEL = 'review'
+REVIEW_TABLE = 'reviews_review'
+BATCH_SIZE = 5000
+DATA_DIR = 'static/data'
+MODEL = 'model'
+TABLE = 'table'
+DATASET = (
+    ('users.csv', 'users.User', MODEL),
+    ('category.csv', 'reviews.Category', MODEL),
+    ('genre.csv', 'reviews.Genre', MODEL),
+    ('titles.csv', 'reviews.Title', MODEL),
+    ('genre_title.csv', 'reviews.Title_genre', TABLE),
+    ('review.csv', 'reviews.Review', TABLE),
+    ('comments.csv', 'reviews.Comment', TABLE),
+)
+# The loads only insert rows: new categories and genres change the cached
+# catalogs, and only new links, reviews and comments change the titles
+# that are already served.
+CATALOG_TABLES = {Category._meta.db_table, Genre._meta.db_table}
+TITLE_TABLES = {
+    Title.genre.through._meta.db_table,
+    Review._meta.db_table,
+    Comment._meta.db_table,
+}
+
+
+def read_rows(path):
+    """Return the header and a generator of rows of a CSV file."""
+    csv_file = open(os.path.join(BASE_DIR, path), 'r', encoding='utf-8')
+    reader = csv.reader(csv_file)
+    header = [name.strip() for name in next(reader)]
+
+    def rows():
+        with csv_file:
+            yield from reader
+
+    return header, rows()
+
+
+def model_table(model_name):
+    """Return the table of the model with the given name or None."""
+    model_type = ContentType.objects.filter(model=model_name.lower()).first()
+    return model_type.model_class()._meta.db_table if model_type else None
 
-def read_model(model_name, path):
+
+def read_model(model_name, path, batch_size=BATCH_SIZE, progress=None):
     """The function checks the type of the model."""
     model_type = ContentType.objects.filter(model=model_name.lower()).first()
     if not model_type:
-        return
+        return 0
+
+    return load_model(
+        model_type.model_class(), path, batch_size=batch_size,
+        progress=progress
+    )
+
+
+def load_model(model, path, batch_size=BATCH_SIZE, progress=None):
+    """Load a CSV file through bulk_create of the model."""
+    header, rows = read_rows(path)
+    items = (model(**dict(zip(header, row))) for row in rows)
+    count = 0
+    for batch in batched(items, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        count += len(batch)
+        if progress:
+            progress(count)
+
+    return count
+
+
+def copy_batch(cursor, table, header, batch):
+    """
+    Load a batch of rows with COPY FROM STDIN on PostgreSQL. The cursor
+    wrapper passes copy_expert through as is, so its errors are wrapped
+    here into the Django ones, like those of execute.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(batch)
+    buffer.seek(0)
+    with cursor.db.wrap_database_errors:
+        cursor.copy_expert(
+            f'COPY {table} ({", ".join(header)}) FROM STDIN '
+            'WITH (FORMAT csv)',
+            buffer
+        )
 
-    model = model_type.model_class()
-    items = []
-    path = os.path.join(BASE_DIR, path)
-    with open(path, 'r', encoding='utf-8') as csv_file:
-        reader = csv.DictReader(csv_file)
-        for row in reader:
-            items.append(model(**row))
 
-        if items:
-            model.objects.bulk_create(items)
+def insert_batch(cursor, table, header, batch):
+    """Load a batch of rows with a single executemany call."""
+    fields = ', '.join(header)
+    values = ', '.join(['%s' for _ in header])
+    cursor.executemany(
+        f'INSERT INTO {table}({fields}) VALUES({values})', batch
+    )
 
 
-def read_table(table, path, cursor):
+def read_table(table, path, cursor, batch_size=BATCH_SIZE, progress=None):
     """The function adds data to the database."""
-    path = os.path.join(BASE_DIR, path)
-    with open(path, 'r', encoding='utf-8') as csv_file:
-        reader = csv.DictReader(csv_file)
-        header = reader.fieldnames
-        fields = ', '.join(header)
-        values = ', '.join(['%s' for _ in header])
-        for row in reader:
-            cursor.execute(
-                f'INSERT INTO {table}({fields}) VALUES({values})',
-                [row[item] for item in header]
+    header, rows = read_rows(path)
+    return load_table(
+        table, header, rows, cursor, batch_size=batch_size,
+        progress=progress
+    )
+
+
+def load_table(table, header, rows, cursor, batch_size=BATCH_SIZE,
+               progress=None):
+    """Load rows with COPY on PostgreSQL and executemany elsewhere."""
+    if cursor.db.vendor == 'postgresql':
+        load_batch = copy_batch
+    else:
+        load_batch = insert_batch
+    count = 0
+    for batch in batched(rows, batch_size):
+        with transaction.atomic(using=cursor.db.alias):
+            load_batch(cursor, table, header, batch)
+        count += len(batch)
+        if progress:
+            progress(count)
+
+    return count
+
+
+def dependency_levels(models):
+    """
+    Group models so that every model goes after the models
+    its foreign keys point to. Models of one group are independent.
+    """
+    pending = set(models)
+    levels = []
+    while pending:
+        level = {
+            model for model in pending
+            if not any(
+                field.related_model in pending
+                and field.related_model is not model
+                for field in model._meta.concrete_fields
+                if field.many_to_one
             )
+        }
+        if not level:
+            raise CommandError('Circular dependency between tables')
+        levels.append(level)
+        pending -= level
+    return levels
+
+
+def get_secondary_indexes(cursor, table):
+    """Return (name, definition) of indexes not backing a constraint."""
+    vendor = cursor.db.vendor
+    if vendor == 'postgresql':
+        cursor.execute(
+            """SELECT i.indexname, i.indexdef FROM pg_indexes i
+            WHERE i.schemaname = current_schema() AND i.tablename = %s
+            AND NOT EXISTS (
+                SELECT 1 FROM pg_constraint c
+                WHERE c.conindid = (
+                    quote_ident(i.schemaname) || '.'
+                    || quote_ident(i.indexname)
+                )::regclass
+            )""",
+            [table]
+        )
+    elif vendor == 'sqlite':
+        cursor.execute(
+            """SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND tbl_name = %s
+            AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%%'""",
+            [table]
+        )
+    else:
+        return []
+    return cursor.fetchall()
+
+
+@contextmanager
+def secondary_indexes_dropped(tables, progress=None):
+    """
+    Drop the secondary indexes of the tables for a bulk load
+    and create them again once the load is over.
+    """
+    with connection.cursor() as cursor:
+        indexes = [
+            index
+            for table in tables
+            for index in get_secondary_indexes(cursor, table)
+        ]
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, definition in indexes:
+                if progress:
+                    progress(name)
+                cursor.execute(definition)
+
+
+def reset_sequences(models):
+    """Move the primary key sequences past the loaded ids."""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def load_dataset_file(model, mode, path, batch_size=BATCH_SIZE,
+                      progress=None):
+    """Load one CSV file of the dataset."""
+    if mode == MODEL:
+        return load_model(
+            model, path, batch_size=batch_size, progress=progress
+        )
+    return read_table(
+        model._meta.db_table, path, connection.cursor(),
+        batch_size=batch_size, progress=progress
+    )
 
 
 class Command(BaseCommand):
@@ -75,26 +273,159 @@ class Command(BaseCommand):
             help='List of names nf,kbw',
             type=str,
         )
+        parser.add_argument(
+            '--all',
+            dest='all',
+            action='store_true',
+            help='Load every CSV file of the dataset directory',
+        )
+        parser.add_argument(
+            '--data-dir',
+            dest='data_dir',
+            default=DATA_DIR,
+            help='Directory of the dataset loaded with --all',
+            type=str,
+        )
+        parser.add_argument(
+            '--workers',
+            dest='workers',
+            default=os.cpu_count(),
+            help='Number of tables loaded in parallel with --all',
+            type=int,
+        )
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            default=BATCH_SIZE,
+            help='Number of rows loaded in one transaction',
+            type=int,
+        )
+
+    def load(self, name, loader, *args, batch_size):
+        """Run a loader reporting its progress and throughput."""
+        started = time.monotonic()
+
+        def progress(count):
+            self.stdout.write(f'{name}: {count} rows')
+
+        count = loader(*args, batch_size=batch_size, progress=progress)
+        elapsed = time.monotonic() - started
+        rate = count / elapsed if elapsed else count
+        self.stdout.write(self.style.SUCCESS(
+            f'{name}: {count} rows in {elapsed:.2f} s ({rate:.0f} rows/s)'
+        ))
+
+    def creating_index(self, name):
+        self.stdout.write(f'Creating index {name}')
+
+    def load_in_thread(self, *args, **kwargs):
+        """Run load on the database connection of the current thread."""
+        try:
+            return self.load(*args, **kwargs)
+        finally:
+            connections.close_all()
+
+    def import_dataset(self, data_dir, workers, batch_size):
+        """
+        Load the whole dataset: independent tables in parallel,
+        secondary indexes rebuilt after the load, sequences reset.
+        """
+        if connection.vendor == 'sqlite':
+            workers = 1
+        dataset = {
+            apps.get_model(label): (mode, os.path.join(data_dir, name))
+            for name, label, mode in DATASET
+        }
+        tables = [model._meta.db_table for model in dataset]
+        started = time.monotonic()
+        with secondary_indexes_dropped(tables, self.creating_index):
+            for level in dependency_levels(dataset):
+                jobs = [
+                    (model._meta.db_table, load_dataset_file, model,
+                     *dataset[model])
+                    for model in level
+                ]
+                if workers > 1:
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        futures = [
+                            pool.submit(
+                                self.load_in_thread, *job,
+                                batch_size=batch_size
+                            )
+                            for job in jobs
+                        ]
+                        for future in futures:
+                            future.result()
+                else:
+                    for job in jobs:
+                        self.load(*job, batch_size=batch_size)
+
+        reset_sequences(list(dataset))
+        rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Dataset loaded in {time.monotonic() - started:.2f} s'
+        ))
+        return tables
+
+    def import_models(self, models, paths, batch_size):
+        """Load CSV files through the models with the given names."""
+        if len(models) != len(paths):
+            raise CommandError('Number of paths and models do not match')
+
+        for model_name, path in zip(models, paths):
+            self.load(
+                model_name, read_model, model_name, path,
+                batch_size=batch_size
+            )
+
+        if REVIEW_MODEL in (name.lower() for name in models):
+            rebuild_ratings()
+        return [model_table(model_name) for model_name in models]
+
+    def import_tables(self, tables, paths, batch_size):
+        """Load CSV files straight into the given tables."""
+        if len(tables) != len(paths):
+            raise CommandError('Number of paths and tables do not match')
+
+        cursor = connection.cursor()
+        for table, path in zip(tables, paths):
+            self.load(
+                table, read_table, table, path, cursor,
+                batch_size=batch_size
+            )
+
+        if REVIEW_TABLE in tables:
+            rebuild_ratings()
+        return tables
 
     def handle(self, *args, **options):
         paths = options.get('paths')
         models = options.get('models')
         tables = options.get('tables')
+        batch_size = options.get('batch_size')
+        workers = options.get('workers')
+        loaded = []
 
-        if not models and not tables or models and tables:
-            raise CommandError('Incorrect specification of parameters')
+        if batch_size < 1 or workers < 1:
+            raise CommandError('Batch size and workers must be positive')
 
-        if models and paths:
-            if len(models) != len(paths):
-                raise CommandError('Number of paths and models do not match')
+        if options.get('all'):
+            if models or tables or paths:
+                raise CommandError('--all loads every file by itself')
+            loaded = self.import_dataset(
+                options.get('data_dir'), workers, batch_size
+            )
+
+        elif not models and not tables or models and tables:
+            raise CommandError('Incorrect specification of parameters')
 
-            for model_name, path in zip(models, paths):
-                read_model(model_name, path)
+        elif models and paths:
+            loaded = self.import_models(models, paths, batch_size)
 
         elif tables and paths:
-            if len(tables) != len(paths):
-                raise CommandError('Number of paths and tables do not match')
+            loaded = self.import_tables(tables, paths, batch_size)
 
-            cursor = connection.cursor()
-            for table, path in zip(tables, paths):
-                read_table(table, path, cursor)
+        if CATALOG_TABLES.intersection(loaded):
+            invalidate_catalogs()
+        if TITLE_TABLES.intersection(loaded):
+            Title.touch()
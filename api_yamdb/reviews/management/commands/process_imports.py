@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.imports import BATCH_SIZE, claim_pending_import, process_import
+
+
+class Command(BaseCommand):
+    """Command to load CSV files uploaded through the admin."""
+    help = 'Process pending CSV imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            dest='loop',
+            action='store_true',
+            help='Keep waiting for new imports',
+        )
+        parser.add_argument(
+            '--interval',
+            dest='interval',
+            default=5,
+            help='Seconds between checks for new imports',
+            type=float,
+        )
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            default=BATCH_SIZE,
+            help='Number of rows upserted in one transaction',
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            csv_import = claim_pending_import()
+            if csv_import is None:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f'Importing {csv_import}')
+            try:
+                process_import(csv_import, batch_size=options['batch_size'])
+            except Exception as error:
+                self.stderr.write(f'Import of {csv_import} failed: {error}')
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Imported {csv_import}')
+                )
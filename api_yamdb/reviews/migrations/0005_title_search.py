@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import create_search_indexes, drop_search_indexes
+
+
+def create_indexes(apps, schema_editor):
+    create_search_indexes(schema_editor, apps.get_model('reviews', 'Title'))
+
+
+def drop_indexes(apps, schema_editor):
+    drop_search_indexes(schema_editor, apps.get_model('reviews', 'Title'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_pub_date_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,195 @@
+# Generated by Django 3.2 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+IMPORT_MODELS = (
+    'CategoryImport', 'GenreImport', 'TitleImport', 'ReviewImport',
+    'CommentImport',
+)
+
+
+def mark_existing_done(apps, schema_editor):
+    """Files uploaded before were imported within the request."""
+    for name in IMPORT_MODELS:
+        apps.get_model('reviews', name).objects.update(status='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='categoryimport',
+            options={'ordering': ('-date_added',)},
+        ),
+        migrations.AlterModelOptions(
+            name='commentimport',
+            options={'ordering': ('-date_added',)},
+        ),
+        migrations.AlterModelOptions(
+            name='genreimport',
+            options={'ordering': ('-date_added',)},
+        ),
+        migrations.AlterModelOptions(
+            name='reviewimport',
+            options={'ordering': ('-date_added',)},
+        ),
+        migrations.AlterModelOptions(
+            name='titleimport',
+            options={'ordering': ('-date_added',)},
+        ),
+        migrations.AddField(
+            model_name='categoryimport',
+            name='duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='categoryimport',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='categoryimport',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='categoryimport',
+            name='rows_total',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='categoryimport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='categoryimport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'pending'), ('processing', 'processing'), ('done', 'done'), ('failed', 'failed')], db_index=True, default='pending', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='commentimport',
+            name='duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='commentimport',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='commentimport',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='commentimport',
+            name='rows_total',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='commentimport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='commentimport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'pending'), ('processing', 'processing'), ('done', 'done'), ('failed', 'failed')], db_index=True, default='pending', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='genreimport',
+            name='duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='genreimport',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='genreimport',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='genreimport',
+            name='rows_total',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='genreimport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='genreimport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'pending'), ('processing', 'processing'), ('done', 'done'), ('failed', 'failed')], db_index=True, default='pending', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='reviewimport',
+            name='duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewimport',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='reviewimport',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reviewimport',
+            name='rows_total',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewimport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewimport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'pending'), ('processing', 'processing'), ('done', 'done'), ('failed', 'failed')], db_index=True, default='pending', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='titleimport',
+            name='duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='titleimport',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='titleimport',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='titleimport',
+            name='rows_total',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='titleimport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='titleimport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'pending'), ('processing', 'processing'), ('done', 'done'), ('failed', 'failed')], db_index=True, default='pending', max_length=16),
+        ),
+        migrations.RunPython(mark_existing_done, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 04:38
+
+from django.db import migrations, models
+import django.utils.timezone
+
+from reviews.search import create_search_indexes, drop_search_indexes
+
+
+def restore_sqlite_search(apps, schema_editor):
+    """
+    SQLite adds and removes the columns by rebuilding the title table,
+    which drops the triggers that keep the search tables in sync.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        Title = apps.get_model('reviews', 'Title')
+        drop_search_indexes(schema_editor, Title)
+        create_search_indexes(schema_editor, Title)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_csv_import_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, restore_sqlite_search
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='modified',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Last modified'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Version of the title, its reviews and comments'),
+        ),
+        migrations.RunPython(
+            restore_sqlite_search, migrations.RunPython.noop
+        ),
+    ]
@@ -1,11 +1,50 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
 from users.models import User
 
 from .constants import MAX_REVIEW_SCORE_VALUE, MIN_REVIEW_SCORE_VALUE
 from .validators import validate_year
 
 
+class CsvImport(models.Model):
+    """Base model of a CSV file uploaded through the admin."""
+
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'pending'),
+        (PROCESSING, 'processing'),
+        (DONE, 'done'),
+        (FAILED, 'failed'),
+    ]
+
+    csv_file = models.FileField(upload_to='static/data/')
+    date_added = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(
+        choices=STATUSES,
+        default=PENDING,
+        max_length=16,
+        db_index=True
+    )
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        abstract = True
+        ordering = ('-date_added',)
+
+    def __str__(self):
+        """Return the name of the uploaded file."""
+        return self.csv_file.name
+
+
 class Category(models.Model):
     """Category model."""
 
@@ -29,10 +68,10 @@ class Category(models.Model):
         return self.name
 
 
-class CategoryImport(models.Model):
+class CategoryImport(CsvImport):
     """Category import model."""
-    csv_file = models.FileField(upload_to='static/data/')
-    date_added = models.DateTimeField(auto_now_add=True)
+    target_model = Category
+    csv_header = ('id', 'name', 'slug')
 
 
 class Genre(models.Model):
@@ -59,10 +98,10 @@ class Genre(models.Model):
         return self.name
 
 
-class GenreImport(models.Model):
+class GenreImport(CsvImport):
     """Genre import model."""
-    csv_file = models.FileField(upload_to='static/data/')
-    date_added = models.DateTimeField(auto_now_add=True)
+    target_model = Genre
+    csv_header = ('id', 'name', 'slug')
 
 
 class Title(models.Model):
@@ -95,21 +134,77 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Category',
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Sum of review scores'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Number of reviews'
+    )
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Version of the title, its reviews and comments'
+    )
+    modified = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name='Last modified'
+    )
 
     class Meta:
         ordering = ('id',)
         verbose_name = 'Title'
         verbose_name_plural = 'Titles'
+        indexes = [
+            models.Index(fields=['year', 'id'], name='title_year_idx'),
+        ]
 
     def __str__(self):
         """Return Title name."""
         return self.name
 
-
-class TitleImport(models.Model):
+    def save(self, *args, **kwargs):
+        """Save the title and mark it as modified."""
+        self.modified = timezone.now()
+        super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        """Return the average review score or None without reviews."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum // self.rating_count
+
+    @classmethod
+    def update_rating(cls, title_id, score_delta, count_delta):
+        """
+        Shift the stored rating of a title and move its version forward
+        in a single UPDATE.
+        """
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=F('rating_count') + count_delta,
+            version=F('version') + 1,
+            modified=timezone.now(),
+        )
+
+    @classmethod
+    def touch(cls, *conditions, **lookup):
+        """Move the version of the matching titles forward."""
+        return cls.objects.filter(*conditions, **lookup).update(
+            version=F('version') + 1,
+            modified=timezone.now(),
+        )
+
+
+class TitleImport(CsvImport):
     """Title import model."""
-    csv_file = models.FileField(upload_to='static/data/')
-    date_added = models.DateTimeField(auto_now_add=True)
+    target_model = Title
+    csv_header = ('id', 'name', 'year', 'description', 'category_id')
 
 
 class Review(models.Model):
@@ -144,16 +239,41 @@ class Review(models.Model):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            )
+        ]
 
     def __str__(self):
         """Return review text."""
         return self.text
 
-
-class ReviewImport(models.Model):
+    def save(self, *args, **kwargs):
+        """Save the review and keep the rating of its title in sync."""
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = Review.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('title_id', 'score').first()
+            super().save(*args, **kwargs)
+            if previous is None:
+                Title.update_rating(self.title_id, self.score, 1)
+            elif previous[0] != self.title_id:
+                Title.update_rating(previous[0], -previous[1], -1)
+                Title.update_rating(self.title_id, self.score, 1)
+            else:
+                Title.update_rating(self.title_id, self.score - previous[1], 0)
+
+
+class ReviewImport(CsvImport):
     """Review import model."""
-    csv_file = models.FileField(upload_to='static/data/')
-    date_added = models.DateTimeField(auto_now_add=True)
+    target_model = Review
+    csv_header = (
+        'id', 'text', 'pub_date', 'score', 'author_id', 'title_id'
+    )
 
 
 class Comment(models.Model):
@@ -177,13 +297,19 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
 
     def __str__(self):
         """Return review comment text."""
         return self.text
 
 
-class CommentImport(models.Model):
+class CommentImport(CsvImport):
     """Comment model."""
-    csv_file = models.FileField(upload_to='static/data/')
-    date_added = models.DateTimeField(auto_now_add=True)
+    target_model = Comment
+    csv_header = ('id', 'text', 'pub_date', 'author_id', 'review_id')
@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Review, Title
+
+
+def rebuild_ratings(title_ids=None):
+    """
+    Recalculate the stored rating of every title from its reviews.
+    Given title_ids, only these titles are locked, recalculated and
+    move their version forward: reviews saved concurrently either
+    committed before the lock and are counted, or add their score
+    after it.
+    """
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    titles = Title.objects.all()
+    changes = {}
+    with transaction.atomic():
+        if title_ids is not None:
+            titles = titles.filter(pk__in=title_ids)
+            list(titles.select_for_update().values_list('pk', flat=True))
+            changes = {'version': F('version') + 1, 'modified': timezone.now()}
+        return titles.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            **changes
+        )
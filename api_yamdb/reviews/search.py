@@ -0,0 +1,175 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector, TrigramSimilarity)
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+SEARCH_INDEX = 'title_search_idx'
+TRIGRAM_INDEX = 'title_name_trgm_idx'
+
+FTS_TABLE = 'reviews_title_fts'
+TRIGRAM_TABLE = 'reviews_title_trigram'
+TRIGRAM_LENGTH = 3
+# Name matches weigh ten times the description matches.
+FTS_RANK = f'-bm25({FTS_TABLE}, 10.0, 1.0)'
+
+SQLITE_SEARCH_TABLES = (
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, description, content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE VIRTUAL TABLE {TRIGRAM_TABLE} USING fts5(
+        name, content='reviews_title', content_rowid='id',
+        tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER reviews_title_search_insert
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+        INSERT INTO {TRIGRAM_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END""",
+    f"""CREATE TRIGGER reviews_title_search_delete
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END""",
+    f"""CREATE TRIGGER reviews_title_search_update
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+        INSERT INTO {TRIGRAM_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    f"INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}) VALUES ('rebuild')",
+)
+
+SQLITE_DROP_SEARCH_TABLES = (
+    'DROP TRIGGER IF EXISTS reviews_title_search_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_search_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_search_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+    f'DROP TABLE IF EXISTS {TRIGRAM_TABLE}',
+)
+
+
+def title_search_vector():
+    """Return the weighted full-text vector of title name and description."""
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def create_search_indexes(schema_editor, model):
+    """Create the full-text and trigram indexes for the title model."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.add_index(
+            model, GinIndex(title_search_vector(), name=SEARCH_INDEX)
+        )
+        schema_editor.add_index(
+            model,
+            GinIndex(
+                fields=['name'], opclasses=['gin_trgm_ops'],
+                name=TRIGRAM_INDEX
+            )
+        )
+    elif vendor == 'sqlite':
+        for statement in SQLITE_SEARCH_TABLES:
+            schema_editor.execute(statement)
+
+
+def drop_search_indexes(schema_editor, model):
+    """Drop the indexes created by create_search_indexes."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.remove_index(
+            model, GinIndex(title_search_vector(), name=SEARCH_INDEX)
+        )
+        schema_editor.remove_index(
+            model,
+            GinIndex(
+                fields=['name'], opclasses=['gin_trgm_ops'],
+                name=TRIGRAM_INDEX
+            )
+        )
+    elif vendor == 'sqlite':
+        for statement in SQLITE_DROP_SEARCH_TABLES:
+            schema_editor.execute(statement)
+
+
+def postgresql_search(queryset, value):
+    """Match titles by the full-text vector or by name trigrams."""
+    query = SearchQuery(value, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.annotate(
+        search=title_search_vector(),
+    ).filter(
+        Q(search=query) | Q(name__trigram_similar=value)
+    ).annotate(
+        rank=SearchRank(title_search_vector(), query),
+        similarity=TrigramSimilarity('name', value),
+    ).order_by('-rank', '-similarity', 'id')
+
+
+def quote_terms(terms):
+    """Quote terms so that FTS5 treats them as plain strings."""
+    return ['"{}"'.format(term.replace('"', '""')) for term in terms]
+
+
+def sqlite_search(queryset, value):
+    """
+    Match titles by the FTS5 tables created for SQLite. The ids come
+    from an uncorrelated subquery and the rank from a subquery per
+    title over the matches: LIMIT -1 keeps SQLite from flattening it
+    into a MATCH per title, so the matches are computed once and
+    looked up by an automatic index.
+    """
+    terms = value.split()
+    if not terms:
+        return queryset
+    fts_query = ' '.join(f'{term}*' for term in quote_terms(terms))
+    trigram_query = ' OR '.join(quote_terms(
+        term for term in terms if len(term) >= TRIGRAM_LENGTH
+    ))
+    ids = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+    # Titles matched by the trigrams of the name only rank below the
+    # titles matched by words.
+    ranks = (
+        f'SELECT rowid, {FTS_RANK} AS rank'
+        f' FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+    )
+    params = [fts_query]
+    if trigram_query:
+        trigram_match = f' FROM {TRIGRAM_TABLE} WHERE {TRIGRAM_TABLE} MATCH %s'
+        ids += f' UNION SELECT rowid{trigram_match}'
+        ranks += f' UNION ALL SELECT rowid, 0 AS rank{trigram_match}'
+        params.append(trigram_query)
+    table = connections[queryset.db].ops.quote_name(
+        queryset.model._meta.db_table
+    )
+    return queryset.filter(pk__in=RawSQL(ids, params)).annotate(rank=RawSQL(
+        f'SELECT MAX(rank) FROM ({ranks} LIMIT -1)'
+        f' WHERE rowid = {table}.id',
+        params, output_field=FloatField()
+    )).order_by('-rank', 'id')
+
+
+SEARCH_BACKENDS = {
+    'postgresql': postgresql_search,
+    'sqlite': sqlite_search,
+}
+
+
+def search_titles(queryset, value):
+    """Return titles matching the search string, best matches first."""
+    vendor = connections[queryset.db].vendor
+    return SEARCH_BACKENDS[vendor](queryset, value)
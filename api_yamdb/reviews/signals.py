@@ -0,0 +1,124 @@
+import threading
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from users.models import User
+
+from .cache import CATALOG_CACHES
+from .models import Category, Comment, Genre, Review, Title
+from .ratings import rebuild_ratings
+
+CATALOG_LOOKUPS = {
+    Category: 'category',
+    Genre: 'genre',
+}
+
+
+class PendingIds(threading.local):
+    """
+    Ids collected by the pre_delete receivers of a delete. Django sends
+    pre_delete for every collected object before deleting any and
+    post_delete after deleting all objects of a model, so the first
+    post_delete handles the ids of the whole delete at once.
+    """
+
+    def __init__(self):
+        self.ids = set()
+
+    def add(self, pk):
+        self.ids.add(pk)
+
+    def pop(self):
+        ids, self.ids = self.ids, set()
+        return ids
+
+
+DELETED_REVIEW_TITLES = PendingIds()
+DELETED_COMMENT_REVIEWS = PendingIds()
+
+
+@receiver(pre_delete, sender=Review)
+def collect_deleted_review(sender, instance, **kwargs):
+    DELETED_REVIEW_TITLES.add(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def remove_reviews_from_ratings(sender, instance, **kwargs):
+    """
+    Recalculate the ratings of the titles of the deleted reviews once
+    per delete instead of once per review.
+    """
+    title_ids = DELETED_REVIEW_TITLES.pop()
+    if title_ids:
+        rebuild_ratings(title_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_catalog_cache(sender, **kwargs):
+    """
+    Drop the cached catalog after its rows change
+    and once more after the commit, when the change becomes visible.
+    """
+    CATALOG_CACHES[sender].invalidate()
+    transaction.on_commit(CATALOG_CACHES[sender].invalidate)
+
+
+@receiver(post_save, sender=Comment)
+def touch_comment_title(sender, instance, **kwargs):
+    """Move the version of the title whose comments changed forward."""
+    Title.touch(reviews=instance.review_id)
+
+
+@receiver(pre_delete, sender=Comment)
+def collect_deleted_comment(sender, instance, **kwargs):
+    DELETED_COMMENT_REVIEWS.add(instance.review_id)
+
+
+@receiver(post_delete, sender=Comment)
+def touch_deleted_comments_titles(sender, instance, **kwargs):
+    """
+    Move the versions of the titles of the deleted comments forward
+    once per delete. Their reviews are deleted after them, if at all.
+    """
+    review_ids = DELETED_COMMENT_REVIEWS.pop()
+    if review_ids:
+        Title.touch(reviews__in=review_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def touch_catalog_titles(sender, instance, created, **kwargs):
+    """Titles show the names of their category and genres."""
+    if not created:
+        Title.touch(**{CATALOG_LOOKUPS[sender]: instance})
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_catalog_titles_before_delete(sender, instance, **kwargs):
+    """Titles lose the deleted category or genre."""
+    Title.touch(**{CATALOG_LOOKUPS[sender]: instance})
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    """Keep the loaded username, without loading it if it was deferred."""
+    instance.loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def touch_renamed_author_titles(sender, instance, created, **kwargs):
+    """Reviews and comments of titles show the usernames of their authors."""
+    if not created and instance.loaded_username not in (
+        None, instance.username
+    ):
+        Title.touch(
+            Q(reviews__author=instance) | Q(reviews__comments__author=instance)
+        )
+    instance.loaded_username = instance.username
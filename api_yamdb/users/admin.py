@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -25,3 +25,17 @@ class UserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject',
+        'recipient',
+        'status',
+        'attempts',
+        'created_at',
+        'sent_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('recipient',)
@@ -0,0 +1,59 @@
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import User
+
+USER_CACHE_ALIAS = 'users'
+USER_CACHE_FIELDS = (
+    'id',
+    'username',
+    'email',
+    'first_name',
+    'last_name',
+    'bio',
+    'role',
+    'is_superuser',
+    'is_staff',
+    'is_active',
+)
+
+
+def cached_field_names():
+    """Return the cached fields in model order, as from_db expects."""
+    return [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in USER_CACHE_FIELDS
+    ]
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+def get_cached_user(user_id):
+    """
+    Return the user from the cache or None.
+    Fields missing from the cache are deferred and load on access,
+    saving such a user writes only the cached fields.
+    """
+    values = caches[USER_CACHE_ALIAS].get(user_cache_key(user_id))
+    if values is None:
+        return None
+    return User.from_db(DEFAULT_DB_ALIAS, cached_field_names(), values)
+
+
+def cache_user(user):
+    """Store the fields needed by permissions and /users/me/."""
+    caches[USER_CACHE_ALIAS].set(
+        user_cache_key(user.pk),
+        tuple(getattr(user, name) for name in cached_field_names())
+    )
+
+
+def invalidate_users(user_ids):
+    """Drop the cached users now and once more after the commit."""
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    caches[USER_CACHE_ALIAS].delete_many(keys)
+    transaction.on_commit(lambda: caches[USER_CACHE_ALIAS].delete_many(keys))
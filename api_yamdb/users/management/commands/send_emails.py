@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.outbox import outbox_stats, send_pending_emails
+
+
+class Command(BaseCommand):
+    """Command to deliver emails from the outbox."""
+    help = 'Send queued emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            dest='loop',
+            action='store_true',
+            help='Keep waiting for new emails',
+        )
+        parser.add_argument(
+            '--interval',
+            dest='interval',
+            default=1,
+            help='Seconds between checks of an empty outbox',
+            type=float,
+        )
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Number of emails sent over one connection',
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = timezone.now()
+            sent, failed = send_pending_emails(options['batch_size'])
+            if sent or failed:
+                stats = outbox_stats(since=started)
+                self.stdout.write(
+                    f'Sent {sent}, failed {failed}, '
+                    f'queue depth {stats["queue_depth"]}, '
+                    f'latency avg {stats["latency_average"]} '
+                    f'max {stats["latency_max"]}'
+                )
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
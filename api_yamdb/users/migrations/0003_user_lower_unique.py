@@ -0,0 +1,27 @@
+from django.db import migrations
+
+LOWER_UNIQUE_INDEXES = (
+    ('user_username_lower_uniq', 'username'),
+    ('user_email_lower_uniq', 'email'),
+)
+
+
+class Migration(migrations.Migration):
+    """
+    Case-insensitive uniqueness of usernames and emails.
+    Django 3.2 has no expression unique constraints,
+    so the indexes are created with SQL that PostgreSQL
+    and SQLite both accept.
+    """
+
+    dependencies = [
+        ('users', '0002_outbox_email'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f'CREATE UNIQUE INDEX {name} ON users_user (LOWER({column}))',
+            f'DROP INDEX {name}',
+        )
+        for name, column in LOWER_UNIQUE_INDEXES
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 
 USER = 'user'
 MODERATOR = 'moderator'
@@ -12,6 +14,23 @@ ROLES = [
 ]
 
 
+class UserQuerySet(models.QuerySet):
+    """Users whose bulk updates drop them from the cache of users."""
+
+    def update(self, **kwargs):
+        """Update the users, which sends no post_save signal."""
+        from .cache import invalidate_users
+
+        user_ids = list(self.values_list('pk', flat=True))
+        count = super().update(**kwargs)
+        invalidate_users(user_ids)
+        return count
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
     """User model."""
 
@@ -30,6 +49,8 @@ class User(AbstractUser):
         max_length=150
     )
 
+    objects = UserManager()
+
     @property
     def is_moderator(self):
         return self.role == MODERATOR
@@ -45,3 +66,44 @@ class User(AbstractUser):
                 check=~models.Q(username='me'), name='name_not_me'
             )
         ]
+
+
+class OutboxEmail(models.Model):
+    """Email waiting in the outbox for the delivery worker."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'pending'),
+        (SENT, 'sent'),
+        (FAILED, 'failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.EmailField(max_length=254)
+    recipient = models.EmailField(max_length=254)
+    status = models.CharField(
+        choices=STATUSES,
+        default=PENDING,
+        max_length=16
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_next_idx'
+            )
+        ]
+
+    def __str__(self):
+        """Return the subject and the recipient."""
+        return f'{self.subject} -> {self.recipient}'
@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import (Avg, DurationField, ExpressionWrapper, F,
+                              Max)
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def enqueue_email(subject, message, from_email, recipient_list):
+    """Put emails into the outbox instead of sending them right away."""
+    return OutboxEmail.objects.bulk_create(
+        OutboxEmail(
+            subject=subject,
+            message=message,
+            from_email=from_email,
+            recipient=recipient,
+        )
+        for recipient in recipient_list
+    )
+
+
+def retry_delay(attempts):
+    """Return the exponential backoff after the given number of attempts."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def mark_failed(email, error):
+    """Schedule a retry of the email or give up after the last attempt."""
+    email.last_error = str(error)
+    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+
+
+def deliver(emails):
+    """Send emails over one backend connection, return the sent count."""
+    for email in emails:
+        email.attempts += 1
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+        return 0
+
+    sent = 0
+    try:
+        for email in emails:
+            try:
+                EmailMessage(
+                    subject=email.subject,
+                    body=email.message,
+                    from_email=email.from_email,
+                    to=[email.recipient],
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                mark_failed(email, error)
+            else:
+                sent += 1
+                email.status = OutboxEmail.SENT
+                email.sent_at = timezone.now()
+    finally:
+        connection.close()
+    return sent
+
+
+def claim_emails(batch_size):
+    """
+    Take a batch of due emails for the current worker: their next
+    attempt moves EMAIL_OUTBOX_LEASE seconds ahead, so that other
+    workers skip them while they are sent, and retry them once the
+    lease is over if the worker dies before recording the result.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                status=OutboxEmail.PENDING,
+                next_attempt_at__lte=now,
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(
+            next_attempt_at=now + timedelta(
+                seconds=settings.EMAIL_OUTBOX_LEASE
+            )
+        )
+    return emails
+
+
+def send_pending_emails(batch_size=None):
+    """
+    Send one batch of due emails over a single backend connection.
+    The batch is claimed and the results are recorded in two short
+    transactions, no rows stay locked while the backend sends.
+    Failed emails are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+    Return the numbers of sent and failed emails.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    emails = claim_emails(batch_size)
+    if not emails:
+        return 0, 0
+
+    sent = deliver(emails)
+    with transaction.atomic():
+        OutboxEmail.objects.bulk_update(
+            emails,
+            ('status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at')
+        )
+    return sent, len(emails) - sent
+
+
+def outbox_stats(since=None):
+    """
+    Return the number of queued emails and the average and maximum
+    delivery latency of the emails sent since the given moment.
+    """
+    delivered = OutboxEmail.objects.filter(status=OutboxEmail.SENT)
+    if since is not None:
+        delivered = delivered.filter(sent_at__gte=since)
+    latency = delivered.annotate(
+        latency=ExpressionWrapper(
+            F('sent_at') - F('created_at'), output_field=DurationField()
+        )
+    ).aggregate(average=Avg('latency'), maximum=Max('latency'))
+    return {
+        'queue_depth': OutboxEmail.objects.filter(
+            status=OutboxEmail.PENDING
+        ).count(),
+        'failed': OutboxEmail.objects.filter(
+            status=OutboxEmail.FAILED
+        ).count(),
+        'latency_average': latency['average'],
+        'latency_max': latency['maximum'],
+    }
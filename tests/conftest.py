@@ -1,9 +1,53 @@
+import os
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(
+    django_db_modify_db_settings_parallel_suffix, django_db_blocker
+):
+    """
+    Fail the database tests when the configured database is unreachable,
+    so a missing database cannot pass the suite as skipped. They are
+    skipped instead only with ALLOW_DB_SKIP=1.
+    """
+    from django.db import OperationalError, connection
+
+    with django_db_blocker.unblock():
+        try:
+            connection.ensure_connection()
+        except OperationalError as error:
+            message = f'База данных недоступна: {error}'
+            if os.getenv('ALLOW_DB_SKIP') == '1':
+                pytest.skip(message)
+            pytest.fail(message, pytrace=False)
+        finally:
+            connection.close()
+
+
+@pytest.fixture
+def dataset(db):
+    """The smallest dataset of the query budget, see query_budget.seed."""
+    from .query_budget import SMALL_DATASET, seed
+
+    return seed(SMALL_DATASET)
+
+
+def pytest_terminal_summary(terminalreporter):
+    from .query_budget import RESULTS, format_results
+
+    if not RESULTS:
+        return
+    terminalreporter.section('query budget')
+    for line in format_results(RESULTS):
+        terminalreporter.write_line(line)
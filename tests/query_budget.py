@@ -0,0 +1,265 @@
+import time
+
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Genre, Review, Title
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import ADMIN, User
+
+# Sizes of the datasets every route is measured on. Lists of the API
+# have PAGE_SIZE = 5 items a page, so the lists span two to four pages
+# and an N+1 query pattern shows up as a growing query count.
+DATASET_SIZES = (6, 11, 16)
+SMALL_DATASET = DATASET_SIZES[0]
+LARGE_DATASET = DATASET_SIZES[-1]
+
+RESULTS = []
+
+
+class Endpoint:
+    """Route of the API with the query budget declared for it."""
+
+    def __init__(self, name, method, url, budget, user=None, data=None,
+                 warmup=False, conditional=False):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.budget = budget
+        self.user = user
+        self.data = data
+        self.warmup = warmup
+        self.conditional = conditional
+
+    def __str__(self):
+        return self.name
+
+
+def seed(size):
+    """
+    Create a dataset in which every list of the API grows with size:
+    categories, genres, titles, users, reviews of one title
+    and comments of one review.
+    """
+    prefix = f'set{size}'
+    users = [
+        User.objects.create(
+            username=f'{prefix}_user{i}', email=f'{prefix}_{i}@yamdb.fake'
+        )
+        for i in range(size)
+    ]
+    admin = User.objects.create(
+        username=f'{prefix}_admin', email=f'{prefix}_admin@yamdb.fake',
+        role=ADMIN
+    )
+    categories = [
+        Category.objects.create(
+            name=f'{prefix} category {i}', slug=f'{prefix}-category-{i}'
+        )
+        for i in range(size)
+    ]
+    genres = [
+        Genre.objects.create(
+            name=f'{prefix} genre {i}', slug=f'{prefix}-genre-{i}'
+        )
+        for i in range(size)
+    ]
+    titles = []
+    for i in range(size):
+        title = Title.objects.create(
+            name=f'{prefix} title {i}', year=2000, category=categories[i]
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=user, text='text', score=i % 10 + 1
+        )
+        for i, user in enumerate(users)
+    ]
+    for user in users:
+        Comment.objects.create(review=reviews[0], author=user, text='text')
+    return {
+        'admin': admin,
+        'user': users[0],
+        'new_user': User.objects.create(
+            username=f'{prefix}_new', email=f'{prefix}_new@yamdb.fake'
+        ),
+        'category': categories[0].slug,
+        'genre': genres[0].slug,
+        'title': titles[0].id,
+        'other_title': titles[1].id,
+        'review': reviews[0].id,
+        'comment': reviews[0].comments.first().id,
+        'username': users[0].username,
+    }
+
+
+def authorized_client(user):
+    """Return an API client with the access token of the user."""
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+def measure(endpoint, dataset):
+    """
+    Run a request and return its status, query count and DB time.
+    Endpoints with warmup are requested twice and measured the second time,
+    conditional ones send the ETag of the first response.
+    """
+    client = (
+        authorized_client(dataset[endpoint.user]) if endpoint.user
+        else APIClient()
+    )
+    data = endpoint.data
+    if callable(data):
+        data = data(dataset)
+    url = endpoint.url.format(**dataset)
+    headers = {}
+    if endpoint.warmup:
+        response = getattr(client, endpoint.method)(url, data, format='json')
+        if endpoint.conditional:
+            headers['HTTP_IF_NONE_MATCH'] = response['ETag']
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = getattr(client, endpoint.method)(
+            url, data, format='json', **headers
+        )
+        elapsed = time.perf_counter() - started
+    db_time = sum(float(query['time']) for query in queries.captured_queries)
+    return {
+        'status': response.status_code,
+        'queries': len(queries),
+        'db_time': db_time,
+        'time': elapsed,
+    }
+
+
+def signup_data(dataset):
+    return {
+        'username': dataset['new_user'].username,
+        'email': dataset['new_user'].email,
+    }
+
+
+def new_signup_data(dataset):
+    return {
+        'username': f'{dataset["username"]}_signup',
+        'email': f'{dataset["username"]}_signup@yamdb.fake',
+    }
+
+
+def token_data(dataset):
+    return {
+        'username': dataset['new_user'].username,
+        'confirmation_code': default_token_generator.make_token(
+            dataset['new_user']
+        ),
+    }
+
+
+ENDPOINTS = [
+    Endpoint('categories-list', 'get', '/api/v1/categories/', 2),
+    Endpoint('categories-list-cached', 'get', '/api/v1/categories/', 0,
+             warmup=True),
+    Endpoint('categories-create', 'post', '/api/v1/categories/', 3,
+             user='admin', data=lambda dataset: {
+                 'name': 'New', 'slug': f'{dataset["category"]}-new',
+             }),
+    Endpoint('categories-delete', 'delete', '/api/v1/categories/{category}/',
+             6, user='admin'),
+    Endpoint('genres-list', 'get', '/api/v1/genres/', 2),
+    Endpoint('genres-list-cached', 'get', '/api/v1/genres/', 0,
+             warmup=True),
+    Endpoint('genres-create', 'post', '/api/v1/genres/', 3,
+             user='admin', data=lambda dataset: {
+                 'name': 'New', 'slug': f'{dataset["genre"]}-new',
+             }),
+    Endpoint('genres-delete', 'delete', '/api/v1/genres/{genre}/',
+             5, user='admin'),
+    Endpoint('titles-list', 'get', '/api/v1/titles/', 4),
+    Endpoint('titles-list-filtered', 'get',
+             '/api/v1/titles/?genre={genre}&year=2000', 4),
+    Endpoint('titles-search', 'get', '/api/v1/titles/?search=title', 4),
+    Endpoint('titles-detail', 'get', '/api/v1/titles/{title}/', 2),
+    Endpoint('titles-detail-not-modified', 'get', '/api/v1/titles/{title}/',
+             1, warmup=True, conditional=True),
+    Endpoint('titles-create', 'post', '/api/v1/titles/', 7, user='admin',
+             data=lambda dataset: {
+                 'name': 'New', 'year': 2000,
+                 'category': dataset['category'], 'genre': [dataset['genre']],
+             }),
+    Endpoint('titles-update', 'patch', '/api/v1/titles/{title}/', 4,
+             user='admin', data={'name': 'Updated'}),
+    Endpoint('reviews-list', 'get', '/api/v1/titles/{title}/reviews/', 3),
+    Endpoint('reviews-list-not-modified', 'get',
+             '/api/v1/titles/{title}/reviews/', 1, warmup=True,
+             conditional=True),
+    Endpoint('reviews-list-cursor', 'get',
+             '/api/v1/titles/{title}/reviews/?cursor=', 2),
+    Endpoint('reviews-detail', 'get',
+             '/api/v1/titles/{title}/reviews/{review}/', 1),
+    # The insert runs in a savepoint, counted inside the test transaction.
+    Endpoint('reviews-create', 'post', '/api/v1/titles/{title}/reviews/', 8,
+             user='new_user', data={'text': 'text', 'score': 5}),
+    Endpoint('reviews-update', 'patch',
+             '/api/v1/titles/{title}/reviews/{review}/', 7,
+             user='user', data={'score': 7}),
+    Endpoint('comments-list', 'get',
+             '/api/v1/titles/{title}/reviews/{review}/comments/', 3),
+    Endpoint('comments-list-cursor', 'get',
+             '/api/v1/titles/{title}/reviews/{review}/comments/?cursor=', 2),
+    Endpoint('comments-detail', 'get',
+             '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+             1),
+    Endpoint('comments-create', 'post',
+             '/api/v1/titles/{title}/reviews/{review}/comments/', 4,
+             user='new_user', data={'text': 'text'}),
+    Endpoint('users-list', 'get', '/api/v1/users/', 3, user='admin'),
+    Endpoint('users-search', 'get', '/api/v1/users/?search={username}', 3,
+             user='admin'),
+    Endpoint('users-detail', 'get', '/api/v1/users/{username}/', 2,
+             user='admin'),
+    Endpoint('users-update', 'patch', '/api/v1/users/{username}/', 3,
+             user='admin', data={'bio': 'bio'}),
+    Endpoint('users-me', 'get', '/api/v1/users/me/', 1, user='user'),
+    Endpoint('users-me-cached', 'get', '/api/v1/users/me/', 0, user='user',
+             warmup=True),
+    Endpoint('users-me-update', 'patch', '/api/v1/users/me/', 2,
+             user='user', data={'bio': 'bio'}),
+    Endpoint('auth-signup', 'post', '/api/v1/auth/signup/', 3,
+             data=signup_data),
+    Endpoint('auth-signup-new', 'post', '/api/v1/auth/signup/', 3,
+             data=new_signup_data),
+    Endpoint('auth-token', 'post', '/api/v1/auth/token/', 1,
+             data=token_data),
+]
+
+
+def format_results(results):
+    """Return the measurements as a text table."""
+    header = ('endpoint', 'status', f'queries@{SMALL_DATASET}',
+              f'queries@{LARGE_DATASET}', 'budget', 'db ms', 'total ms')
+    rows = [header] + [
+        (
+            result['endpoint'],
+            str(result['status']),
+            str(result['small']['queries']),
+            str(result['large']['queries']),
+            str(result['budget']),
+            f"{result['large']['db_time'] * 1000:.2f}",
+            f"{result['large']['time'] * 1000:.1f}",
+        )
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = [
+        ' | '.join(cell.ljust(width) for cell, width in zip(row, widths))
+        for row in rows
+    ]
+    lines.insert(1, '-+-'.join('-' * width for width in widths))
+    return lines
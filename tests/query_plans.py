@@ -0,0 +1,264 @@
+import json
+import os
+from collections import Counter
+
+from api_yamdb.db.plans import SEQUENTIAL, explain
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.db.models import Count
+from rest_framework.test import APIClient
+from reviews.models import Review, Title
+from users.models import ADMIN, User
+
+from .query_budget import authorized_client
+
+# Scale of the generate_dataset data the snapshots are taken on: by
+# default the scale of the snapshot of the database vendor, or 1.
+PLAN_SCALE = os.getenv('QUERY_PLAN_SCALE')
+# Allowed growth of the estimated cost of a query against its snapshot.
+COST_TOLERANCE = 0.5
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), 'query_plans')
+
+
+# Why a filtered or search route reads a table sequentially. Any other
+# sequential scan of these routes fails the test, even in a snapshot.
+LOOKUP_SCANS = {
+    'reviews_category': (
+        'tens of categories: read whole to join by slug and to prefetch'
+    ),
+    'reviews_genre': (
+        'a hundred genres: read whole to join by slug and to prefetch'
+    ),
+    'reviews_title_genre': (
+        'genres of the page are prefetched: on small datasets the whole '
+        'link table is cheaper than its title index'
+    ),
+}
+NAME_SCANS = dict(LOOKUP_SCANS, reviews_title=(
+    'icontains is UPPER(name) LIKE %...%, no index applies; every '
+    'synthetic title is named "Произведение N", so the name of the '
+    'route matches most titles anyway'
+))
+SEARCH_SCANS = dict(LOOKUP_SCANS, **{
+    'reviews_title': (
+        'the indexes are read through a BitmapOr for selective terms; '
+        'the synthetic title name of the route matches every title by '
+        'trigrams, so PostgreSQL rightly reads the table whole'
+    ),
+    'reviews_title_fts': 'FTS5 MATCH through the virtual table index',
+    'reviews_title_trigram': 'FTS5 MATCH through the virtual table index',
+    '(subquery-2)': 'union of the matches, grouped by title',
+    'title_matches': 'matches joined to the titles by primary key',
+})
+USERNAME_SCANS = {
+    'users_user': (
+        'search is UPPER(username) LIKE %...%, no index applies; the '
+        'count reads the table, the page is read by the username index'
+    ),
+}
+
+
+class PlannedRoute:
+    """
+    Route of the API whose SELECT statements are explained. Filtered
+    and search routes list the tables they may read sequentially with
+    the reason in scan_notes; other routes have None.
+    """
+
+    def __init__(self, name, method, url, user=None, data=None,
+                 scan_notes=None):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.user = user
+        self.data = data
+        self.scan_notes = scan_notes
+
+    def __str__(self):
+        return self.name
+
+
+ROUTES = [
+    PlannedRoute('titles-list', 'get', '/api/v1/titles/'),
+    PlannedRoute('titles-filter-category', 'get',
+                 '/api/v1/titles/?category={category}',
+                 scan_notes=LOOKUP_SCANS),
+    PlannedRoute('titles-filter-genre', 'get',
+                 '/api/v1/titles/?genre={genre}', scan_notes=LOOKUP_SCANS),
+    PlannedRoute('titles-filter-genres-any', 'get',
+                 '/api/v1/titles/?genre={genre},{other_genre}',
+                 scan_notes=LOOKUP_SCANS),
+    PlannedRoute('titles-filter-genres-all', 'get',
+                 '/api/v1/titles/?genre_all={genre},{other_genre}',
+                 scan_notes=LOOKUP_SCANS),
+    PlannedRoute('titles-filter-name', 'get',
+                 '/api/v1/titles/?name={name}', scan_notes=NAME_SCANS),
+    PlannedRoute('titles-filter-year', 'get',
+                 '/api/v1/titles/?year={year}', scan_notes=LOOKUP_SCANS),
+    PlannedRoute('titles-filter-year-range', 'get',
+                 '/api/v1/titles/?year_min={year}&year_max={year}',
+                 scan_notes=LOOKUP_SCANS),
+    PlannedRoute('titles-search', 'get', '/api/v1/titles/?search={name}',
+                 scan_notes=SEARCH_SCANS),
+    PlannedRoute('reviews-list', 'get', '/api/v1/titles/{title}/reviews/'),
+    PlannedRoute('reviews-list-cursor', 'get',
+                 '/api/v1/titles/{title}/reviews/?cursor='),
+    PlannedRoute('comments-list', 'get',
+                 '/api/v1/titles/{title}/reviews/{review}/comments/'),
+    PlannedRoute('users-search', 'get', '/api/v1/users/?search={username}',
+                 user='admin', scan_notes=USERNAME_SCANS),
+    PlannedRoute('auth-signup', 'post', '/api/v1/auth/signup/',
+                 data=lambda dataset: {
+                     'username': dataset['username'],
+                     'email': dataset['email'],
+                 }),
+    PlannedRoute('auth-token', 'post', '/api/v1/auth/token/',
+                 data=lambda dataset: {
+                     'username': dataset['username'],
+                     'confirmation_code': dataset['confirmation_code'],
+                 }),
+]
+
+
+def plan_dataset():
+    """
+    Return the identifiers the routes are requested with: the most
+    reviewed title and the most commented of its reviews.
+    """
+    title = Title.objects.select_related('category').order_by(
+        '-rating_count', 'id'
+    ).first()
+    review = Review.objects.filter(title=title).annotate(
+        comment_count=Count('comments')
+    ).order_by('-comment_count', 'id').first()
+    user = User.objects.order_by('id').first()
+    genres = title.genre.order_by('id')
+    return {
+        'admin': User.objects.create(
+            username='plans_admin', email='plans_admin@yamdb.fake',
+            role=ADMIN
+        ),
+        'title': title.id,
+        'name': title.name,
+        'year': title.year,
+        'category': title.category.slug,
+        'genre': genres.first().slug,
+        'other_genre': genres.last().slug,
+        'review': review.id,
+        'username': user.username,
+        'email': user.email,
+        'confirmation_code': default_token_generator.make_token(user),
+    }
+
+
+def capture_selects(route, dataset):
+    """Run the request and return its SELECT statements with params."""
+    statements = []
+
+    def collect(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    client = (
+        authorized_client(dataset[route.user]) if route.user
+        else APIClient()
+    )
+    data = route.data(dataset) if route.data else None
+    with connection.execute_wrapper(collect):
+        response = getattr(client, route.method)(
+            route.url.format(**dataset), data, format='json'
+        )
+    return response.status_code, statements
+
+
+def route_plans(route, dataset):
+    status, statements = capture_selects(route, dataset)
+    plans = []
+    for sql, params in statements:
+        access, cost, lines = explain(connection, sql, params)
+        plans.append({
+            'sql': sql,
+            'access': sorted(access),
+            'cost': cost,
+            'plan': lines,
+        })
+    return status, plans
+
+
+def snapshot_path():
+    return os.path.join(SNAPSHOT_DIR, f'{connection.vendor}.json')
+
+
+def read_snapshots():
+    try:
+        with open(snapshot_path(), encoding='utf-8') as snapshot_file:
+            return json.load(snapshot_file)
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshots(snapshots):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with open(snapshot_path(), 'w', encoding='utf-8') as snapshot_file:
+        json.dump(snapshots, snapshot_file, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+        snapshot_file.write('\n')
+
+
+def plan_scale(snapshots):
+    """Return the scale to load: QUERY_PLAN_SCALE, the snapshot one or 1."""
+    if PLAN_SCALE:
+        return float(PLAN_SCALE)
+    return snapshots['scale'] if snapshots else 1.0
+
+
+def sequential_scans(plan):
+    return Counter(
+        table for table, access in plan['access'] if access == SEQUENTIAL
+    )
+
+
+def regressions(snapshot, plans, same_scale):
+    """
+    Return the differences that fail the test: a table read through
+    an index in the snapshot is read sequentially, or the estimated
+    cost grew past COST_TOLERANCE.
+    """
+    problems = []
+    if len(snapshot) != len(plans):
+        return [
+            f'{len(plans)} SELECT statements instead of {len(snapshot)} '
+            f'in the snapshot'
+        ]
+    for number, (expected, actual) in enumerate(zip(snapshot, plans), 1):
+        expected_scans = sequential_scans(expected)
+        for table, count in sequential_scans(actual).items():
+            if count > expected_scans[table]:
+                problems.append(
+                    f'statement {number} reads {table} sequentially '
+                    f'instead of using an index:\n'
+                    + '\n'.join(actual['plan'])
+                )
+        if same_scale and expected['cost'] and actual['cost'] and (
+            actual['cost'] > expected['cost'] * (1 + COST_TOLERANCE)
+        ):
+            problems.append(
+                f'statement {number} costs {actual["cost"]:.1f} '
+                f'instead of {expected["cost"]:.1f}'
+            )
+    return problems
+
+
+def unexplained_scans(route, plans):
+    """
+    Return the tables a filtered or search route reads sequentially
+    without a note in its scan_notes.
+    """
+    if route.scan_notes is None:
+        return []
+    return sorted({
+        table
+        for plan in plans for table in sequential_scans(plan)
+        if table not in route.scan_notes
+    })
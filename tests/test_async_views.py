@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+from django.urls import resolve
+
+
+URLS = [
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/',
+    '/api/v1/titles/{title}/',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/{review}/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/',
+]
+
+
+async def async_get(url):
+    return await AsyncClient().get(url)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncViews:
+
+    @pytest.mark.parametrize('url', URLS)
+    def test_async_read(self, url, settings, dataset):
+        url = url.format(**dataset)
+        expected = Client().get(url)
+        settings.ROOT_URLCONF = 'api_yamdb.asgi_urls'
+
+        assert asyncio.iscoroutinefunction(resolve(url).func), (
+            f'Проверьте, что в ASGI-конфигурации {url} '
+            'обрабатывается асинхронным представлением'
+        )
+        response = async_to_sync(async_get)(url)
+        assert response.status_code == expected.status_code == 200
+        assert response.json() == expected.json(), (
+            f'Проверьте, что асинхронный {url} возвращает те же данные'
+        )
+
+    def test_sync_routes_left(self, settings):
+        settings.ROOT_URLCONF = 'api_yamdb.asgi_urls'
+
+        assert not asyncio.iscoroutinefunction(
+            resolve('/api/v1/users/').func
+        ), 'Проверьте, что маршруты пользователей остаются синхронными'
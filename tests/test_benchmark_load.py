@@ -0,0 +1,44 @@
+import random
+
+import pytest
+from api.benchmark import compare, summarize_results
+from api.management.commands.benchmark_load import MIX, TrafficMix
+from django.test import Client
+
+
+@pytest.mark.django_db
+class TestTrafficMix:
+
+    def test_requests_succeed(self, dataset):
+        requests = TrafficMix(random.Random(1), users=10).requests(200)
+        client = Client()
+
+        assert {name for name, *_ in requests} == {name for name, _ in MIX}
+        for name, method, path, headers, body in requests:
+            extra = {
+                'HTTP_AUTHORIZATION': headers['Authorization']
+            } if 'Authorization' in headers else {}
+            response = client.generic(
+                method, path, body or '',
+                content_type=headers.get('Content-Type'), **extra
+            )
+            assert response.status_code < 400, (
+                f'Проверьте, что запрос {name} {method} {path} '
+                'нагрузочного теста выполняется без ошибок'
+            )
+
+        mix = TrafficMix(random.Random(1), users=10)
+        assert not any(user.reviews.exists() for user in mix.users), (
+            'Проверьте, что отзывы пользователей нагрузочного теста '
+            'удаляются перед запуском'
+        )
+
+
+def test_compare():
+    results = {'a': ([0.01, 0.02], 1), 'b': ([0.03], 0)}
+    summaries = summarize_results(results, elapsed=2)
+
+    assert summaries['total']['requests'] == 4
+    assert summaries['total']['errors'] == 1
+    changes = compare(summaries, {'a': {'rps': 1.0, 'p95': 10.0}})
+    assert changes == {'a': {'rps': 50.0, 'p95': 100.0}}
@@ -0,0 +1,87 @@
+import pytest
+from api_yamdb.caches import check_shared_caches
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from reviews.cache import CATALOG_CACHES
+from reviews.models import Category, Genre
+from users.models import ADMIN, User
+
+from .query_budget import authorized_client
+
+DATABASE_CACHE = {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'catalog_cache',
+}
+
+
+@pytest.fixture(params=['locmem', 'db'])
+def catalog_backend(request, settings, db):
+    """The catalog cache in memory and in the shared database table."""
+    if request.param == 'db':
+        settings.CACHES = dict(settings.CACHES, catalog=DATABASE_CACHE)
+        call_command('createcachetable', 'catalog_cache')
+    caches['catalog'].clear()
+    yield request.param
+    caches['catalog'].clear()
+
+
+@pytest.fixture
+def admin_client():
+    admin = User.objects.create(
+        username='catalog_admin', email='catalog_admin@yamdb.fake',
+        role=ADMIN
+    )
+    return authorized_client(admin)
+
+
+def slugs(response):
+    return [item['slug'] for item in response.json()['results']]
+
+
+class TestCatalogCache:
+
+    @pytest.mark.parametrize('model, url', [
+        (Category, '/api/v1/categories/'),
+        (Genre, '/api/v1/genres/'),
+    ])
+    def test_write_invalidates_list(self, catalog_backend, admin_client,
+                                    model, url):
+        model.objects.create(name='Первый', slug='first')
+        stats = CATALOG_CACHES[model].stats()
+        client = APIClient()
+
+        first = client.get(url)
+        second = client.get(url)
+        assert (first['X-Cache'], second['X-Cache']) == ('MISS', 'HIT')
+        assert CATALOG_CACHES[model].stats() == {
+            'hits': stats['hits'] + 1, 'misses': stats['misses'] + 1,
+        }, 'Проверьте, что счётчики попаданий и промахов кэша растут'
+
+        response = admin_client.post(url, {'name': 'Второй', 'slug': 'second'})
+        assert response.status_code == 201
+        after_create = client.get(url)
+        assert after_create['X-Cache'] == 'MISS'
+        assert slugs(after_create) == ['first', 'second'], (
+            'Проверьте, что создание через API сбрасывает кэшированный список'
+        )
+
+        model.objects.filter(slug='first').get().delete()
+        assert slugs(client.get(url)) == ['second'], (
+            'Проверьте, что удаление сбрасывает кэшированный список'
+        )
+        renamed = model.objects.get(slug='second')
+        renamed.name = 'Переименован'
+        renamed.save()
+        assert client.get(url).json()['results'][0]['name'] == (
+            'Переименован'
+        ), 'Проверьте, что изменение сбрасывает кэшированный список'
+
+    def test_shared_cache_required(self, settings):
+        settings.SHARED_CACHES = ['catalog']
+        with pytest.raises(ImproperlyConfigured, match='catalog'):
+            check_shared_caches()
+
+        settings.CACHES = dict(settings.CACHES, catalog=DATABASE_CACHE)
+        check_shared_caches()
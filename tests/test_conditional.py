@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Comment, Title
+
+from .query_budget import authorized_client
+
+
+URLS = [
+    '/api/v1/titles/{title}/',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+]
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', URLS)
+    def test_not_modified(self, url, dataset):
+        Title.objects.filter(pk=dataset['title']).update(
+            modified=timezone.now() - timedelta(minutes=1)
+        )
+        url = url.format(**dataset)
+        client = APIClient()
+        response = client.get(url)
+
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ на {url} содержит заголовок ETag'
+        )
+        assert response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на {url} содержит заголовок Last-Modified'
+        )
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == 304, (
+            f'Проверьте, что запрос к {url} с актуальным If-None-Match '
+            'возвращает статус 304'
+        )
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 304, (
+            f'Проверьте, что запрос к {url} с актуальным If-Modified-Since '
+            'возвращает статус 304'
+        )
+
+    @pytest.mark.parametrize('url', URLS)
+    @pytest.mark.parametrize('method, write_url, data', [
+        ('post', '/api/v1/titles/{title}/reviews/',
+         {'text': 'text', 'score': 5}),
+        ('post', '/api/v1/titles/{title}/reviews/{review}/comments/',
+         {'text': 'text'}),
+        ('patch', '/api/v1/titles/{title}/', {'name': 'Updated'}),
+        ('patch', '/api/v1/users/{username}/', {'username': 'renamed'}),
+    ])
+    def test_modified_after_write(self, url, method, write_url, data, dataset):
+        url = url.format(**dataset)
+        client = APIClient()
+        first = client.get(url)
+
+        response = getattr(authorized_client(dataset['admin']), method)(
+            write_url.format(**dataset), data, format='json'
+        )
+        assert response.status_code < 400
+
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=first['ETag']
+        ).status_code == 200, (
+            f'Проверьте, что после изменения данных запрос к {url} '
+            'со старым ETag возвращает статус 200'
+        )
+        # The write usually falls within the second of the first response.
+        if first.has_header('Last-Modified'):
+            assert client.get(
+                url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+            ).status_code == 200, (
+                f'Проверьте, что после изменения данных запрос к {url} '
+                'со старым If-Modified-Since возвращает статус 200, даже в ту '
+                'же секунду'
+            )
+
+    def test_modified_after_comments_delete(self, dataset):
+        url = '/api/v1/titles/{title}/reviews/{review}/comments/'.format(
+            **dataset
+        )
+        client = APIClient()
+        first = client.get(url)
+
+        Comment.objects.filter(review=dataset['review']).delete()
+
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=first['ETag']
+        ).status_code == 200, (
+            'Проверьте, что удаление комментариев через QuerySet меняет '
+            'ETag произведения'
+        )
@@ -0,0 +1,103 @@
+import pytest
+from api.serializers import ReviewSerializer
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+from reviews.models import Title
+
+from .query_budget import authorized_client
+
+
+@pytest.mark.django_db
+class TestConflicts:
+
+    @pytest.mark.parametrize('data', [
+        {'username': '{username}', 'email': 'other@yamdb.fake'},
+        {'username': '{upper_username}', 'email': 'other@yamdb.fake'},
+        {'username': 'other', 'email': '{upper_email}'},
+    ])
+    def test_signup_conflict(self, data, dataset):
+        user = dataset['user']
+        data = {
+            key: value.format(
+                username=user.username,
+                upper_username=user.username.upper(),
+                upper_email=user.email.upper(),
+            )
+            for key, value in data.items()
+        }
+        response = APIClient().post('/api/v1/auth/signup/', data)
+
+        assert response.status_code == 400, (
+            'Проверьте, что регистрация с занятым username или email '
+            'без учёта регистра возвращает статус 400'
+        )
+
+    def test_repeated_signup(self, dataset):
+        user = dataset['user']
+        response = APIClient().post(
+            '/api/v1/auth/signup/',
+            {'username': user.username, 'email': user.email}
+        )
+
+        assert response.status_code == 200, (
+            'Проверьте, что повторная регистрация с теми же username '
+            'и email возвращает статус 200'
+        )
+
+    def test_second_review(self, dataset):
+        response = authorized_client(dataset['user']).post(
+            f'/api/v1/titles/{dataset["title"]}/reviews/',
+            {'text': 'text', 'score': 5}
+        )
+
+        assert response.status_code == 400, (
+            'Проверьте, что второй отзыв на произведение '
+            'возвращает статус 400'
+        )
+        assert 'non_field_errors' in response.json()
+
+    def test_other_review_error_not_reported_as_second(self, dataset):
+        serializer = ReviewSerializer(data={'text': 'text', 'score': 5})
+        serializer.is_valid(raise_exception=True)
+
+        with pytest.raises(IntegrityError):
+            serializer.save(
+                author=dataset['new_user'],
+                title=Title.objects.get(pk=dataset['title']),
+                text=None,
+            )
+
+    @pytest.mark.parametrize('field, value', [
+        ('username', '{upper_username}'),
+        ('email', '{upper_email}'),
+    ])
+    def test_user_conflict(self, field, value, dataset):
+        user = dataset['user']
+        value = value.format(
+            upper_username=user.username.upper(),
+            upper_email=user.email.upper(),
+        )
+        client = authorized_client(dataset['admin'])
+        data = {'username': 'other', 'email': 'other@yamdb.fake'}
+        data[field] = value
+
+        created = client.post('/api/v1/users/', data)
+        assert created.status_code == 400, (
+            'Проверьте, что создание пользователя с занятым username или '
+            'email без учёта регистра возвращает статус 400'
+        )
+        assert list(created.json()) == [field]
+
+        updated = client.patch(
+            f'/api/v1/users/{dataset["new_user"].username}/', {field: value}
+        )
+        assert updated.status_code == 400
+        assert list(updated.json()) == [field]
+
+        same = client.patch(
+            f'/api/v1/users/{user.username}/', {field: value}
+        )
+        assert same.status_code == 200, (
+            'Проверьте, что пользователь может сменить регистр своего '
+            'username или email'
+        )
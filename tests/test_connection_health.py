@@ -0,0 +1,54 @@
+import os
+import resource
+import socket
+
+import pytest
+
+from api_yamdb.db.health import is_alive
+
+HIGH_FD = 1500
+
+
+class Connection:
+    """psycopg2 connection stand-in with the socket of a descriptor."""
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.closed = 0
+
+    def fileno(self):
+        return self.fd
+
+
+@pytest.fixture
+def sockets():
+    if resource.getrlimit(resource.RLIMIT_NOFILE)[0] <= HIGH_FD:
+        pytest.skip(f'Нужен лимит открытых файлов больше {HIGH_FD}')
+    client, server = socket.socketpair()
+    os.dup2(client.fileno(), HIGH_FD)
+    yield Connection(HIGH_FD), server
+    os.close(HIGH_FD)
+    client.close()
+    server.close()
+
+
+class TestIsAlive:
+
+    def test_high_descriptor(self, sockets):
+        connection, server = sockets
+
+        assert is_alive(connection), (
+            'Проверьте, что соединение с дескриптором больше 1024 '
+            'считается живым'
+        )
+        server.close()
+        assert not is_alive(connection), (
+            'Проверьте, что закрытое сервером соединение с дескриптором '
+            'больше 1024 считается разорванным'
+        )
+
+    def test_closed(self, sockets):
+        connection, _ = sockets
+        connection.closed = 1
+
+        assert not is_alive(connection)
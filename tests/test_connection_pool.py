@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from api_yamdb.db.pool import ConnectionPool, PoolTimeout
+
+
+class Connection:
+    """Connection stand-in that only records being closed."""
+
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(size=2, timeout=0.1):
+    return ConnectionPool(
+        size, timeout,
+        check=lambda connection: connection.alive,
+        reset=lambda connection: not connection.closed,
+    )
+
+
+class TestConnectionPool:
+
+    def test_reuse(self):
+        pool = make_pool()
+        connection = pool.acquire(Connection)
+        pool.release(connection)
+
+        assert pool.acquire(Connection) is connection, (
+            'Проверьте, что пул выдаёт возвращённое соединение повторно'
+        )
+        assert pool.stats()['created'] == 1
+
+    def test_dead_connection_dropped(self):
+        pool = make_pool()
+        connection = pool.acquire(Connection)
+        pool.release(connection)
+        connection.alive = False
+
+        assert pool.acquire(Connection) is not connection, (
+            'Проверьте, что пул не выдаёт разорванные соединения'
+        )
+        assert connection.closed
+
+    def test_size_limit(self):
+        pool = make_pool(size=1)
+        connection = pool.acquire(Connection)
+
+        with pytest.raises(PoolTimeout):
+            pool.acquire(Connection)
+        stats = pool.stats()
+        assert stats['saturation'] == 1
+        assert stats['timeouts'] == 1
+
+        releaser = threading.Timer(0.05, pool.release, [connection])
+        releaser.start()
+        assert pool.acquire(Connection) is connection, (
+            'Проверьте, что ожидающий поток получает освободившееся '
+            'соединение'
+        )
+        releaser.join()
+        assert pool.stats()['waits'] == 2
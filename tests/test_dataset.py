@@ -0,0 +1,75 @@
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from reviews.dataset import DatasetGenerator
+from reviews.models import Comment, Review, Title
+
+SCALE = 0.05
+
+
+def dataset(seed, scale=SCALE):
+    generator = DatasetGenerator(seed, scale)
+    comments = []
+    reviews = list(generator.review_rows(comments.append))
+    return list(generator.title_rows()), reviews, comments
+
+
+class TestDatasetGenerator:
+
+    def test_reproducible(self):
+        assert dataset(1) == dataset(1), (
+            'Проверьте, что генератор с одним seed возвращает '
+            'одинаковые данные'
+        )
+        assert dataset(1) != dataset(2), (
+            'Проверьте, что данные зависят от seed'
+        )
+
+    def test_reviews(self):
+        _, reviews, comments = dataset(1, scale=0.5)
+        pairs = [(title, author) for _, title, _, author, _, _ in reviews]
+        per_title = sorted(Counter(title for title, _ in pairs).values())
+
+        assert len(pairs) == len(set(pairs)), (
+            'Проверьте, что автор оставляет не больше одного отзыва '
+            'на произведение'
+        )
+        assert per_title[-1] > 5 * per_title[len(per_title) // 2], (
+            'Проверьте, что число отзывов распределено неравномерно'
+        )
+        assert all(
+            comment[2] > reviews[comment[4] - 1][5] for comment in comments
+        ), 'Проверьте, что комментарий написан после отзыва'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenerateDataset:
+
+    def test_load_database(self):
+        started = timezone.now()
+        call_command('generate_dataset', scale=SCALE)
+        _, reviews, comments = dataset(1)
+        title = Title.objects.order_by('-rating_count').first()
+
+        assert Review.objects.count() == len(reviews)
+        assert Comment.objects.count() == len(comments)
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после загрузки пересчитан рейтинг'
+        )
+        assert not Title.objects.filter(modified__lt=started).exists(), (
+            'Проверьте, что загруженные произведения получают время загрузки'
+        )
+
+    def test_csv_for_import(self, tmp_path):
+        call_command(
+            'generate_dataset', scale=SCALE, output_dir=str(tmp_path)
+        )
+        call_command('import_csv', all=True, data_dir=str(tmp_path))
+        _, reviews, comments = dataset(1)
+
+        assert Review.objects.count() == len(reviews), (
+            'Проверьте, что import_csv загружает сгенерированные файлы'
+        )
+        assert Comment.objects.count() == len(comments)
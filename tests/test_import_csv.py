@@ -0,0 +1,132 @@
+import csv
+import os
+import shutil
+from io import StringIO
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from reviews.management.commands.import_csv import (DATA_DIR, DATASET,
+                                                    get_secondary_indexes)
+from reviews.models import Category, Review, Title
+from users.models import User
+
+from api_yamdb.settings import BASE_DIR
+
+from .test_ratings import assert_ratings_match
+
+DATA_PATH = os.path.join(BASE_DIR, DATA_DIR)
+
+
+def csv_rows(path, name):
+    with open(os.path.join(path, name), encoding='utf-8') as csv_file:
+        return list(csv.reader(csv_file))[1:]
+
+
+def import_csv(*args):
+    call_command('import_csv', *args, stdout=StringIO())
+
+
+def secondary_indexes():
+    with connection.cursor() as cursor:
+        return {
+            table: sorted(get_secondary_indexes(cursor, table))
+            for table in (
+                apps.get_model(label)._meta.db_table
+                for _, label, _ in DATASET
+            )
+        }
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportCsv:
+
+    def test_import_dataset(self):
+        indexes = secondary_indexes()
+        import_csv('--all')
+
+        for name, label, _ in DATASET:
+            model = apps.get_model(label)
+            assert model.objects.count() == len(csv_rows(DATA_PATH, name)), (
+                f'Проверьте, что из {name} загружены все строки'
+            )
+        try:
+            connection.check_constraints()
+        except IntegrityError as error:
+            pytest.fail(
+                'Проверьте, что загруженные строки ссылаются на '
+                f'существующие записи: {error}'
+            )
+        assert secondary_indexes() == indexes, (
+            'Проверьте, что индексы созданы заново после загрузки'
+        )
+        assert_ratings_match(
+            'Проверьте, что рейтинги пересчитаны после загрузки'
+        )
+
+    def test_next_insert_after_import(self):
+        import_csv('--all')
+
+        user = User.objects.create(username='new', email='new@yamdb.fake')
+        category = Category.objects.create(name='Новая', slug='new')
+        title = Title.objects.create(name='Новое', year=2000,
+                                     category=category)
+        review = Review.objects.create(title=title, author=user, text='text',
+                                       score=5)
+        for name, instance in (
+            ('users.csv', user), ('category.csv', category),
+            ('titles.csv', title), ('review.csv', review),
+        ):
+            loaded = max(int(row[0]) for row in csv_rows(DATA_PATH, name))
+            assert instance.pk > loaded, (
+                f'Проверьте, что после загрузки {name} новые записи получают '
+                'первичный ключ после загруженных'
+            )
+
+    def test_indexes_recreated_after_failed_batch(self, tmp_path):
+        for name, _, _ in DATASET:
+            shutil.copy(os.path.join(DATA_PATH, name), tmp_path)
+        with open(os.path.join(DATA_PATH, 'comments.csv'),
+                  encoding='utf-8') as source:
+            rows = list(csv.reader(source))
+        # The last batch repeats the id of the first comment.
+        with open(tmp_path / 'comments.csv', 'w', encoding='utf-8') as target:
+            csv.writer(target).writerows(rows + rows[1:2])
+        indexes = secondary_indexes()
+
+        with pytest.raises(IntegrityError):
+            import_csv(
+                '--all', '--data-dir', str(tmp_path), '--batch-size', '1'
+            )
+
+        assert secondary_indexes() == indexes, (
+            'Проверьте, что индексы созданы заново, даже если загрузка '
+            'прервалась ошибкой'
+        )
+
+    def test_titles_touched_only_by_their_tables(self, tmp_path):
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        user = User.objects.create(username='author', email='a@yamdb.fake')
+        with open(tmp_path / 'genre.csv', 'w', encoding='utf-8') as target:
+            target.write('id,name,slug\n100,Драма,drama\n')
+        with open(tmp_path / 'review.csv', 'w', encoding='utf-8') as target:
+            target.write(
+                'id,title_id,text,author_id,score,pub_date\n'
+                f'100,{title.pk},text,{user.pk},5,2020-01-01T00:00:00Z\n'
+            )
+
+        import_csv('--models', 'genre', '--paths', str(tmp_path / 'genre.csv'))
+        assert Title.objects.get(pk=title.pk).version == title.version, (
+            'Проверьте, что загрузка жанров не меняет версии произведений'
+        )
+
+        import_csv(
+            '--tables', 'reviews_review', '--paths',
+            str(tmp_path / 'review.csv')
+        )
+        assert Title.objects.get(pk=title.pk).version > title.version, (
+            'Проверьте, что загрузка отзывов меняет версии произведений'
+        )
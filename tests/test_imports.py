@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+import pytest
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from reviews.imports import (ImportLeaseExpired, claim_pending_import,
+                             process_import)
+from reviews.models import (Category, CategoryImport, CsvImport, Review,
+                            ReviewImport, Title, TitleImport)
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def upload(import_model, content):
+    csv_import = import_model()
+    csv_import.csv_file.save('upload.csv', ContentFile(content.encode()))
+    return csv_import
+
+
+def versions():
+    return dict(Title.objects.values_list('pk', 'version'))
+
+
+def process_next():
+    csv_import = claim_pending_import()
+    process_import(csv_import)
+    csv_import.refresh_from_db()
+    return csv_import
+
+
+@pytest.mark.django_db
+class TestImports:
+
+    def test_clean_import(self):
+        upload(CategoryImport, 'id,name,slug\n1,Фильм,film\n2,Книга,book\n')
+
+        csv_import = process_next()
+        assert csv_import.status == CsvImport.DONE
+        assert (csv_import.rows_total, csv_import.rows_processed) == (2, 2)
+        assert csv_import.duration is not None
+        assert list(Category.objects.values_list('slug', flat=True)) == [
+            'film', 'book'
+        ]
+
+    def test_import_again_updates_rows(self):
+        upload(CategoryImport, 'id,name,slug\n1,Фильм,film\n')
+        process_next()
+        upload(CategoryImport, 'id,name,slug\n1,Кино,film\n2,Книга,book\n')
+
+        assert process_next().status == CsvImport.DONE
+        assert list(Category.objects.values_list('id', 'name')) == [
+            (1, 'Кино'), (2, 'Книга')
+        ], 'Проверьте, что повторная загрузка обновляет строки по id'
+
+    def test_bad_row_fails_import(self):
+        upload(TitleImport, (
+            'id,name,year,description,category_id\n1,Фильм,не год,,\n'
+        ))
+
+        with pytest.raises(Exception):
+            process_next()
+        csv_import = TitleImport.objects.get()
+        assert csv_import.status == CsvImport.FAILED
+        assert 'не год' in csv_import.error, (
+            'Проверьте, что ошибка строки сохраняется в загрузке'
+        )
+
+    def test_expired_import_claimed_again(self, settings):
+        upload(CategoryImport, 'id,name,slug\n1,Фильм,film\n')
+        stale = claim_pending_import()
+        assert claim_pending_import() is None, (
+            'Проверьте, что загрузку в работе не берёт другой воркер'
+        )
+
+        CategoryImport.objects.filter(pk=stale.pk).update(
+            started_at=timezone.now() - timedelta(
+                seconds=settings.CSV_IMPORT_LEASE + 1
+            )
+        )
+        stale.refresh_from_db()
+        reclaimed = claim_pending_import()
+        assert reclaimed is not None and reclaimed.pk == stale.pk, (
+            'Проверьте, что загрузку упавшего воркера берёт другой'
+        )
+
+        with pytest.raises(ImportLeaseExpired):
+            process_import(stale)
+        assert CategoryImport.objects.get().status == CsvImport.PROCESSING, (
+            'Проверьте, что прежний воркер не меняет статус чужой загрузки'
+        )
+        process_import(reclaimed)
+        assert CategoryImport.objects.get().status == CsvImport.DONE
+
+    def test_review_import_updates_its_titles(self):
+        category = Category.objects.create(name='Фильм', slug='film')
+        titles = [
+            Title.objects.create(name=f'title{i}', year=2000,
+                                 category=category)
+            for i in range(3)
+        ]
+        author = User.objects.create(username='author', email='a@yamdb.fake')
+        header = 'id,text,pub_date,score,author_id,title_id\n'
+        upload(ReviewImport, (
+            f'{header}1,text,2020-01-01T00:00:00Z,4,{author.pk},'
+            f'{titles[0].pk}\n'
+        ))
+        process_next()
+        before = versions()
+
+        upload(ReviewImport, (
+            f'{header}1,text,2020-01-01T00:00:00Z,8,{author.pk},'
+            f'{titles[1].pk}\n'
+        ))
+        process_next()
+
+        ratings = dict(Title.objects.values_list('pk', 'rating_count'))
+        assert ratings == {
+            titles[0].pk: 0, titles[1].pk: 1, titles[2].pk: 0
+        }, (
+            'Проверьте, что загрузка отзывов пересчитывает рейтинги прежних '
+            'и новых произведений отзывов'
+        )
+        assert Title.objects.get(pk=titles[1].pk).rating == 8
+        after = versions()
+        assert after[titles[2].pk] == before[titles[2].pk], (
+            'Проверьте, что загрузка не трогает произведения без '
+            'загруженных отзывов'
+        )
+        assert after[titles[0].pk] > before[titles[0].pk]
+        assert after[titles[1].pk] > before[titles[1].pk]
+        assert Review.objects.get().score == 8
+
+    def test_category_import_touches_its_titles(self):
+        film = Category.objects.create(name='Фильм', slug='film')
+        book = Category.objects.create(name='Книга', slug='book')
+        shown = Title.objects.create(name='Фильм', year=2000, category=film)
+        other = Title.objects.create(name='Книга', year=2000, category=book)
+        before = versions()
+
+        upload(CategoryImport, f'id,name,slug\n{film.pk},Кино,film\n')
+        process_next()
+
+        after = versions()
+        assert after[shown.pk] > before[shown.pk], (
+            'Проверьте, что загрузка категорий меняет версию их произведений'
+        )
+        assert after[other.pk] == before[other.pk]
@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from api.index_audit import (Statement, audit, index_migrations,
+                             read_workload, recommended_indexes)
+from django.core.management import CommandError, call_command
+from reviews.models import Review
+
+
+TITLES_BY_YEAR = (
+    'SELECT "reviews_title"."id" FROM "reviews_title" '
+    'WHERE "reviews_title"."year" = %s '
+    'ORDER BY "reviews_title"."name" ASC LIMIT 10'
+)
+
+
+def test_read_workload():
+    lines = ['# access log', 'GET /api/v1/titles/', '', '/api/v1/genres/']
+
+    assert read_workload(lines) == [
+        ('GET', '/api/v1/titles/', {}, None),
+        ('GET', '/api/v1/genres/', {}, None),
+    ]
+
+
+@pytest.mark.django_db
+class TestIndexAudit:
+
+    def test_missing_index(self):
+        statement = Statement(TITLES_BY_YEAR, [2000])
+        statement.count = 3
+        statement.routes = {'title-list'}
+        statement.access = [['reviews_title', 'seq scan']]
+
+        report = audit([statement], min_rows=0)
+
+        assert ('reviews_title', ('year', 'name')) in report['missing'], (
+            'Проверьте, что для полного чтения таблицы рекомендуется '
+            'составной индекс из условий равенства и сортировки'
+        )
+        sources = index_migrations(
+            recommended_indexes(report['missing']), 'audit_indexes'
+        )
+        path, source = sources.popitem()
+        assert path.endswith('_audit_indexes.py')
+        assert "fields=['year', 'name']" in source
+
+    def test_command(self, tmp_path, dataset):
+        workload = tmp_path / 'workload.txt'
+        workload.write_text(
+            f'GET /api/v1/titles/?name=title\n'
+            f'GET /api/v1/titles/{dataset["title"]}/reviews/\n'
+            f'POST /api/v1/titles/{dataset["title"]}/reviews/\n'
+        )
+        reviews = Review.objects.count()
+        out = StringIO()
+
+        with pytest.raises(CommandError, match='--allow-writes'):
+            call_command('audit_indexes', workload=str(workload))
+        call_command(
+            'audit_indexes', workload=str(workload), min_rows=0,
+            allow_writes=True, stdout=out
+        )
+
+        assert 'Replayed 3 requests' in out.getvalue()
+        assert 'reviews_title.name: LIKE with a leading wildcard' \
+            in out.getvalue(), (
+                'Проверьте, что фильтр icontains отмечается как фильтр, '
+                'который не может использовать индекс'
+            )
+        assert Review.objects.count() == reviews
+
+    def test_traffic_mix_reads_only(self, dataset):
+        out = StringIO()
+
+        call_command('audit_indexes', requests=50, stdout=out)
+
+        replayed = int(out.getvalue().split()[1])
+        assert 0 < replayed < 50, (
+            'Проверьте, что без --allow-writes из смеси запросов '
+            'воспроизводятся только чтения'
+        )
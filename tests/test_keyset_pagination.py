@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+import pytest
+from api_yamdb.db.plans import explain, used_indexes
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.models import Category, Review, Title
+from users.models import User
+
+REVIEWS = 13
+# Reviews sharing a pub_date: pages must be split by id inside a tie.
+TIES = (3, 4, 5, 6, 7, 8)
+
+
+@pytest.fixture
+def reviews():
+    category = Category.objects.create(name='Фильм', slug='film')
+    title = Title.objects.create(name='title', year=2000, category=category)
+    created = [
+        Review.objects.create(
+            title=title, text='text', score=5,
+            author=User.objects.create(
+                username=f'author{i}', email=f'author{i}@yamdb.fake'
+            ),
+        )
+        for i in range(REVIEWS)
+    ]
+    start = timezone.now() - timedelta(days=1)
+    for number, review in enumerate(created):
+        offset = TIES[0] if number in TIES else number
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=start + timedelta(minutes=offset)
+        )
+    expected = list(
+        Review.objects.filter(title=title).order_by(
+            'pub_date', 'id'
+        ).values_list('id', flat=True)
+    )
+    return f'/api/v1/titles/{title.id}/reviews/', expected
+
+
+def walk(client, url, link):
+    """Follow the link of every page and return the ids of the pages."""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append([review['id'] for review in response.json()['results']])
+        url = response.json()[link]
+    return pages
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_walk_forward_and_back(self, reviews):
+        url, expected = reviews
+        client = APIClient()
+
+        forward = walk(client, f'{url}?cursor=', 'next')
+        assert [pk for page in forward for pk in page] == expected, (
+            'Проверьте, что страницы курсора идут по (pub_date, id) без '
+            'пропусков и повторов, в том числе при равных pub_date'
+        )
+        assert [len(page) for page in forward] == [5, 5, 3]
+
+        last_page = client.get(url, {'cursor': ''}).json()
+        while last_page['next']:
+            last_page = client.get(last_page['next']).json()
+        backward = walk(client, last_page['previous'], 'previous')
+        assert [pk for page in reversed(backward) for pk in page] == (
+            expected[:-3]
+        ), 'Проверьте, что ссылки previous возвращают предыдущие страницы'
+        assert backward[-1] == forward[0]
+
+    def test_deep_page_uses_index_range(self, reviews):
+        url, _ = reviews
+        client = APIClient()
+        second = client.get(url, {'cursor': ''}).json()['next']
+
+        with CaptureQueriesContext(connection) as queries:
+            client.get(second)
+        statement = next(
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+            and 'LIMIT' in query['sql']
+        )
+        # PostgreSQL does not derive an index bound from the OR of the
+        # (pub_date, id) comparison, only from the redundant conjunct.
+        assert '"reviews_review"."pub_date" >=' in statement, (
+            'Проверьте, что условие курсора ограничивает pub_date снизу'
+        )
+        if connection.vendor == 'sqlite':
+            access, _, lines = explain(connection, statement, None)
+            assert 'review_title_pub_date_idx' in used_indexes(access)
+            assert any('pub_date>' in line for line in lines), (
+                'Проверьте, что страница курсора читает диапазон индекса '
+                'по pub_date, а не все отзывы до курсора'
+            )
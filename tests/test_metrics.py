@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+
+import pytest
+from api.metrics import REQUESTS
+from api_yamdb.db.pool import POOLS
+from api_yamdb.metrics import Registry
+from django.test import Client
+
+from .test_connection_pool import Connection, make_pool
+
+# No process has this pid, see /proc/sys/kernel/pid_max.
+EXITED_PID = 2 ** 22 + 1
+
+
+def sample_value(exposition, sample):
+    for line in exposition.splitlines():
+        if line.startswith(f'{sample} '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class TestRegistry:
+
+    def test_threads(self):
+        registry = Registry(directory='')
+        requests = registry.counter('requests_total', 'Requests.', ('route',))
+        duration = registry.histogram(
+            'duration_seconds', 'Duration.', buckets=(0.1, 1)
+        )
+
+        def record():
+            for _ in range(1000):
+                requests.inc(('list',))
+                duration.observe(0.5)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        exposition = registry.exposition()
+
+        assert sample_value(
+            exposition, 'requests_total{route="list"}'
+        ) == 4000, 'Проверьте, что счётчики потоков суммируются'
+        assert sample_value(
+            exposition, 'duration_seconds_bucket{le="0.1"}'
+        ) == 0
+        assert sample_value(
+            exposition, 'duration_seconds_bucket{le="+Inf"}'
+        ) == 4000, 'Проверьте, что корзины гистограммы накопительные'
+        assert sample_value(exposition, 'duration_seconds_sum') == 2000
+
+    def test_processes(self, tmp_path):
+        registry = Registry(directory=str(tmp_path), flush_interval=0)
+        requests = registry.counter('requests_total', 'Requests.')
+        registry.gauge('workers', 'Workers.')
+        requests.inc(amount=2)
+        for pid in (os.getppid(), EXITED_PID):
+            with open(tmp_path / f'{pid}.json', 'w') as samples_file:
+                json.dump(
+                    [['requests_total', [], 3], ['workers', [], 1]],
+                    samples_file
+                )
+
+        exposition = registry.exposition()
+
+        assert sample_value(exposition, 'requests_total') == 8, (
+            'Проверьте, что метрики всех процессов суммируются'
+        )
+        assert sample_value(exposition, 'workers') == 1, (
+            'Проверьте, что значения завершившихся процессов не '
+            'попадают в метрики-gauge'
+        )
+        assert not (tmp_path / f'{EXITED_PID}.json').exists()
+        assert sample_value(registry.exposition(), 'requests_total') == 8, (
+            'Проверьте, что счётчики завершившихся процессов сохраняются'
+        )
+
+    def test_max_gauge(self, tmp_path):
+        registry = Registry(directory=str(tmp_path), flush_interval=0)
+        saturation = registry.gauge('saturation', 'Saturation.', combine=max)
+        registry.process_collectors.append(lambda: [(saturation, (), 0.25)])
+        with open(tmp_path / f'{os.getppid()}.json', 'w') as samples_file:
+            json.dump([['saturation', [], 0.75]], samples_file)
+
+        assert sample_value(registry.exposition(), 'saturation') == 0.75, (
+            'Проверьте, что gauge с combine=max не суммируется по процессам'
+        )
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(settings, dataset):
+    settings.METRICS_DIR = ''
+    labels = ('reviews-list', 'GET', '200')
+    before = REQUESTS.registry.collect().get((REQUESTS.name, labels), 0)
+    client = Client()
+    client.get(f'/api/v1/titles/{dataset["title"]}/reviews/')
+    client.get('/api/v1/genres/')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    exposition = response.content.decode()
+    assert sample_value(
+        exposition,
+        'yamdb_http_requests_total'
+        '{route="reviews-list",method="GET",status="200"}'
+    ) == before + 1, (
+        'Проверьте, что запросы считаются по имени маршрута'
+    )
+    assert 'yamdb_db_queries_per_request_bucket{route="reviews-list"' \
+        in exposition
+    assert 'yamdb_catalog_cache_hit_ratio{catalog="genre"}' in exposition
+    assert sample_value(exposition, 'yamdb_email_queue_depth') is not None
+
+
+@pytest.mark.django_db
+def test_metrics_pool(settings, monkeypatch):
+    settings.METRICS_DIR = ''
+    pool = make_pool(size=4)
+    pool.acquire(Connection)
+    monkeypatch.setitem(POOLS, ('metrics', os.getpid()), pool)
+
+    exposition = Client().get('/metrics').content.decode()
+
+    assert sample_value(
+        exposition, 'yamdb_db_pool_saturation{alias="metrics"}'
+    ) == 0.25, 'Проверьте, что экспортируется загрузка пула'
+    assert sample_value(
+        exposition, 'yamdb_db_pool_acquired_total{alias="metrics"}'
+    ) == 1
+    assert sample_value(
+        exposition, 'yamdb_db_pool_acquire_seconds_total{alias="metrics"}'
+    ) is not None
+    assert sample_value(
+        exposition, 'yamdb_db_pool_acquire_seconds_max{alias="metrics"}'
+    ) is not None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('remote_addr, token, status', [
+    ('10.0.0.5', '', 403),
+    ('10.0.0.5', 'Bearer wrong', 403),
+    ('10.0.0.5', 'Bearer secret', 200),
+    ('10.1.2.3', '', 200),
+])
+def test_metrics_access(settings, remote_addr, token, status):
+    settings.METRICS_DIR = ''
+    settings.METRICS_ALLOWED_IPS = ['127.0.0.1', '10.1.0.0/16']
+    settings.METRICS_TOKEN = 'secret'
+
+    response = Client().get(
+        '/metrics', REMOTE_ADDR=remote_addr, HTTP_AUTHORIZATION=token
+    )
+
+    assert response.status_code == status, (
+        'Проверьте, что /metrics отдаётся только разрешённым адресам '
+        'и по токену'
+    )
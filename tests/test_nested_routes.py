@@ -0,0 +1,36 @@
+import pytest
+from rest_framework.test import APIClient
+
+from .query_budget import authorized_client
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/{other_title}/reviews/{review}/',
+        '/api/v1/titles/{other_title}/reviews/{review}/comments/',
+        '/api/v1/titles/{other_title}/reviews/{review}/comments/{comment}/',
+        '/api/v1/titles/0/reviews/',
+        '/api/v1/titles/{title}/reviews/0/comments/',
+    ])
+    def test_parent_mismatch(self, url, dataset):
+        response = APIClient().get(url.format(**dataset))
+
+        assert response.status_code == 404, (
+            f'Проверьте, что запрос к {url} с отзывом или комментарием '
+            'другого произведения возвращает статус 404'
+        )
+
+    def test_comment_create_parent_mismatch(self, dataset):
+        response = authorized_client(dataset['user']).post(
+            '/api/v1/titles/{other_title}/reviews/{review}/comments/'.format(
+                **dataset
+            ),
+            {'text': 'text'}
+        )
+
+        assert response.status_code == 404, (
+            'Проверьте, что нельзя оставить комментарий к отзыву '
+            'через другое произведение'
+        )
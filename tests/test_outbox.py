@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.utils import timezone
+from users.models import OutboxEmail
+from users.outbox import enqueue_email, send_pending_emails
+
+FAILING_BACKEND = 'tests.test_outbox.FailingBackend'
+CHECKING_BACKEND = 'tests.test_outbox.CheckingBackend'
+
+
+class FailingBackend(EmailBackend):
+    """Backend refusing every email."""
+
+    def send_messages(self, messages):
+        raise ConnectionError('smtp is down')
+
+
+class CheckingBackend(EmailBackend):
+    """Backend recording the state of the outbox while it sends."""
+    sending = []
+
+    def send_messages(self, messages):
+        self.sending.append((
+            connection.in_atomic_block,
+            OutboxEmail.objects.filter(
+                next_attempt_at__lte=timezone.now()
+            ).count(),
+        ))
+        return super().send_messages(messages)
+
+
+def enqueue(count=1):
+    enqueue_email(
+        'Код', 'code', 'test@yamdb.com',
+        [f'user{number}@yamdb.fake' for number in range(count)]
+    )
+
+
+def make_due():
+    OutboxEmail.objects.update(next_attempt_at=timezone.now())
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_send(self, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        enqueue(2)
+
+        assert send_pending_emails() == (2, 0)
+        assert len(mail.outbox) == 2
+        assert set(OutboxEmail.objects.values_list('status', 'attempts')) == {
+            (OutboxEmail.SENT, 1)
+        }
+        assert send_pending_emails() == (0, 0)
+
+    def test_retry_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = FAILING_BACKEND
+        enqueue()
+
+        started = timezone.now()
+        assert send_pending_emails() == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert (email.status, email.attempts) == (OutboxEmail.PENDING, 1)
+        assert 'smtp is down' in email.last_error
+        delay = timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY)
+        assert email.next_attempt_at >= started + delay, (
+            'Проверьте, что неотправленное письмо откладывается'
+        )
+        assert send_pending_emails() == (0, 0), (
+            'Проверьте, что письмо не повторяется до конца задержки'
+        )
+
+        make_due()
+        started = timezone.now()
+        send_pending_emails()
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.next_attempt_at >= started + 2 * delay, (
+            'Проверьте, что задержка растёт экспоненциально'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        make_due()
+        assert send_pending_emails() == (1, 0)
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutboxEmail.SENT, 3)
+
+    def test_failed_after_last_attempt(self, settings):
+        settings.EMAIL_BACKEND = FAILING_BACKEND
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        enqueue()
+
+        for _ in range(2):
+            make_due()
+            send_pending_emails()
+        email = OutboxEmail.objects.get()
+        assert (email.status, email.attempts) == (OutboxEmail.FAILED, 2), (
+            'Проверьте, что после последней попытки письмо не отправляется'
+        )
+        make_due()
+        assert send_pending_emails() == (0, 0)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_send_outside_transaction(settings):
+    settings.EMAIL_BACKEND = CHECKING_BACKEND
+    CheckingBackend.sending.clear()
+    enqueue(2)
+
+    assert send_pending_emails() == (2, 0)
+    assert CheckingBackend.sending == [(False, 0), (False, 0)], (
+        'Проверьте, что письма отправляются вне транзакции и уже взяты '
+        'в работу, другие воркеры их не видят'
+    )
@@ -0,0 +1,43 @@
+import pytest
+from django.core.cache import caches
+
+from .query_budget import DATASET_SIZES, ENDPOINTS, RESULTS, measure, seed
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Identifiers are reused between tests, cached rows must not be."""
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('endpoint', ENDPOINTS, ids=str)
+    def test_query_budget(self, endpoint):
+        measured = [measure(endpoint, seed(size)) for size in DATASET_SIZES]
+        small, large = measured[0], measured[-1]
+        RESULTS.append({
+            'endpoint': endpoint.name,
+            'status': large['status'],
+            'budget': endpoint.budget,
+            'small': small,
+            'large': large,
+        })
+
+        statuses = [result['status'] for result in measured]
+        assert max(statuses) < 400, (
+            f'Проверьте, что запрос {endpoint} выполняется успешно: '
+            f'получены статусы {statuses}'
+        )
+        counts = [result['queries'] for result in measured]
+        assert len(set(counts)) == 1, (
+            f'Количество запросов к БД для {endpoint} растёт вместе с '
+            f'объёмом данных: {" -> ".join(map(str, counts))}'
+        )
+        assert large['queries'] <= endpoint.budget, (
+            f'{endpoint} выполняет {large["queries"]} запросов к БД '
+            f'при бюджете {endpoint.budget}'
+        )
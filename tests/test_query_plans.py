@@ -0,0 +1,118 @@
+import os
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+
+from .query_plans import (ROUTES, PlannedRoute, plan_dataset, plan_scale,
+                          read_snapshots, regressions, route_plans,
+                          unexplained_scans, write_snapshots)
+
+UPDATE = os.getenv('UPDATE_QUERY_PLANS') == '1'
+
+
+@pytest.fixture(scope='module')
+def current_snapshots():
+    return read_snapshots()
+
+
+@pytest.fixture(scope='module')
+def dataset(current_snapshots, django_db_setup, django_db_blocker):
+    """
+    Load the synthetic dataset once for the routes of the module into
+    tables truncated first, so that the pages left by the rolled back
+    writes of other tests do not change the plans.
+    """
+    with django_db_blocker.unblock():
+        call_command('flush', interactive=False, verbosity=0)
+        call_command('generate_dataset', scale=plan_scale(current_snapshots))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        yield plan_dataset()
+        call_command('flush', interactive=False, verbosity=0)
+
+
+@pytest.fixture(scope='module')
+def snapshots(current_snapshots):
+    """Snapshots of the database vendor, rewritten with UPDATE_QUERY_PLANS."""
+    if not UPDATE:
+        yield current_snapshots
+        return
+    updated = {'scale': plan_scale(current_snapshots), 'routes': {}}
+    yield updated
+    write_snapshots(updated)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('route', ROUTES, ids=str)
+def test_query_plan(route, dataset, snapshots):
+    status, plans = route_plans(route, dataset)
+
+    assert status < 400, (
+        f'Проверьте, что запрос {route} выполняется успешно: '
+        f'получен статус {status}'
+    )
+    unexplained = unexplained_scans(route, plans)
+    assert not unexplained, (
+        f'Запрос {route} читает целиком {", ".join(unexplained)}: добавьте '
+        'индекс или объяснение в scan_notes маршрута'
+    )
+    if UPDATE:
+        snapshots['routes'][route.name] = plans
+        return
+    assert snapshots is not None, (
+        f'Нет снимков планов для {connection.vendor}: запустите тест '
+        'с UPDATE_QUERY_PLANS=1 на этой базе данных'
+    )
+    assert route.name in snapshots['routes'], (
+        f'Нет снимка плана для {route}: запустите тест с UPDATE_QUERY_PLANS=1'
+    )
+    problems = regressions(
+        snapshots['routes'][route.name], plans,
+        same_scale=snapshots['scale'] == plan_scale(snapshots)
+    )
+    assert not problems, (
+        f'План запросов {route} ухудшился:\n' + '\n'.join(problems)
+    )
+
+
+def test_regressions():
+    snapshot = [{
+        'access': [['reviews_review', 'index review_title_idx']],
+        'cost': 10.0,
+    }]
+    seq_scan = [{'access': [['reviews_review', 'seq scan']], 'cost': 10.0,
+                 'plan': ['Seq Scan reviews_review']}]
+    expensive = [{'access': [['reviews_review', 'index review_title_idx']],
+                  'cost': 20.0, 'plan': []}]
+
+    assert regressions(snapshot, seq_scan, same_scale=True), (
+        'Проверьте, что переход с индекса на полное чтение таблицы '
+        'считается ухудшением плана'
+    )
+    assert regressions(snapshot, expensive, same_scale=True), (
+        'Проверьте, что рост стоимости сверх допуска считается ухудшением'
+    )
+    assert not regressions(snapshot, expensive, same_scale=False)
+
+
+def test_unexplained_scans():
+    seq_scan = [{'access': [['reviews_title', 'seq scan'],
+                            ['reviews_genre', 'seq scan']]}]
+    filtered = PlannedRoute('filtered', 'get', '/', scan_notes={
+        'reviews_genre': 'a hundred genres'
+    })
+
+    assert unexplained_scans(filtered, seq_scan) == ['reviews_title'], (
+        'Проверьте, что полное чтение таблицы фильтруемым маршрутом '
+        'без объяснения считается ошибкой'
+    )
+    assert unexplained_scans(PlannedRoute('list', 'get', '/'), seq_scan) == []
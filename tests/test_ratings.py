@@ -0,0 +1,154 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Avg, Count, Sum
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='film')
+    return [
+        Title.objects.create(name=f'title{i}', year=2000, category=category)
+        for i in range(2)
+    ]
+
+
+@pytest.fixture
+def users():
+    return [
+        User.objects.create(username=f'rater{i}', email=f'r{i}@yamdb.fake')
+        for i in range(3)
+    ]
+
+
+def assert_ratings_match(message):
+    """Check the stored ratings against a fresh aggregate of reviews."""
+    for title in Title.objects.annotate(
+        total=Sum('reviews__score'), reviews_count=Count('reviews'),
+        average=Avg('reviews__score')
+    ):
+        assert (title.rating_sum, title.rating_count) == (
+            title.total or 0, title.reviews_count
+        ), message
+        expected = None if title.average is None else int(title.average)
+        assert title.rating == expected, message
+
+
+def create_reviews(title, count):
+    """Reviews of a title by count new users, with a comment each."""
+    for i in range(count):
+        author = User.objects.create(
+            username=f'{title.name}-{i}', email=f'{title.name}-{i}@yamdb.fake'
+        )
+        review = Review.objects.create(
+            author=author, title=title, text='text', score=5
+        )
+        Comment.objects.create(review=review, author=author, text='text')
+
+
+def count_delete_queries(instance):
+    with CaptureQueriesContext(connection) as queries:
+        instance.delete()
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestRatings:
+
+    def test_create(self, titles, users):
+        for user, score in zip(users, (3, 8, 10)):
+            Review.objects.create(
+                author=user, title=titles[0], text='text', score=score
+            )
+
+        assert_ratings_match(
+            'Проверьте, что новый отзыв добавляется к рейтингу произведения'
+        )
+        assert Title.objects.get(pk=titles[0].pk).rating == 7
+
+    def test_update(self, titles, users):
+        review = Review.objects.create(
+            author=users[0], title=titles[0], text='text', score=3
+        )
+        Review.objects.create(
+            author=users[1], title=titles[0], text='text', score=5
+        )
+        review.score = 9
+        review.save()
+        assert_ratings_match(
+            'Проверьте, что изменение оценки меняет рейтинг произведения'
+        )
+
+        review.title = titles[1]
+        review.save()
+        assert_ratings_match(
+            'Проверьте, что отзыв, перенесённый на другое произведение, '
+            'переносит и свою оценку'
+        )
+
+    def test_delete(self, titles, users):
+        review = Review.objects.create(
+            author=users[0], title=titles[0], text='text', score=3
+        )
+        Review.objects.create(
+            author=users[1], title=titles[0], text='text', score=5
+        )
+        stale = Review.objects.get(pk=review.pk)
+        review.score = 10
+        review.save()
+
+        stale.delete()
+        assert_ratings_match(
+            'Проверьте, что при удалении вычитается оценка из базы, '
+            'а не устаревшая оценка удаляемого объекта'
+        )
+
+        Review.objects.filter(author=users[1]).delete()
+        assert_ratings_match(
+            'Проверьте, что удаление через QuerySet обновляет рейтинг'
+        )
+        assert Title.objects.get(pk=titles[0].pk).rating is None
+
+    def test_delete_title(self, titles):
+        create_reviews(titles[0], 2)
+        create_reviews(titles[1], 20)
+
+        assert count_delete_queries(titles[0]) == count_delete_queries(
+            titles[1]
+        ), (
+            'Проверьте, что число запросов при удалении произведения '
+            'не зависит от числа его отзывов и комментариев'
+        )
+
+    def test_delete_author(self, titles, users):
+        for title in titles:
+            for user, score in zip(users, (2, 7, 9)):
+                Review.objects.create(
+                    author=user, title=title, text='text', score=score
+                )
+
+        users[1].delete()
+
+        assert_ratings_match(
+            'Проверьте, что удаление автора обновляет рейтинги '
+            'всех его произведений'
+        )
+        assert Title.objects.get(pk=titles[0].pk).rating == 5
+
+    def test_rebuild(self, titles, users):
+        for user, score in zip(users, (1, 6, 9)):
+            Review.objects.create(
+                author=user, title=titles[0], text='text', score=score
+            )
+        Title.objects.update(rating_sum=100, rating_count=1)
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        assert_ratings_match(
+            'Проверьте, что rebuild_ratings пересчитывает рейтинги по отзывам'
+        )
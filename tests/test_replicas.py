@@ -0,0 +1,270 @@
+import sqlite3
+
+import pytest
+from api_yamdb.caches import REPLICAS_CACHE, check_shared_caches
+from api_yamdb.db import replicas
+from api_yamdb.settings import replica_settings
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from reviews.models import Category, Title
+from users.models import User
+
+from .query_budget import authorized_client
+from .test_user_cache import OtherWorker
+
+REPLICA = 'replica1'
+DATABASE_CACHE = {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'replicas_cache',
+}
+
+
+@pytest.fixture
+def replica(transactional_db, tmp_path, settings):
+    """
+    SQLite file standing in for a replica of the test database;
+    calling the fixture copies the primary into it.
+    """
+    if connection.vendor != 'sqlite':
+        pytest.skip('Реплика в тестах — файл SQLite')
+    path = tmp_path / 'replica.sqlite3'
+    connections.databases[REPLICA] = replica_settings(
+        connection.settings_dict, str(path)
+    )
+    settings.DATABASE_REPLICAS = [REPLICA]
+    replicas.checked.clear()
+
+    def replicate():
+        connection.ensure_connection()
+        target = sqlite3.connect(str(path))
+        connection.connection.backup(target)
+        target.close()
+
+    yield replicate
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+    replicas.checked.clear()
+    caches[REPLICAS_CACHE].clear()
+
+
+def create_title(name):
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='film')
+    return Title.objects.create(name=name, year=2000, category=category)
+
+
+def title_names(client):
+    response = client.get('/api/v1/titles/')
+    assert response.status_code == 200
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+class TestReplicas:
+
+    def test_replica_settings(self):
+        primary = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': 'yamdb', 'HOST': 'db', 'PORT': 5432,
+        }
+
+        assert replica_settings(primary, 'standby:5433') == dict(
+            primary, HOST='standby', PORT='5433',
+            TEST={'MIRROR': 'default'}
+        )
+        assert replica_settings(primary, 'standby')['PORT'] == 5432
+        sqlite = dict(primary, ENGINE='django.db.backends.sqlite3')
+        assert replica_settings(sqlite, '/tmp/replica.sqlite3')['NAME'] == (
+            '/tmp/replica.sqlite3'
+        )
+
+    def test_router(self, settings):
+        settings.DATABASE_REPLICAS = [REPLICA]
+        router = replicas.ReplicaRouter()
+        routing = replicas.Routing()
+        routing.read_database = REPLICA
+        token = replicas.ROUTING.set(routing)
+        try:
+            assert router.db_for_read(Title) == REPLICA
+            assert router.db_for_write(Title) == 'default'
+            assert router.db_for_read(Title) == 'default', (
+                'Проверьте, что после записи запрос читает из основной базы'
+            )
+        finally:
+            replicas.ROUTING.reset(token)
+        assert router.db_for_read(Title) is None
+        assert router.allow_migrate(REPLICA, 'reviews') is False
+        assert router.allow_migrate('default', 'reviews') is None
+
+    def test_cache_tables_on_primary(self, settings):
+        settings.DATABASE_REPLICAS = [REPLICA]
+        router = replicas.ReplicaRouter()
+        cache_model = DatabaseCache('replicas_cache', {}).cache_model_class
+        routing = replicas.Routing()
+        routing.read_database = REPLICA
+        token = replicas.ROUTING.set(routing)
+        try:
+            assert router.db_for_read(cache_model) == DEFAULT_DB_ALIAS, (
+                'Проверьте, что таблицы кэша читаются из основной базы'
+            )
+            assert router.db_for_write(cache_model) == DEFAULT_DB_ALIAS
+            assert router.db_for_read(Title) == REPLICA, (
+                'Проверьте, что запись в кэш не переводит запрос '
+                'на основную базу'
+            )
+        finally:
+            replicas.ROUTING.reset(token)
+
+    def test_shared_pins_required(self, settings):
+        settings.SHARED_CACHES = []
+        settings.DATABASE_REPLICAS = [REPLICA]
+        with pytest.raises(ImproperlyConfigured, match=REPLICAS_CACHE):
+            check_shared_caches()
+
+        settings.CACHES = dict(settings.CACHES, replicas=DATABASE_CACHE)
+        check_shared_caches()
+
+    def test_safe_requests_read_replica(self, replica):
+        create_title('replicated')
+        replica()
+        create_title('primary')
+
+        assert title_names(APIClient()) == ['replicated'], (
+            'Проверьте, что GET-запросы к вьюсетам читают из реплики'
+        )
+
+    def test_async_reads_replica(self, replica, settings):
+        title = create_title('replicated')
+        replica()
+        create_title('primary')
+        settings.ROOT_URLCONF = 'api_yamdb.asgi_urls'
+
+        async def get(url):
+            return await AsyncClient().get(url)
+
+        response = async_to_sync(get)('/api/v1/titles/')
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()['results']] == [
+            title.id
+        ], 'Проверьте, что асинхронные представления читают из реплики'
+
+    def test_user_reads_own_writes(self, replica):
+        title = create_title('replicated')
+        user = User.objects.create(username='writer', email='w@yamdb.fake')
+        replica()
+        client = authorized_client(user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+
+        response = client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+
+        assert client.get(url).json()['count'] == 1, (
+            'Проверьте, что после записи пользователь читает '
+            'из основной базы'
+        )
+        assert APIClient().get(url).json()['count'] == 0, (
+            'Проверьте, что другие пользователи читают из реплики'
+        )
+        caches[REPLICAS_CACHE].clear()
+        assert client.get(url).json()['count'] == 0, (
+            'Проверьте, что по истечении окна пользователь снова '
+            'читает из реплики'
+        )
+
+    def test_pin_seen_by_other_worker(self, replica, settings):
+        settings.CACHES = dict(settings.CACHES, replicas=DATABASE_CACHE)
+        call_command('createcachetable', 'replicas_cache')
+        title = create_title('replicated')
+        user = User.objects.create(username='writer', email='w@yamdb.fake')
+        replica()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+
+        writer = OtherWorker(REPLICAS_CACHE)
+        response = writer.request('post', url, user, {
+            'text': 'Отзыв', 'score': 7
+        })
+        assert response.status_code == 201
+
+        reader = OtherWorker(REPLICAS_CACHE)
+        assert reader.get(url, user).json()['count'] == 1, (
+            'Проверьте, что после записи пользователь читает из основной '
+            'базы и в других процессах'
+        )
+
+    def test_lagging_replica_skipped(self, replica, monkeypatch):
+        create_title('replicated')
+        replica()
+        create_title('primary')
+        lags = []
+
+        def lag(alias):
+            lags.append(alias)
+            return 10.0
+
+        monkeypatch.setattr(replicas, 'replica_lag', lag)
+        client = APIClient()
+
+        assert title_names(client) == ['primary', 'replicated'], (
+            'Проверьте, что отстающая реплика не используется'
+        )
+        assert title_names(client) == ['primary', 'replicated']
+        assert lags == [REPLICA], (
+            'Проверьте, что отставание реплики проверяется не чаще '
+            'DB_REPLICA_CHECK_INTERVAL'
+        )
+
+    def test_unavailable_replica_skipped(self, replica, tmp_path):
+        connections.databases[REPLICA]['NAME'] = str(
+            tmp_path / 'missing' / 'replica.sqlite3'
+        )
+        create_title('primary')
+
+        assert title_names(APIClient()) == ['primary'], (
+            'Проверьте, что недоступная реплика не используется'
+        )
+
+
+FAKE_STANDBY = '''
+CREATE SCHEMA fake_standby;
+CREATE FUNCTION fake_standby.pg_is_in_recovery() RETURNS boolean
+    AS 'SELECT true' LANGUAGE sql;
+CREATE FUNCTION fake_standby.pg_last_wal_receive_lsn() RETURNS pg_lsn
+    AS $$SELECT '0/100'::pg_lsn$$ LANGUAGE sql;
+CREATE FUNCTION fake_standby.pg_last_wal_replay_lsn() RETURNS pg_lsn
+    AS $$SELECT '0/100'::pg_lsn$$ LANGUAGE sql;
+CREATE TABLE fake_standby.pg_stat_wal_receiver (status text);
+SET LOCAL search_path = fake_standby, pg_catalog, public;
+'''
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('receivers, lag', [
+    ([], float('inf')),
+    (['waiting'], float('inf')),
+    (['streaming'], 0),
+    ([None], 0),
+])
+def test_postgresql_standby_lag(receivers, lag):
+    """
+    Functions and a table in a schema ahead of pg_catalog stand in for
+    a standby that replayed all it received from its WAL receivers.
+    """
+    if connection.vendor != 'postgresql':
+        pytest.skip('Отставание реплики проверяется запросом PostgreSQL')
+    with connection.cursor() as cursor:
+        cursor.execute(FAKE_STANDBY)
+        for status in receivers:
+            cursor.execute(
+                'INSERT INTO fake_standby.pg_stat_wal_receiver VALUES (%s)',
+                [status]
+            )
+
+    assert replicas.replica_lag(DEFAULT_DB_ALIAS) == lag, (
+        'Проверьте, что реплика без потоковой репликации считается '
+        'отстающей, даже если применила всё полученное'
+    )
@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+import reviews.search
+from reviews.models import Category, Title
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='film')
+    created = {}
+    for key, name, description in (
+        ('name', 'Дракон', 'Сказка для детей'),
+        ('description', 'Сказка', 'История о драконе'),
+        ('both', 'Рыцарь и дракон', 'Рыцарь спасает принцессу'),
+        ('other', 'Принцесса', 'Без совпадений'),
+    ):
+        created[key] = Title.objects.create(
+            name=name, description=description, year=2000, category=category
+        )
+    return created
+
+
+def search(value):
+    """Return the ids of the titles found, in the order of the response."""
+    response = Client().get('/api/v1/titles/', {'search': value})
+    assert response.status_code == 200, (
+        f'Проверьте, что поиск по строке {value!r} не падает'
+    )
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_matches_name_and_description(self, titles):
+        found = search('дракон')
+        assert sorted(found) == sorted(
+            titles[key].id for key in ('name', 'description', 'both')
+        ), 'Проверьте, что поиск находит слово в названии и в описании'
+        assert search('единорог') == []
+
+    def test_name_match_ranks_first(self, titles):
+        found = search('дракон')
+        assert found[-1] == titles['description'].id, (
+            'Проверьте, что совпадение в названии выше совпадения в описании'
+        )
+
+    def test_multiple_words(self, titles):
+        found = search('рыцарь дракон')
+        assert found[0] == titles['both'].id, (
+            'Проверьте, что произведение со всеми словами запроса идёт первым'
+        )
+        assert titles['description'].id not in found
+        assert titles['other'].id not in found
+
+    @pytest.mark.parametrize('value', [
+        'рыцарь, дракон!', '"рыцарь и дракон"', '(рыцарь) дракон*',
+    ])
+    def test_punctuation(self, titles, value):
+        assert search(value)[0] == titles['both'].id, (
+            'Проверьте, что знаки препинания и операторы в запросе не '
+            'ломают поиск'
+        )
+
+    def test_index_follows_updates(self, titles):
+        renamed = titles['name']
+        renamed.name = 'Единорог'
+        renamed.save()
+        assert renamed.id not in search('дракон'), (
+            'Проверьте, что после переименования старое название не находится'
+        )
+        assert search('единорог') == [renamed.id]
+
+        titles['both'].delete()
+        assert search('рыцарь') == [], (
+            'Проверьте, что удалённое произведение не находится'
+        )
+
+    def test_short_terms(self, titles):
+        # Words shorter than a trigram are matched by the words only.
+        search('и')
+
+    def test_matches_ranked_once(self, titles, monkeypatch):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Ранг FTS5 считается только в SQLite')
+        for i in range(5):
+            Title.objects.create(
+                name=f'Дракон {i}', year=2000, category=titles['name'].category
+            )
+        ranked = []
+        connection.ensure_connection()
+        connection.connection.create_function(
+            'counted', 1, lambda rank: ranked.append(rank) or rank
+        )
+        monkeypatch.setattr(
+            reviews.search, 'FTS_RANK', f'counted({reviews.search.FTS_RANK})'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            search('дракон')
+        statements = sum(
+            'counted(' in query['sql'] for query in queries.captured_queries
+        )
+
+        # Three titles of the fixture and five new ones match.
+        assert len(ranked) == 8 * statements, (
+            'Проверьте, что ранг каждого совпадения считается один раз за '
+            'запрос, а не для каждого произведения'
+        )
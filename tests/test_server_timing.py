@@ -0,0 +1,76 @@
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+
+
+def parse(header):
+    """Return the Server-Timing metrics as {name: {param: value}}."""
+    metrics = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+async def async_get(url):
+    return await AsyncClient().get(url)
+
+
+@pytest.fixture
+def timing_log(caplog):
+    logger = logging.getLogger('api.timing')
+    logger.addHandler(caplog.handler)
+    yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def test_sampled_request(self, settings, timing_log, dataset):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get(
+                f'/api/v1/titles/{dataset["title"]}/reviews/'
+            )
+
+        metrics = parse(response['Server-Timing'])
+        assert {'auth', 'queryset', 'serializer', 'render', 'db', 'total'} \
+            <= set(metrics), (
+            'Проверьте, что заголовок Server-Timing содержит время '
+            'проверки прав, get_queryset, сериализатора, рендера и БД'
+        )
+        assert metrics['queries']['desc'] == f'"{len(queries)}"', (
+            'Проверьте, что Server-Timing считает все запросы к БД'
+        )
+        record = json.loads(timing_log.records[-1].getMessage())
+        assert record['view'] == 'reviews-list'
+        assert record['queries'] == len(queries)
+        assert record['status'] == 200
+
+    def test_not_sampled(self, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        response = Client().get('/api/v1/genres/')
+
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что запросы вне выборки не измеряются'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_route(settings, dataset):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1
+    settings.ROOT_URLCONF = 'api_yamdb.asgi_urls'
+    response = async_to_sync(async_get)(f'/api/v1/titles/{dataset["title"]}/')
+
+    metrics = parse(response['Server-Timing'])
+    assert metrics['queries']['desc'] != '"0"', (
+        'Проверьте, что запросы из потоков асинхронных маршрутов '
+        'попадают в Server-Timing'
+    )
+    assert 'serializer' in metrics
@@ -0,0 +1,97 @@
+from io import StringIO
+
+import pytest
+from api.models import SlowQuery
+from api.slow_queries import SlowQueryMiddleware, full_scans
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from reviews.models import Title
+
+
+POSTGRESQL_PLAN = '''Limit  (cost=0.29..8.31 rows=1 width=4)
+  ->  Nested Loop  (cost=0.29..8.31 rows=1 width=4)
+        ->  Seq Scan on reviews_title  (cost=0.00..1.01 rows=1 width=4)
+        ->  Index Scan using reviews_review_pkey on reviews_review
+Planning Time: 0.1 ms'''
+SQLITE_PLAN = '''SCAN reviews_title
+SEARCH reviews_review USING INDEX review_title_idx (title_id=?)
+SCAN reviews_genre USING COVERING INDEX genre_slug'''
+
+
+@pytest.fixture
+def capture_all(settings):
+    settings.SLOW_QUERY_THRESHOLD = 0
+    settings.SLOW_QUERY_EXPLAIN_INTERVAL = 0
+    settings.SLOW_QUERY_LOG_SIZE = 1000
+
+
+@pytest.mark.django_db
+class TestSlowQueries:
+
+    def test_capture(self, capture_all, dataset):
+        Client().get(f'/api/v1/titles/{dataset["title"]}/reviews/')
+
+        queries = SlowQuery.objects.filter(view='ReviewViewSet')
+        assert queries.exists(), (
+            'Проверьте, что медленные запросы сохраняются '
+            'с классом представления'
+        )
+        query = queries.filter(sql__contains='reviews_review').first()
+        assert query.action == 'list'
+        assert query.method == 'GET'
+        assert query.plan, 'Проверьте, что к запросу добавляется план'
+
+    def test_saved_after_response(self, capture_all):
+        def view(request):
+            list(Title.objects.all())
+            return HttpResponse()
+
+        response = SlowQueryMiddleware(view)(RequestFactory().get('/'))
+        assert not SlowQuery.objects.exists(), (
+            'Проверьте, что план строится не до отправки ответа'
+        )
+        # Like the test client, keep the connection of the test
+        # transaction open when the response is closed.
+        request_finished.disconnect(close_old_connections)
+        try:
+            response.close()
+        finally:
+            request_finished.connect(close_old_connections)
+        assert SlowQuery.objects.filter(sql__contains='reviews_title').exists()
+
+    def test_ring_buffer(self, capture_all, settings, dataset):
+        settings.SLOW_QUERY_LOG_SIZE = 3
+        client = Client()
+        for _ in range(3):
+            client.get('/api/v1/titles/')
+
+        assert SlowQuery.objects.count() == 3, (
+            'Проверьте, что хранятся только последние '
+            'SLOW_QUERY_LOG_SIZE запросов'
+        )
+
+    def test_threshold(self, settings):
+        settings.SLOW_QUERY_THRESHOLD = 10
+        Client().get('/api/v1/genres/')
+
+        assert not SlowQuery.objects.exists()
+
+    def test_command(self, capture_all, dataset):
+        Client().get('/api/v1/titles/')
+        out = StringIO()
+        call_command('slow_queries', '--view', 'TitleViewSet', '--plans',
+                     stdout=out)
+
+        assert 'TitleViewSet list GET /api/v1/titles/' in out.getvalue()
+        out = StringIO()
+        call_command('slow_queries', '--summary', stdout=out)
+        assert 'TitleViewSet list' in out.getvalue()
+
+
+def test_full_scans():
+    assert full_scans(POSTGRESQL_PLAN) == ['reviews_title']
+    assert full_scans(SQLITE_PLAN) == ['reviews_title']
+    assert full_scans('SCAN TABLE reviews_title') == ['reviews_title']
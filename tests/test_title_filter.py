@@ -0,0 +1,98 @@
+import pytest
+from api.views import TitleViewSet
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def titles():
+    film = Category.objects.create(name='Фильм', slug='film')
+    book = Category.objects.create(name='Книга', slug='film-book')
+    drama, comedy, horror = (
+        Genre.objects.create(name=slug, slug=slug)
+        for slug in ('drama', 'comedy', 'horror')
+    )
+    created = {}
+    for name, year, category, genres in (
+        ('both', 1990, film, (drama, comedy)),
+        ('drama', 2000, film, (drama,)),
+        ('comedy', 2010, book, (comedy,)),
+        ('all', 2020, book, (drama, comedy, horror)),
+    ):
+        title = Title.objects.create(name=name, year=year, category=category)
+        title.genre.set(genres)
+        created[name] = title.id
+    return created
+
+
+def names(url):
+    response = Client().get(url)
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert response.json()['count'] == len(results)
+    return sorted(title['name'] for title in results)
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    def test_genre_any(self, titles):
+        assert names('/api/v1/titles/?genre=drama') == [
+            'all', 'both', 'drama'
+        ]
+        assert names('/api/v1/titles/?genre=drama,comedy') == [
+            'all', 'both', 'comedy', 'drama'
+        ], (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'возвращается один раз'
+        )
+        assert names('/api/v1/titles/?genre=dram') == [], (
+            'Проверьте, что жанр фильтруется по точному slug'
+        )
+
+    def test_genre_all(self, titles):
+        with CaptureQueriesContext(connection) as queries:
+            found = names('/api/v1/titles/?genre_all=drama,comedy')
+
+        assert found == ['all', 'both']
+        assert names('/api/v1/titles/?genre_all=drama,unknown') == []
+        for query in queries.captured_queries:
+            assert 'DISTINCT' not in query['sql'].upper()
+            assert query['sql'].count('"reviews_title_genre"') <= 1, (
+                'Проверьте, что фильтр по всем жанрам не соединяет таблицу '
+                'жанров произведений для каждого жанра'
+            )
+
+    def test_category(self, titles):
+        assert names('/api/v1/titles/?category=film') == ['both', 'drama']
+        assert names('/api/v1/titles/?category=fil') == []
+
+    def test_year(self, titles):
+        assert names('/api/v1/titles/?year=2000') == ['drama']
+        assert names('/api/v1/titles/?year=200') == [], (
+            'Проверьте, что год фильтруется по точному значению'
+        )
+        assert names('/api/v1/titles/?year_min=2000&year_max=2010') == [
+            'comedy', 'drama'
+        ]
+
+    def test_internal_fields_not_filtered(self, titles):
+        all_titles = names('/api/v1/titles/')
+        for field in ('rating_sum', 'rating_count', 'version', 'modified'):
+            assert names(f'/api/v1/titles/?{field}=1') == all_titles, (
+                f'Проверьте, что служебное поле {field} не доступно '
+                'для фильтрации'
+            )
+
+    def test_deleted_title_skipped(self, titles):
+
+        view = TitleViewSet(action='list')
+        Title.objects.filter(id=titles['drama']).delete()
+
+        found = view.get_titles([titles['both'], titles['drama']])
+        assert [title.id for title in found] == [titles['both']], (
+            'Проверьте, что произведение, удалённое после выборки '
+            'идентификаторов страницы, пропускается'
+        )
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+import pytest
+from api_yamdb.caches import check_shared_caches
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from users.cache import USER_CACHE_ALIAS, user_cache_key
+from users.models import ADMIN, USER, User
+
+from .query_budget import authorized_client
+
+DATABASE_CACHE = {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'users_cache',
+}
+
+
+@pytest.fixture
+def shared_cache(settings, db):
+    """The users cache in the database table shared by the workers."""
+    settings.CACHES = dict(settings.CACHES, users=DATABASE_CACHE)
+    call_command('createcachetable', 'users_cache')
+    yield
+    caches[USER_CACHE_ALIAS].clear()
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create(
+        username='cached_admin', email='cached_admin@yamdb.fake', role=ADMIN
+    )
+
+
+class OtherWorker:
+    """
+    Worker of another process serving requests: its cache backend is
+    created once and keeps its own entries, only the store of a shared
+    backend is common with the test process. LocMemCache instances of
+    one process share their memory, so this one gets its own.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.cache = caches.create_connection(alias)
+        if isinstance(self.cache, LocMemCache):
+            self.cache._cache, self.cache._expire_info = OrderedDict(), {}
+
+    def request(self, method, url, user, data=None):
+        client = authorized_client(user)
+        own = caches[self.alias]
+        setattr(caches._connections, self.alias, self.cache)
+        try:
+            return getattr(client, method)(url, data)
+        finally:
+            setattr(caches._connections, self.alias, own)
+
+    def get(self, url, user):
+        return self.request('get', url, user)
+
+
+@pytest.fixture
+def other_worker(shared_cache):
+    return OtherWorker(USER_CACHE_ALIAS)
+
+
+@pytest.mark.django_db
+class TestUserCache:
+
+    def test_role_change_seen_by_other_worker(self, other_worker, admin):
+        assert other_worker.get('/api/v1/users/', admin).status_code == 200
+        assert caches[USER_CACHE_ALIAS].get(user_cache_key(admin.pk))
+
+        User.objects.filter(pk=admin.pk).update(role=USER)
+        assert other_worker.get('/api/v1/users/', admin).status_code == 403, (
+            'Проверьте, что понижение роли массовым update сбрасывает '
+            'кэш пользователя во всех процессах'
+        )
+
+        admin.role = ADMIN
+        admin.save()
+        assert other_worker.get('/api/v1/users/', admin).status_code == 200
+
+    def test_deactivation_seen_by_other_worker(self, other_worker, admin):
+        assert other_worker.get('/api/v1/users/me/', admin).status_code == 200
+
+        admin.is_active = False
+        admin.save()
+        assert other_worker.get('/api/v1/users/me/', admin).status_code == (
+            401
+        ), (
+            'Проверьте, что заблокированный пользователь не проходит '
+            'аутентификацию в других процессах'
+        )
+
+    def test_deletion_seen_by_other_worker(self, other_worker, admin):
+        assert other_worker.get('/api/v1/users/me/', admin).status_code == 200
+
+        User.objects.filter(pk=admin.pk).delete()
+        assert other_worker.get('/api/v1/users/me/', admin).status_code == (
+            401
+        ), 'Проверьте, что удалённый пользователь не проходит аутентификацию'
+
+    def test_shared_cache_required(self, settings):
+        settings.SHARED_CACHES = ['users']
+        with pytest.raises(ImproperlyConfigured, match='users'):
+            check_shared_caches()
+
+        settings.CACHES = dict(settings.CACHES, users=DATABASE_CACHE)
+        check_shared_caches()